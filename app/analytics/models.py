@@ -0,0 +1,67 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+import uuid
+
+from sqlalchemy import Column, Date, DateTime, Numeric, Uuid, text
+from sqlmodel import Field, SQLModel
+
+
+class LoanFact(SQLModel, table=True):
+    """What one loan currently contributes to the rollups.
+
+    Kept so a refresh can subtract a loan's old contribution before adding
+    the new one when the loan changes.
+    """
+
+    __tablename__ = "analytics_loan_facts"
+
+    loan_uid: uuid.UUID = Field(sa_column=Column(Uuid(as_uuid=True), primary_key=True))
+    day: date = Field(sa_column=Column(Date, nullable=False))
+    book_uid: uuid.UUID = Field(sa_column=Column(Uuid(as_uuid=True), nullable=False))
+    # "" when the member has no city or the book no language.
+    city: str = Field(default="", max_length=100)
+    language: str = Field(default="", max_length=50)
+    returned: bool = Field(default=False)
+    fine_amount: Decimal = Field(
+        default=Decimal("0.00"),
+        sa_column=Column(Numeric(10, 2), nullable=False, server_default=text("0.00")),
+    )
+
+
+class LoanRollup(SQLModel, table=True):
+    """Loans borrowed per day, per ``dimension`` value.
+
+    ``dimension`` is one of ``day`` (``key`` is ""), ``book`` (the book uid),
+    ``city`` or ``language``. The primary key leads with (dimension, day) so
+    date-range reports are index range scans.
+    """
+
+    __tablename__ = "analytics_loan_rollups"
+
+    dimension: str = Field(primary_key=True, max_length=20)
+    day: date = Field(sa_column=Column(Date, primary_key=True))
+    key: str = Field(primary_key=True, max_length=100)
+    loans: int = Field(default=0)
+    returned: int = Field(default=0)
+    fine_amount: Decimal = Field(
+        default=Decimal("0.00"),
+        sa_column=Column(Numeric(14, 2), nullable=False, server_default=text("0.00")),
+    )
+
+
+class AnalyticsWatermark(SQLModel, table=True):
+    """How far into ``loans`` (by updated_at, uid) a rollup refresh has got."""
+
+    __tablename__ = "analytics_watermarks"
+
+    name: str = Field(primary_key=True, max_length=50)
+    updated_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    loan_uid: Optional[uuid.UUID] = Field(
+        default=None, sa_column=Column(Uuid(as_uuid=True), nullable=True)
+    )
+    refreshed_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
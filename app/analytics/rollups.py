@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import delete, select, tuple_, update
+
+from app.analytics.models import AnalyticsWatermark, LoanFact, LoanRollup
+from app.books.models import Book
+from app.config import Config
+from app.db.capabilities import capabilities, upsert_insert
+from app.loans.models import Loan
+from app.members.models import Member
+
+
+logger = logging.getLogger("bookly")
+
+WATERMARK = "loan_rollups"
+DIMENSIONS = ("day", "book", "city", "language")
+
+# Plain tuples rather than LoanFact instances: a refresh builds one per changed loan.
+Fact = namedtuple("Fact", LoanFact.__table__.columns.keys())
+RollupKey = Tuple[str, object, str]
+
+
+def _add_contribution(deltas: Dict[RollupKey, list], fact, sign: int) -> None:
+    keys = {"day": "", "book": str(fact.book_uid), "city": fact.city, "language": fact.language}
+    for dimension in DIMENSIONS:
+        delta = deltas.setdefault((dimension, fact.day, keys[dimension]), [0, 0, Decimal("0.00")])
+        delta[0] += sign
+        delta[1] += sign if fact.returned else 0
+        delta[2] += sign * fact.fine_amount
+
+
+async def _apply_deltas(session, deltas: Dict[RollupKey, list]) -> None:
+    rows = [
+        {"dimension": dimension, "day": day, "key": key, "loans": loans, "returned": returned, "fine_amount": fine}
+        for (dimension, day, key), (loans, returned, fine) in deltas.items()
+        if loans or returned or fine
+    ]
+    if not rows:
+        return
+    # executemany with one statement: a multi-row VALUES would be compiled afresh for every batch.
+    statement = upsert_insert(session, LoanRollup)
+    await session.execute(statement.on_conflict_do_update(
+        index_elements=["dimension", "day", "key"],
+        set_={
+            "loans": LoanRollup.loans + statement.excluded.loans,
+            "returned": LoanRollup.returned + statement.excluded.returned,
+            "fine_amount": LoanRollup.fine_amount + statement.excluded.fine_amount,
+        },
+    ), rows)
+
+
+async def _save_facts(session, facts: List[dict]) -> None:
+    if not facts:
+        return
+    statement = upsert_insert(session, LoanFact)
+    await session.execute(statement.on_conflict_do_update(
+        index_elements=["loan_uid"],
+        set_={name: statement.excluded[name] for name in Fact._fields if name != "loan_uid"},
+    ), facts)
+
+
+async def _load_facts(session, loan_uids) -> Dict[uuid.UUID, Fact]:
+    columns = LoanFact.__table__.c
+    result = await session.execute(select(*columns).where(columns.loan_uid.in_(loan_uids)))
+    return {row.loan_uid: Fact(**row._mapping) for row in result}
+
+
+def _changed_loans(start: Optional[Tuple[datetime, uuid.UUID]], until: datetime, limit: int):
+    statement = (
+        select(
+            Loan.uid,
+            Loan.updated_at,
+            Loan.borrowed_at,
+            Loan.book_uid,
+            Loan.returned_at,
+            Loan.fine_amount,
+            Member.city,
+            Book.language,
+        )
+        .join(Book, Book.uid == Loan.book_uid)
+        .join(Member, Member.uid == Loan.member_uid)
+        .where(Loan.updated_at <= until)
+    )
+    if start is not None:
+        statement = statement.where(tuple_(Loan.updated_at, Loan.uid) > tuple_(*start))
+    return statement.order_by(Loan.updated_at, Loan.uid).limit(limit)
+
+
+async def _ensure_watermark(session_maker) -> None:
+    async with session_maker() as session:
+        await session.execute(upsert_insert(session, AnalyticsWatermark).values(name=WATERMARK).on_conflict_do_nothing())
+        await session.commit()
+
+
+async def refresh_loan_rollups(
+    session_maker,
+    batch_size: int = Config.ANALYTICS_REFRESH_BATCH_SIZE,
+    lag_seconds: float = Config.ANALYTICS_REFRESH_LAG_SECONDS,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Fold loans changed since the watermark into the rollups.
+
+    Loans are walked in (updated_at, uid) order, ``batch_size`` per
+    transaction. For each changed loan the rollups lose its previous fact
+    and gain the new one, so the work is proportional to the loans that
+    changed, not to the size of ``loans``. Loans changed in the last
+    ``lag_seconds`` are left for the next run: updated_at is stamped before
+    commit, so a transaction still in flight could otherwise land behind
+    the watermark and be skipped.
+
+    The watermark row is locked for each batch, so concurrent refreshes on
+    other workers skip instead of double counting. SQLite has no row locks;
+    there a batch takes the database write lock first and concurrent
+    refreshes wait for it.
+    """
+    now = now or datetime.now()
+    until = now - timedelta(seconds=lag_seconds)
+    started = perf_counter()
+    scanned = changed = 0
+    await _ensure_watermark(session_maker)
+    while True:
+        async with session_maker() as session:
+            if not capabilities(session).skip_locked:
+                await session.execute(
+                    update(AnalyticsWatermark)
+                    .where(AnalyticsWatermark.name == WATERMARK)
+                    .values(refreshed_at=AnalyticsWatermark.refreshed_at)
+                )
+            watermark_result = await session.execute(
+                select(AnalyticsWatermark)
+                .where(AnalyticsWatermark.name == WATERMARK)
+                .with_for_update(skip_locked=True)
+            )
+            watermark = watermark_result.scalar_one_or_none()
+            if watermark is None:
+                return {"skipped": True, "scanned": scanned, "changed": changed, "seconds": round(perf_counter() - started, 3)}
+            # Read under the lock: another worker may have moved it since the last batch.
+            position = None if watermark.updated_at is None else (watermark.updated_at, watermark.loan_uid)
+
+            rows = (await session.execute(_changed_loans(position, until, batch_size))).all()
+            previous = await _load_facts(session, [row.uid for row in rows]) if rows else {}
+            deltas: Dict[RollupKey, list] = {}
+            facts: List[dict] = []
+            for row in rows:
+                fact = Fact(
+                    loan_uid=row.uid,
+                    day=row.borrowed_at.date(),
+                    book_uid=row.book_uid,
+                    city=row.city or "",
+                    language=row.language or "",
+                    returned=row.returned_at is not None,
+                    fine_amount=row.fine_amount,
+                )
+                old = previous.get(row.uid)
+                if old == fact:
+                    continue
+                if old is not None:
+                    _add_contribution(deltas, old, -1)
+                _add_contribution(deltas, fact, 1)
+                facts.append(fact._asdict())
+            await _save_facts(session, facts)
+            await _apply_deltas(session, deltas)
+
+            if rows:
+                position = (rows[-1].updated_at, rows[-1].uid)
+                watermark.updated_at, watermark.loan_uid = position
+            watermark.refreshed_at = now
+            await session.commit()
+        scanned += len(rows)
+        changed += len(facts)
+        if len(rows) < batch_size:
+            break
+    return {"skipped": False, "scanned": scanned, "changed": changed, "seconds": round(perf_counter() - started, 3)}
+
+
+async def remove_loan_facts(session, loan_uids: Iterable[uuid.UUID]) -> int:
+    """Take deleted loans out of the rollups; the caller commits.
+
+    Loans are never deleted by the API, but maintenance scripts and
+    benchmarks that remove rows should call this alongside.
+    """
+    previous = await _load_facts(session, list(loan_uids))
+    if not previous:
+        return 0
+    deltas: Dict[RollupKey, list] = {}
+    for fact in previous.values():
+        _add_contribution(deltas, fact, -1)
+    await _apply_deltas(session, deltas)
+    await session.execute(delete(LoanFact).where(LoanFact.loan_uid.in_(previous.keys())))
+    return len(previous)
+
+
+async def run_rollup_refreshes(session_maker, interval_seconds: float) -> None:
+    """Refresh forever every ``interval_seconds``; a failed refresh is logged and retried next time."""
+    while True:
+        try:
+            stats = await refresh_loan_rollups(session_maker)
+            if not stats["skipped"] and stats["changed"]:
+                logger.info(
+                    "Analytics rollups refreshed: %d loans scanned, %d changed",
+                    stats["scanned"],
+                    stats["changed"],
+                    extra={"duration_ms": round(stats["seconds"] * 1000, 2)},
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Analytics rollup refresh failed")
+        await asyncio.sleep(interval_seconds)
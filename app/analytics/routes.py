@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.analytics.rollups import refresh_loan_rollups
+from app.analytics.schemas import DailyLoanReport, LoanBreakdownReport, RollupRefreshResult
+from app.analytics.service import AnalyticsService, check_date_range
+from app.auth.dependencies import AccessTokenBearer
+from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, not_modified
+from app.common.responses import api_response
+from app.common.schemas import APIResponse
+from app.db.main import async_session_maker, get_session
+
+
+analytics_router = APIRouter()
+analytics_service = AnalyticsService()
+access_token_bearer = AccessTokenBearer()
+
+DEFAULT_RANGE_DAYS = 30
+DEFAULT_BREAKDOWN_LIMIT = 20
+MAX_BREAKDOWN_LIMIT = 500
+
+START_QUERY = Query(None, description="First borrow date to include; defaults to 30 days before end")
+END_QUERY = Query(None, description="Last borrow date to include; defaults to today")
+
+
+def _date_range(start: date | None, end: date | None):
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    check_date_range(start, end)
+    return start, end
+
+
+@analytics_router.get("/loans/daily", response_model=APIResponse[DailyLoanReport])
+async def read_daily_loans(
+    request: Request,
+    start: date | None = START_QUERY,
+    end: date | None = END_QUERY,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    try:
+        start, end = _date_range(start, end)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_DATE_RANGE",
+            message="Loan analytics could not be fetched",
+            details=str(exc),
+        )
+    # The rollups only change when they are refreshed.
+    refreshed_at = await analytics_service.get_refreshed_at(session)
+    etag = compute_etag(request.url.path, start, end, refreshed_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await analytics_service.get_daily_loans(start, end, session)
+    return api_response(
+        APIResponse[DailyLoanReport],
+        status_code=status.HTTP_200_OK,
+        data={"refreshed_at": refreshed_at, "start": start, "end": end, "rows": rows},
+        message="Loan analytics fetched successfully",
+        headers={"ETag": etag},
+    )
+
+
+async def _loan_breakdown(
+    request: Request,
+    dimension: str,
+    start: date | None,
+    end: date | None,
+    limit: int,
+    session: AsyncSession,
+):
+    try:
+        start, end = _date_range(start, end)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_DATE_RANGE",
+            message="Loan analytics could not be fetched",
+            details=str(exc),
+        )
+    refreshed_at = await analytics_service.get_refreshed_at(session)
+    etag = compute_etag(request.url.path, start, end, limit, refreshed_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows = await analytics_service.get_loan_breakdown(dimension, start, end, limit, session)
+    return api_response(
+        APIResponse[LoanBreakdownReport],
+        status_code=status.HTTP_200_OK,
+        data={"refreshed_at": refreshed_at, "dimension": dimension, "start": start, "end": end, "rows": rows},
+        message="Loan analytics fetched successfully",
+        headers={"ETag": etag},
+    )
+
+
+@analytics_router.get("/loans/by-book", response_model=APIResponse[LoanBreakdownReport])
+async def read_loans_by_book(
+    request: Request,
+    start: date | None = START_QUERY,
+    end: date | None = END_QUERY,
+    limit: int = Query(DEFAULT_BREAKDOWN_LIMIT, ge=1, le=MAX_BREAKDOWN_LIMIT),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    return await _loan_breakdown(request, "book", start, end, limit, session)
+
+
+@analytics_router.get("/loans/by-city", response_model=APIResponse[LoanBreakdownReport])
+async def read_loans_by_city(
+    request: Request,
+    start: date | None = START_QUERY,
+    end: date | None = END_QUERY,
+    limit: int = Query(DEFAULT_BREAKDOWN_LIMIT, ge=1, le=MAX_BREAKDOWN_LIMIT),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    return await _loan_breakdown(request, "city", start, end, limit, session)
+
+
+@analytics_router.get("/loans/by-language", response_model=APIResponse[LoanBreakdownReport])
+async def read_loans_by_language(
+    request: Request,
+    start: date | None = START_QUERY,
+    end: date | None = END_QUERY,
+    limit: int = Query(DEFAULT_BREAKDOWN_LIMIT, ge=1, le=MAX_BREAKDOWN_LIMIT),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    return await _loan_breakdown(request, "language", start, end, limit, session)
+
+
+@analytics_router.post("/refresh", status_code=status.HTTP_200_OK, response_model=APIResponse[RollupRefreshResult])
+async def refresh_rollups(token_details: dict = Depends(access_token_bearer)):
+    # Runs on its own sessions: each batch commits separately.
+    stats = await refresh_loan_rollups(async_session_maker)
+    return APIResponse(
+        status="success",
+        statusCode=status.HTTP_200_OK,
+        data=stats,
+        message="Analytics refresh skipped: another refresh is running" if stats["skipped"] else "Analytics refreshed",
+        errors=None,
+    )
@@ -0,0 +1,45 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DailyLoanStats(BaseModel):
+    day: date
+    loans: int
+    returned: int
+    fine_amount: Decimal
+
+
+class LoanStats(BaseModel):
+    # Book uid, city or language; null for members without a city or books without a language.
+    key: Optional[str]
+    # Book title for the per-book breakdown.
+    label: Optional[str] = None
+    loans: int
+    returned: int
+    fine_amount: Decimal
+
+
+class DailyLoanReport(BaseModel):
+    # Loans changed after this point are not in the numbers yet.
+    refreshed_at: Optional[datetime]
+    start: date
+    end: date
+    rows: List[DailyLoanStats]
+
+
+class LoanBreakdownReport(BaseModel):
+    refreshed_at: Optional[datetime]
+    dimension: str
+    start: date
+    end: date
+    rows: List[LoanStats]
+
+
+class RollupRefreshResult(BaseModel):
+    skipped: bool
+    scanned: int
+    changed: int
+    seconds: float
@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from typing import List, Optional
+import uuid
+
+from sqlalchemy import func
+from sqlmodel import desc, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.analytics.models import AnalyticsWatermark, LoanRollup
+from app.analytics.rollups import WATERMARK
+from app.books.models import Book
+
+
+# Breakdowns a caller can ask for; "day" is served by get_daily_loans.
+BREAKDOWN_DIMENSIONS = ("book", "city", "language")
+
+
+def check_date_range(start: date, end: date) -> None:
+    if start > end:
+        raise ValueError(f"start ({start}) must not be after end ({end})")
+
+
+class AnalyticsService:
+    """Reads the loan rollups; they are only as fresh as the last refresh."""
+
+    async def get_refreshed_at(self, session: AsyncSession) -> Optional[datetime]:
+        result = await session.exec(
+            select(AnalyticsWatermark.refreshed_at).where(AnalyticsWatermark.name == WATERMARK)
+        )
+        return result.first()
+
+    async def get_daily_loans(self, start: date, end: date, session: AsyncSession) -> List[dict]:
+        check_date_range(start, end)
+        statement = (
+            select(LoanRollup.day, LoanRollup.loans, LoanRollup.returned, LoanRollup.fine_amount)
+            .where(
+                LoanRollup.dimension == "day",
+                LoanRollup.day.between(start, end),
+                LoanRollup.loans > 0,
+            )
+            .order_by(LoanRollup.day)
+        )
+        result = await session.exec(statement)
+        return [row._asdict() for row in result.all()]
+
+    async def get_loan_breakdown(
+        self,
+        dimension: str,
+        start: date,
+        end: date,
+        limit: int,
+        session: AsyncSession,
+    ) -> List[dict]:
+        """The ``limit`` values of ``dimension`` with the most loans borrowed between ``start`` and ``end``."""
+        check_date_range(start, end)
+        loans = func.sum(LoanRollup.loans).label("loans")
+        statement = (
+            select(
+                LoanRollup.key,
+                loans,
+                func.sum(LoanRollup.returned).label("returned"),
+                func.sum(LoanRollup.fine_amount).label("fine_amount"),
+            )
+            .where(LoanRollup.dimension == dimension, LoanRollup.day.between(start, end))
+            .group_by(LoanRollup.key)
+            .having(loans > 0)
+            .order_by(desc(loans), LoanRollup.key)
+            .limit(limit)
+        )
+        result = await session.exec(statement)
+        rows = [{**row._asdict(), "key": row.key or None} for row in result.all()]
+        if dimension == "book" and rows:
+            titles_result = await session.exec(
+                select(Book.uid, Book.title).where(Book.uid.in_([uuid.UUID(row["key"]) for row in rows]))
+            )
+            titles = {str(uid): title for uid, title in titles_result.all()}
+            for row in rows:
+                row["label"] = titles.get(row["key"])
+        return rows
@@ -13,21 +13,18 @@ class TokenBearer(HTTPBearer):
         super().__init__(auto_error=auto_error)
 
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
-        credentials = await super().__call__(request)
-
-        token = credentials.credentials
-        token_data = decode_access_token(token)
-
-        if not self.token_valid(token):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid authentication credentials")
+        # Routes may declare the bearer more than once; verify the token only once per request.
+        token_data = getattr(request.state, "token_data", None)
+        if token_data is None:
+            credentials = await super().__call__(request)
+            token_data = decode_access_token(credentials.credentials)
+            if not token_data:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid authentication credentials")
+            request.state.token_data = token_data
 
         self.verify_token_data(token_data)
         return token_data
-        
-    def token_valid(self, token: str) -> bool:
-        decoded_token = decode_access_token(token)
-        return True if decoded_token else False
-    
+
     def verify_token_data(self, token_data: dict) -> None:
         raise NotImplementedError("Subclasses must implement this method to verify token data.")
     
@@ -43,4 +40,4 @@ class RefreshTokenBearer(TokenBearer):
     def verify_token_data(self, token_data: dict) -> None:
 
         if token_data and not token_data['refresh']:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="please provide a refresh token.")
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="please provide a refresh token.")
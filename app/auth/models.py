@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Column, DateTime
-import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import Uuid
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -9,7 +9,7 @@ class User(SQLModel, table=True):
     __tablename__ = "users"
     uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             unique=True,
             index=True,
             nullable=False,
@@ -25,10 +25,10 @@ class User(SQLModel, table=True):
     is_verified: bool = Field(default=False)
     is_active: bool = Field(default=True)
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
     )
 
     def __repr__(self):
@@ -4,7 +4,7 @@ from fastapi.responses import JSONResponse
 from app.auth.service import UserService
 from app.auth.schemas import UserCreateModel, UserResponseModel, UserLoginModel
 from app.db.main import get_session
-from app.auth.utils import create_access_token, decode_access_token, verify_password
+from app.auth.utils import PasswordHashingBusyError, create_access_token, decode_access_token, password_hasher
 from datetime import datetime, timedelta
 from app.config import Config
 from app.auth.dependencies import AccessTokenBearer, RefreshTokenBearer
@@ -36,6 +36,14 @@ async def user_signup(
 
     try:
         new_user = await user_service.create_user(user_data, session)
+    except PasswordHashingBusyError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="AUTH_BUSY",
+            message="Signup failed",
+            details=str(exc),
+        )
     except ValueError as exc:
         return _error_response(
             request=request,
@@ -76,8 +84,19 @@ async def user_signin(
     password = login_data.password
 
     user = await user_service.get_user_by_email(email, session)
-    
-    if not user or not verify_password(password, user.password_hash):
+
+    try:
+        password_valid = bool(user) and await password_hasher.verify(password, user.password_hash)
+    except PasswordHashingBusyError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="AUTH_BUSY",
+            message="Signin failed",
+            details=str(exc),
+        )
+
+    if not password_valid:
         return _error_response(
             request=request,
             status_code=status.HTTP_401_UNAUTHORIZED,
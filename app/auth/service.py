@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from app.auth.models import User
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.auth.schemas import UserCreateModel
-from app.auth.utils import generate_password_hash
+from app.auth.utils import password_hasher
 from sqlalchemy.exc import IntegrityError
 
 
@@ -22,7 +22,7 @@ class UserService:
 
     async def create_user(self, user_data: UserCreateModel, session: AsyncSession) -> User:
         new_user = User(**user_data.model_dump())
-        new_user.password_hash = generate_password_hash(user_data.password)
+        new_user.password_hash = await password_hasher.hash(user_data.password)
         session.add(new_user)
         try:
             await session.commit()
@@ -1,6 +1,11 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from app.common.cache import TTLCache
 from app.config import Config
 import jwt
 import uuid
@@ -8,14 +13,98 @@ import logging
 
 JWT_ACCESS_TOKEN_EXPIRE_SECONDS = Config.JWT_ACCESS_TOKEN_EXPIRE_SECONDS
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def password_context():
+    # passlib (and bcrypt behind it) is only needed once someone signs up or
+    # signs in, so it is not imported while a worker starts.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Verified token claims keyed by sha256(token); entries never outlive the token's exp.
+verified_token_cache = TTLCache(max_size=Config.JWT_CACHE_SIZE, ttl_seconds=Config.JWT_CACHE_TTL_SECONDS)
 
 def generate_password_hash(password: str) -> str:
-    hash = password_context.hash(password)
+    hash = password_context().hash(password)
     return hash
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
+
+
+class PasswordHashingBusyError(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    At most ``max_workers`` hashes run at once and at most ``max_queue`` more may
+    wait; beyond that calls fail fast with ``PasswordHashingBusyError``.
+    Counters are only touched from the event loop thread, so no locking is needed.
+    The thread pool is created on first use, so a hasher shut down with one
+    lifespan works again in the next one (tests, reloads, benchmarks).
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def _run(self, func, *args):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusyError("Too many concurrent password operations, please retry")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bookly-bcrypt")
+        self.in_flight += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(generate_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=Config.PASSWORD_HASH_WORKERS,
+    max_queue=Config.PASSWORD_HASH_MAX_QUEUE,
+)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, refresh: bool = False) -> str:
     payload = {}
@@ -28,8 +117,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, r
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = verified_token_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(jwt=token, key=Config.JWT_SECRET, algorithms=[Config.JWT_ALGORITHM])
+        exp = payload.get("exp")
+        if exp is not None:
+            verified_token_cache.set(cache_key, payload, ttl_seconds=exp - time.time())
         return payload
     except jwt.ExpiredSignatureError:
         logging.error("Token has expired")
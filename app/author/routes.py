@@ -1,14 +1,19 @@
 from typing import List
 import uuid
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.auth.dependencies import AccessTokenBearer
 from app.author.schemas import Author, AuthorCreate, AuthorUpdate
+from app.books.schemas import AuthorWithBooks
 from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, list_etag, not_modified
+from app.common.include import parse_include
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.common.responses import api_response
 from app.common.schemas import APIResponse
-from app.author.service import AuthorService
+from app.author.service import AUTHOR_INCLUDES, AuthorService, author_version
 from app.db.main import get_session
 
 
@@ -16,18 +21,51 @@ author_router = APIRouter()
 author_service = AuthorService()
 access_token_bearer = AccessTokenBearer()
 
-@author_router.get("/", response_model=APIResponse[List[Author]])
+@author_router.get("/", response_model=APIResponse[List[AuthorWithBooks]])
 async def read_authors(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include: str | None = Query(None, description="Comma-separated relations to embed: books"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    authors = await author_service.get_all_authors(session)
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    try:
+        relations = parse_include(include, AUTHOR_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Authors could not be fetched",
+            details=str(exc),
+        )
+    response_type = AuthorWithBooks if relations else Author
+    etag = None
+    try:
+        if request.headers.get("if-none-match"):
+            versions = await author_service.get_authors_version(session, limit=limit, cursor=cursor, include=relations)
+            etag = list_etag(request, versions[:limit], len(versions) > limit)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        authors, next_cursor = await author_service.get_all_authors(session, limit=limit, cursor=cursor, include=relations)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+            message="Authors could not be fetched",
+            details=str(exc),
+        )
+    if etag is None:
+        etag = list_etag(request, [author_version(author, relations) for author in authors], next_cursor is not None)
+    return api_response(
+        APIResponse[List[response_type]],
+        status_code=status.HTTP_200_OK,
         data=authors,
         message="Authors fetched successfully",
-        errors=None,
+        next_cursor=next_cursor,
+        headers={"ETag": etag},
     )
 
 
@@ -62,14 +100,26 @@ async def create_author(
     )
 
 
-@author_router.get("/{author_uid}", response_model=APIResponse[Author])
+@author_router.get("/{author_uid}", response_model=APIResponse[AuthorWithBooks])
 async def read_author(
     request: Request,
     author_uid: uuid.UUID,
+    include: str | None = Query(None, description="Comma-separated relations to embed: books"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    author = await author_service.get_author(author_uid, session)
+    try:
+        relations = parse_include(include, AUTHOR_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Author could not be fetched",
+            details=str(exc),
+        )
+    response_type = AuthorWithBooks if relations else Author
+    author = await author_service.get_author(author_uid, session, include=relations)
     if not author:
         return _error_response(
             request=request,
@@ -78,12 +128,15 @@ async def read_author(
             message="Author not found",
             details=f"No author exists with uid {author_uid}",
         )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = compute_etag(*author_version(author, relations))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return api_response(
+        APIResponse[response_type],
+        status_code=status.HTTP_200_OK,
         data=author,
         message="Author fetched successfully",
-        errors=None,
+        headers={"ETag": etag},
     )
 
 
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from app.common.schemas import StoredEmail
 
 
 class AuthorBase(BaseModel):
@@ -21,6 +22,7 @@ class AuthorUpdate(BaseModel):
 
 class Author(AuthorBase):
     uid: uuid.UUID
+    email: StoredEmail
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
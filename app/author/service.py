@@ -1,21 +1,80 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, desc
+from sqlmodel import select
+from sqlalchemy import func, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from typing import FrozenSet
 import uuid
 
 from app.author.models import Author
-from app.author.schemas import AuthorCreate, AuthorUpdate
+from app.books.models import Book
+from app.author.schemas import Author as AuthorSchema, AuthorCreate, AuthorUpdate
+from app.books.service import book_cache
+from app.common.cache import EntityCache
+from app.common.pagination import DEFAULT_PAGE_SIZE, apply_keyset, build_page
+
+
+author_cache = EntityCache("author", AuthorSchema)
+
+AUTHOR_INCLUDES = {"books": Author.books}
+
+
+def author_load_options(include: FrozenSet[str]) -> list:
+    return [selectinload(AUTHOR_INCLUDES[name]) for name in sorted(include)]
+
+
+def author_version(author, include: FrozenSet[str] = frozenset()) -> tuple:
+    """Same shape as a row of AuthorService.get_authors_version."""
+    if "books" not in include:
+        return (author.uid, author.updated_at)
+    newest = max((book.updated_at for book in author.books), default=None)
+    return (author.uid, author.updated_at, newest, len(author.books))
 
 
 class AuthorService:
 
-    async def get_all_authors(self, session: AsyncSession):
-        statement = select(Author).order_by(desc(Author.created_at))
+    async def get_all_authors(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include: FrozenSet[str] = frozenset(),
+    ):
+        statement = select(Author).options(*author_load_options(include))
+        statement = apply_keyset(statement, Author, limit, cursor)
+        result = await session.exec(statement)
+        return build_page(result.all(), limit)
+
+    async def get_authors_version(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include: FrozenSet[str] = frozenset(),
+    ):
+        """Version columns of the page get_all_authors would return, without loading the rows."""
+        if "books" in include:
+            # Adding, editing, moving or deleting a book changes either the
+            # newest updated_at or the count of its author's books.
+            statement = (
+                select(Author.uid, Author.updated_at, func.max(Book.updated_at), func.count(Book.uid))
+                .outerjoin(Book, Book.author_uid == Author.uid)
+                .group_by(Author.uid, Author.updated_at, Author.created_at)
+            )
+        else:
+            statement = select(Author.uid, Author.updated_at)
+        statement = apply_keyset(statement, Author, limit, cursor)
         result = await session.exec(statement)
         return result.all()
 
-    async def get_author(self, author_uid: uuid.UUID, session: AsyncSession):
-        statement = select(Author).where(Author.uid == author_uid)
+    async def get_author(self, author_uid: uuid.UUID, session: AsyncSession, include: FrozenSet[str] = frozenset()):
+        if include:
+            # Snapshots hold the author alone; embedded books are always read fresh.
+            return await self._get_author_row(author_uid, session, include=include)
+        return await author_cache.get_or_load(author_uid, lambda: self._get_author_row(author_uid, session))
+
+    async def _get_author_row(self, author_uid: uuid.UUID, session: AsyncSession, include: FrozenSet[str] = frozenset()):
+        statement = select(Author).options(*author_load_options(include)).where(Author.uid == author_uid)
         result = await session.exec(statement)
         author = result.first()
         return author if author else None
@@ -32,7 +91,7 @@ class AuthorService:
         return new_author
 
     async def update_author(self, author_uid: uuid.UUID, author_data: AuthorUpdate, session: AsyncSession):
-        author = await self.get_author(author_uid, session)
+        author = await self._get_author_row(author_uid, session)
         if not author:
             return None
 
@@ -46,17 +105,26 @@ class AuthorService:
             await session.rollback()
             raise ValueError("Author with this email already exists")
         await session.refresh(author)
+        await author_cache.invalidate(author_uid)
+        await book_cache.invalidate_all()
         return author
 
     async def delete_author(self, author_uid: uuid.UUID, session: AsyncSession):
-        author = await self.get_author(author_uid, session)
+        author = await self._get_author_row(author_uid, session)
         if not author:
             return False
 
+        # Books keep existing without a author; detach them in one statement
+        # rather than loading the collection.
+        await session.execute(
+            update(Book).where(Book.author_uid == author_uid).values(author_uid=None).execution_options(synchronize_session=False)
+        )
         await session.delete(author)
         try:
             await session.commit()
         except IntegrityError:
             await session.rollback()
             raise ValueError("Author cannot be deleted because it is referenced by other records")
+        await author_cache.invalidate(author_uid)
+        await book_cache.invalidate_all()
         return True
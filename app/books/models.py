@@ -1,17 +1,33 @@
 from sqlmodel import SQLModel, Field, Column, DateTime, Relationship
-import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import DDL, Index, Uuid, column, event
 from typing import Optional
 from datetime import datetime
 from app.author.models import Author
+from app.books.search import title_tsvector
 from app.publisher.models import Publisher
 import uuid
 
 
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_created_at_uid", "created_at", "uid"),
+        # Title search (app.books.search) only runs on Postgres.
+        Index(
+            "ix_books_title_tsv",
+            title_tsvector(column("title")),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_books_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             unique=True,
             index=True,
             nullable=False,
@@ -28,14 +44,25 @@ class Book(SQLModel, table=True):
     pages: Optional[int] = Field(None, gt=0)
     language: Optional[str] = Field(None, max_length=50)
     available_copies: int = Field(default=0, ge=0)
-    author: Optional[Author] = Relationship(back_populates="books", sa_relationship_kwargs={"lazy": "selectin"})
-    publisher: Optional[Publisher] = Relationship(back_populates="books", sa_relationship_kwargs={"lazy": "selectin"})
+    # Relationships are never loaded implicitly; services add loader options
+    # for what the caller asked for via include=.
+    author: Optional[Author] = Relationship(back_populates="books", sa_relationship_kwargs={"lazy": "raise"})
+    publisher: Optional[Publisher] = Relationship(back_populates="books", sa_relationship_kwargs={"lazy": "raise"})
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
     )
 
     def __repr__(self):
         return f"<Book {self.title} by {self.author}>"
+
+
+# pg_trgm provides gin_trgm_ops for ix_books_title_trgm; migration 8c3f6a1e7d25
+# creates it the same way for migrated databases.
+event.listen(
+    Book.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
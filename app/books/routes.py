@@ -2,11 +2,25 @@ from fastapi import APIRouter, status, Depends, Request, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 import uuid
-from app.db.main import get_session
-from app.books.service import BookService
-from app.books.schemas import Book, BookCreateModel, BookUpdateModel
+from app.db.main import async_session_maker, get_session
+from app.books.service import BOOK_EXPORT_COLUMNS, BOOK_FIELDS, BOOK_INCLUDES, BookService, book_version
+from app.books.schemas import (
+    Book,
+    BookBatchCreateRequest,
+    BookBatchDeleteRequest,
+    BookBatchItemResult,
+    BookBatchUpdateRequest,
+    BookCreateModel,
+    BookUpdateModel,
+)
 from app.auth.dependencies import AccessTokenBearer
 from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, list_etag, not_modified
+from app.common.export import export_response
+from app.common.fields import parse_fields, sparse_model
+from app.common.include import parse_include
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.common.responses import api_response
 from app.common.schemas import APIResponse
 
 
@@ -18,26 +32,78 @@ access_token_bearer = AccessTokenBearer()
 # Define API endpoints for book management
 @book_router.get("/", response_model=APIResponse[List[Book]])
 async def read_books(
+    request: Request,
     title: Optional[str] = Query(None, min_length=1, max_length=255),
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
     author_uid: Optional[uuid.UUID] = None,
     publisher_uid: Optional[uuid.UUID] = None,
     isbn: Optional[str] = Query(None, min_length=10, max_length=20),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: author, publisher"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. uid,title,available_copies"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    books = await book_service.get_all_books(
-        session=session,
+    try:
+        relations = parse_include(include, BOOK_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Books could not be fetched",
+            details=str(exc),
+        )
+    try:
+        selected = parse_fields(fields, BOOK_FIELDS)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_FIELDS",
+            message="Books could not be fetched",
+            details=str(exc),
+        )
+    # Included relations stay in a sparse response.
+    response_type = Book if selected is None else sparse_model(Book, selected | relations)
+    filters = dict(
         title=title,
         author_uid=author_uid,
         publisher_uid=publisher_uid,
         isbn=isbn,
+        limit=limit,
+        cursor=cursor,
+        q=q,
+        include=relations,
     )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = None
+    try:
+        if request.headers.get("if-none-match"):
+            # Conditional poll: compare against the page's version columns
+            # before loading or serializing any books.
+            versions = await book_service.get_books_version(session=session, **filters)
+            etag = list_etag(request, versions[:limit], len(versions) > limit)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        books, next_cursor = await book_service.get_all_books(session=session, fields=selected, **filters)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+            message="Books could not be fetched",
+            details=str(exc),
+        )
+    if etag is None:
+        etag = list_etag(request, [book_version(book) for book in books], next_cursor is not None)
+    return api_response(
+        APIResponse[List[response_type]],
+        status_code=status.HTTP_200_OK,
         data=books,
         message="Books fetched successfully",
-        errors=None,
+        next_cursor=next_cursor,
+        headers={"ETag": etag},
     )
 
 @book_router.post("/", status_code=status.HTTP_201_CREATED, response_model=APIResponse[Book], dependencies=[Depends(access_token_bearer)])
@@ -61,9 +127,115 @@ async def create_book(request: Request, book: BookCreateModel, session: AsyncSes
     )
 
 
+# Batch routes are registered before "/{book_uid}" so "batch" is not parsed as a uid.
+@book_router.post("/batch", status_code=status.HTTP_200_OK, response_model=APIResponse[List[BookBatchItemResult]])
+async def create_books_batch(request: Request, payload: BookBatchCreateRequest, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+    try:
+        results = await book_service.create_books(payload.items, session)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="BOOK_CONFLICT",
+            message="Book batch could not be created",
+            details=str(exc),
+        )
+    return APIResponse(
+        status="success",
+        statusCode=status.HTTP_200_OK,
+        data=results,
+        message="Book batch processed",
+        errors=None,
+    )
+
+
+@book_router.patch("/batch", status_code=status.HTTP_200_OK, response_model=APIResponse[List[BookBatchItemResult]])
+async def update_books_batch(request: Request, payload: BookBatchUpdateRequest, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+    try:
+        results = await book_service.update_books(payload.items, session)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="BOOK_CONFLICT",
+            message="Book batch could not be updated",
+            details=str(exc),
+        )
+    return APIResponse(
+        status="success",
+        statusCode=status.HTTP_200_OK,
+        data=results,
+        message="Book batch processed",
+        errors=None,
+    )
+
+
+@book_router.delete("/batch", status_code=status.HTTP_200_OK, response_model=APIResponse[List[BookBatchItemResult]])
+async def delete_books_batch(request: Request, payload: BookBatchDeleteRequest, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
+    try:
+        results = await book_service.delete_books(payload.uids, session)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="BOOK_CONFLICT",
+            message="Book batch could not be deleted",
+            details=str(exc),
+        )
+    return APIResponse(
+        status="success",
+        statusCode=status.HTTP_200_OK,
+        data=results,
+        message="Book batch processed",
+        errors=None,
+    )
+
+
+# Registered before "/{book_uid}" for the same reason as the batch routes.
+@book_router.get("/export")
+async def export_books(
+    title: Optional[str] = Query(None, min_length=1, max_length=255),
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
+    author_uid: Optional[uuid.UUID] = None,
+    publisher_uid: Optional[uuid.UUID] = None,
+    isbn: Optional[str] = Query(None, min_length=10, max_length=20),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    token_details: dict = Depends(access_token_bearer),
+):
+    async def batches():
+        async with async_session_maker() as session:
+            async for rows in book_service.stream_books(
+                session,
+                title=title,
+                author_uid=author_uid,
+                publisher_uid=publisher_uid,
+                isbn=isbn,
+                q=q,
+            ):
+                yield rows
+
+    return export_response(batches(), BOOK_EXPORT_COLUMNS, export_format, "books")
+
+
 @book_router.get("/{book_uid}", response_model=APIResponse[Book])
-async def read_book(request: Request, book_uid: uuid.UUID, session: AsyncSession = Depends(get_session), token_details: dict = Depends(access_token_bearer)):
-    book = await book_service.get_book(book_uid, session)
+async def read_book(
+    request: Request,
+    book_uid: uuid.UUID,
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: author, publisher"),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    try:
+        relations = parse_include(include, BOOK_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Book could not be fetched",
+            details=str(exc),
+        )
+    book = await book_service.get_book(book_uid, session, include=relations)
     if not book:
         return _error_response(
             request=request,
@@ -72,12 +244,15 @@ async def read_book(request: Request, book_uid: uuid.UUID, session: AsyncSession
             message="Book not found",
             details=f"No book exists with uid {book_uid}",
         )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = compute_etag(*book_version(book))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return api_response(
+        APIResponse[Book],
+        status_code=status.HTTP_200_OK,
         data=book,
         message="Book fetched successfully",
-        errors=None,
+        headers={"ETag": etag},
     )
 
 
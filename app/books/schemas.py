@@ -49,3 +49,53 @@ class BookForLoan(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BookSummary(BaseModel):
+    uid: uuid.UUID
+    title: str
+    isbn: str
+    author_uid: Optional[uuid.UUID] = None
+    publisher_uid: Optional[uuid.UUID] = None
+    available_copies: int
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class AuthorWithBooks(Author):
+    """Author response when the caller asked for ``include=books``."""
+    books: List[BookSummary] = []
+
+
+class PublisherWithBooks(Publisher):
+    """Publisher response when the caller asked for ``include=books``."""
+    books: List[BookSummary] = []
+
+
+MAX_BATCH_SIZE = 1000
+
+
+class BookBatchUpdateItem(BookUpdateModel):
+    uid: uuid.UUID
+
+
+class BookBatchCreateRequest(BaseModel):
+    items: List[BookCreateModel] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BookBatchUpdateRequest(BaseModel):
+    items: List[BookBatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BookBatchDeleteRequest(BaseModel):
+    uids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BookBatchItemResult(BaseModel):
+    index: int
+    status: str
+    uid: Optional[uuid.UUID] = None
+    isbn: Optional[str] = None
+    detail: Optional[str] = None
@@ -0,0 +1,67 @@
+import re
+from typing import Optional
+
+from sqlalchemy import and_, func, literal_column, or_
+# Registers the typed to_tsvector()/to_tsquery() behind func.*; SQLAlchemy 2.1
+# refuses to compile ones built before the dialect was imported, as the
+# ix_books_title_tsv expression is at model import.
+import sqlalchemy.dialects.postgresql  # noqa: F401
+
+
+# Must match the expression used by the ix_books_title_tsv index, otherwise
+# Postgres will not pick the index for the @@ match.
+TSVECTOR_CONFIG = literal_column("'simple'")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(q: str) -> Optional[str]:
+    """Turn free text into a prefix-matching tsquery, e.g. ``"harry pot"`` -> ``"harry:* & pot:*"``."""
+    tokens = _TOKEN_RE.findall(q.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def title_tsvector(column):
+    return func.to_tsvector(TSVECTOR_CONFIG, column)
+
+
+def _word_prefix_clause(column, q: str):
+    # Portable stand-in for databases without full-text search: every word of
+    # q must start a word of the title. Served by no index, fine for SQLite.
+    tokens = _TOKEN_RE.findall(q.lower())
+    if not tokens:
+        return column.icontains(q, autoescape=True)
+    return and_(*(
+        or_(column.istartswith(token, autoescape=True), column.icontains(f" {token}", autoescape=True))
+        for token in tokens
+    ))
+
+
+def title_search_clause(column, q: str, full_text: bool = True):
+    """Full-text prefix match OR trigram similarity, both served by GIN indexes.
+
+    ``full_text=False`` falls back to word-prefix LIKE matching.
+    """
+    if not full_text:
+        return _word_prefix_clause(column, q)
+    trigram_match = column.op("%")(q)
+    tsquery = build_prefix_tsquery(q)
+    if tsquery is None:
+        return trigram_match
+    return or_(
+        title_tsvector(column).op("@@")(func.to_tsquery(TSVECTOR_CONFIG, tsquery)),
+        trigram_match,
+    )
+
+
+def title_search_rank(column, q: str, full_text: bool = True):
+    if not full_text:
+        # Among titles that contain every word, shorter ones are closer matches.
+        return -func.length(column)
+    rank = func.similarity(column, q)
+    tsquery = build_prefix_tsquery(q)
+    if tsquery is not None:
+        rank = rank + func.ts_rank_cd(title_tsvector(column), func.to_tsquery(TSVECTOR_CONFIG, tsquery))
+    return rank
@@ -1,27 +1,70 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from app.books.schemas import BookCreateModel, BookUpdateModel
+from app.books.schemas import Book as BookSchema, BookBatchItemResult, BookBatchUpdateItem, BookCreateModel, BookUpdateModel
 from app.books.models import Book
+from app.author.models import Author
+from app.publisher.models import Publisher
+from app.books.search import title_search_clause, title_search_rank
+from app.common.cache import EntityCache
+from app.common.export import EXPORT_BATCH_SIZE
+from app.common.fields import column_fields, load_only_columns
+from app.common.include import omit_relations
+from app.common.pagination import DEFAULT_PAGE_SIZE, apply_keyset, build_page
+from app.db.capabilities import capabilities, upsert_insert
 from sqlmodel import select, desc
+from sqlalchemy import Row, Uuid, bindparam, column, delete, null, table, update, values
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 import uuid
 
 
+# Lightweight handle on loans so the book service does not import the loan models.
+# The column is typed so SQLite's hex strings come back as uuid.UUID.
+loans_table = table("loans", column("book_uid", Uuid(as_uuid=True)))
+
+book_cache = EntityCache("book", BookSchema)
+
+# Relations a caller may ask for with include=, and columns with fields=.
+BOOK_INCLUDES = {"author": Book.author, "publisher": Book.publisher}
+BOOK_FIELDS = column_fields(Book)
+BOOK_EXPORT_COLUMNS = list(Book.__table__.columns.keys())
+
+
+def book_load_options(include: FrozenSet[str]) -> list:
+    return [selectinload(BOOK_INCLUDES[name]) for name in sorted(include)]
+
+
+def book_version(book) -> Tuple:
+    """Same shape as a row of BookService.get_books_version, for ORM rows and cached snapshots.
+
+    Relations that were not included are None on both sides.
+    """
+    return (
+        book.uid,
+        book.updated_at,
+        book.author.updated_at if book.author else None,
+        book.publisher.updated_at if book.publisher else None,
+    )
+
+
 class BookService:
 
     # def __init__(self, book_repository):
     #     self.book_repository = book_repository
 
-    async def get_all_books(
+    def _filter_books(
         self,
-        session: AsyncSession,
-        title: Optional[str] = None,
-        author_uid: Optional[uuid.UUID] = None,
-        publisher_uid: Optional[uuid.UUID] = None,
-        isbn: Optional[str] = None,
+        statement,
+        title: Optional[str],
+        author_uid: Optional[uuid.UUID],
+        publisher_uid: Optional[uuid.UUID],
+        isbn: Optional[str],
+        q: Optional[str],
+        full_text: bool = True,
     ):
-        # return self.book_repository.get_all_books(session)
-        statement = select(Book).order_by(desc(Book.created_at))
+        if q:
+            statement = statement.where(title_search_clause(Book.title, q, full_text))
         if title:
             statement = statement.where(Book.title.ilike(f"%{title}%"))
         if author_uid:
@@ -30,15 +73,128 @@ class BookService:
             statement = statement.where(Book.publisher_uid == publisher_uid)
         if isbn:
             statement = statement.where(Book.isbn == isbn)
+        return statement
+
+    def _list_statement(
+        self,
+        statement,
+        title: Optional[str],
+        author_uid: Optional[uuid.UUID],
+        publisher_uid: Optional[uuid.UUID],
+        isbn: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+        q: Optional[str],
+        full_text: bool = True,
+    ):
+        # Shared by get_all_books and get_books_version so both see the same page.
+        statement = self._filter_books(statement, title, author_uid, publisher_uid, isbn, q, full_text)
+        if q:
+            # Relevance-ranked search returns the best `limit` matches; there is
+            # no stable keyset to resume from, so cursors are not supported.
+            if cursor:
+                raise ValueError("Cursor pagination is not supported together with q")
+            return statement.order_by(desc(title_search_rank(Book.title, q, full_text)), desc(Book.uid)).limit(limit)
+        return apply_keyset(statement, Book, limit, cursor)
+
+    async def get_all_books(
+        self,
+        session: AsyncSession,
+        title: Optional[str] = None,
+        author_uid: Optional[uuid.UUID] = None,
+        publisher_uid: Optional[uuid.UUID] = None,
+        isbn: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        include: FrozenSet[str] = frozenset(),
+        fields: Optional[FrozenSet[str]] = None,
+    ):
+        # return self.book_repository.get_all_books(session)
+        statement = select(Book).options(*book_load_options(include))
+        if fields is not None:
+            statement = statement.options(load_only_columns(Book, fields))
+        statement = self._list_statement(
+            statement, title, author_uid, publisher_uid, isbn, limit, cursor, q, capabilities(session).full_text_search
+        )
+        result = await session.exec(statement)
+        books = result.all()
+        omit_relations(books, BOOK_INCLUDES.keys() - include)
+        if q:
+            return books, None
+        return build_page(books, limit)
+
+    async def get_books_version(
+        self,
+        session: AsyncSession,
+        title: Optional[str] = None,
+        author_uid: Optional[uuid.UUID] = None,
+        publisher_uid: Optional[uuid.UUID] = None,
+        isbn: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        include: FrozenSet[str] = frozenset(),
+    ):
+        """Version columns of the page get_all_books would return, without loading the books.
+
+        Included author/publisher timestamps are part of the version because
+        their changes alter the response body without touching books.updated_at.
+        """
+        statement = select(
+            Book.uid,
+            Book.updated_at,
+            Author.updated_at if "author" in include else null(),
+            Publisher.updated_at if "publisher" in include else null(),
+        )
+        if "author" in include:
+            statement = statement.outerjoin(Author, Book.author_uid == Author.uid)
+        if "publisher" in include:
+            statement = statement.outerjoin(Publisher, Book.publisher_uid == Publisher.uid)
+        statement = self._list_statement(
+            statement, title, author_uid, publisher_uid, isbn, limit, cursor, q, capabilities(session).full_text_search
+        )
         result = await session.exec(statement)
         return result.all()
 
-    async def get_book(self, book_uid: str, session: AsyncSession):
+    async def stream_books(
+        self,
+        session: AsyncSession,
+        title: Optional[str] = None,
+        author_uid: Optional[uuid.UUID] = None,
+        publisher_uid: Optional[uuid.UUID] = None,
+        isbn: Optional[str] = None,
+        q: Optional[str] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield every matching books row in batches from a server-side cursor, newest first."""
+        statement = self._filter_books(
+            select(*Book.__table__.columns), title, author_uid, publisher_uid, isbn, q, capabilities(session).full_text_search
+        )
+        statement = statement.order_by(desc(Book.created_at), desc(Book.uid)).execution_options(yield_per=batch_size)
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_book(self, book_uid: str, session: AsyncSession, include: FrozenSet[str] = frozenset()):
         # return self.book_repository.get_book_by_id(book_id, session)
-        statement = select(Book).where(Book.uid == book_uid)
+        # The cached snapshot always carries every relation; drop the ones not asked for.
+        book = await book_cache.get_or_load(
+            book_uid, lambda: self._get_book_row(book_uid, session, include=frozenset(BOOK_INCLUDES))
+        )
+        excluded = BOOK_INCLUDES.keys() - include
+        if book is None or not excluded:
+            return book
+        return book.model_copy(update={name: None for name in excluded})
+
+    async def _get_book_row(self, book_uid: str, session: AsyncSession, include: FrozenSet[str] = frozenset()):
+        statement = select(Book).options(*book_load_options(include)).where(Book.uid == book_uid)
         result = await session.exec(statement)
         book = result.first()
-        return book if book else None
+        if not book:
+            return None
+        omit_relations([book], BOOK_INCLUDES.keys() - include)
+        return book
     
     async def create_book(self, book_data: BookCreateModel, session: AsyncSession):
         # return self.book_repository.create_book(book_data, session)
@@ -55,11 +211,12 @@ class BookService:
             await session.rollback()
             raise ValueError("Book data conflicts with existing records")
         await session.refresh(new_book)
+        omit_relations([new_book], BOOK_INCLUDES)
         return new_book
 
     async def update_book(self, book_uid: str, book_data: BookUpdateModel, session: AsyncSession):
         # return self.book_repository.update_book(book_id, book_data, session)
-        book = await self.get_book(book_uid, session)
+        book = await self._get_book_row(book_uid, session)
         if not book:
             return None
         for key, value in book_data.model_dump(exclude_unset=True).items():
@@ -71,11 +228,13 @@ class BookService:
             await session.rollback()
             raise ValueError("Book data conflicts with existing records")
         await session.refresh(book)
+        omit_relations([book], BOOK_INCLUDES)
+        await book_cache.invalidate(book_uid)
         return book
     
     async def delete_book(self, book_uid: str, session: AsyncSession):
         # return self.book_repository.delete_book(book_id, session)
-        book = await self.get_book(book_uid, session)
+        book = await self._get_book_row(book_uid, session)
         if not book:
             return False
         await session.delete(book)
@@ -84,4 +243,165 @@ class BookService:
         except IntegrityError:
             await session.rollback()
             raise ValueError("Book cannot be deleted because it is referenced by other records")
+        await book_cache.invalidate(book_uid)
         return True
+
+    async def _existing_uids(self, model, uids: Iterable[uuid.UUID], session: AsyncSession) -> Set[uuid.UUID]:
+        uids = {uid for uid in uids if uid}
+        if not uids:
+            return set()
+        result = await session.exec(select(model.uid).where(model.uid.in_(uids)))
+        return set(result.all())
+
+    async def create_books(self, books_data: List[BookCreateModel], session: AsyncSession) -> List[BookBatchItemResult]:
+        """Insert a batch with one multi-row INSERT ... ON CONFLICT (isbn) DO NOTHING."""
+        known_authors = await self._existing_uids(Author, (book.author_uid for book in books_data), session)
+        known_publishers = await self._existing_uids(Publisher, (book.publisher_uid for book in books_data), session)
+
+        results: List[Optional[BookBatchItemResult]] = [None] * len(books_data)
+        rows: List[Tuple[int, dict]] = []
+        now = datetime.now()
+        for index, book_data in enumerate(books_data):
+            if book_data.author_uid not in known_authors:
+                results[index] = BookBatchItemResult(index=index, status="invalid", isbn=book_data.isbn, detail="Author not found")
+                continue
+            if book_data.publisher_uid and book_data.publisher_uid not in known_publishers:
+                results[index] = BookBatchItemResult(index=index, status="invalid", isbn=book_data.isbn, detail="Publisher not found")
+                continue
+            row = book_data.model_dump()
+            row.update(uid=uuid.uuid4(), created_at=now, updated_at=now)
+            rows.append((index, row))
+
+        created: Set[uuid.UUID] = set()
+        if rows:
+            statement = (
+                upsert_insert(session, Book)
+                .values([row for _, row in rows])
+                .on_conflict_do_nothing(index_elements=["isbn"])
+                .returning(Book.uid)
+            )
+            try:
+                result = await session.execute(statement)
+                created = set(result.scalars().all())
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                raise ValueError("Book batch conflicts with existing records")
+
+        for index, row in rows:
+            if row["uid"] in created:
+                results[index] = BookBatchItemResult(index=index, status="created", uid=row["uid"], isbn=row["isbn"])
+            else:
+                results[index] = BookBatchItemResult(
+                    index=index, status="conflict", isbn=row["isbn"], detail=f"Book with ISBN '{row['isbn']}' already exists"
+                )
+        return results
+
+    async def update_books(self, items: List[BookBatchUpdateItem], session: AsyncSession) -> List[BookBatchItemResult]:
+        """Apply partial updates with one UPDATE ... FROM (VALUES ...) per distinct set of changed columns."""
+        existing = await self._existing_uids(Book, (item.uid for item in items), session)
+        known_authors = await self._existing_uids(Author, (item.author_uid for item in items), session)
+        known_publishers = await self._existing_uids(Publisher, (item.publisher_uid for item in items), session)
+        wanted_isbns = {item.isbn for item in items if item.isbn}
+        isbn_owners: Dict[str, uuid.UUID] = {}
+        if wanted_isbns:
+            owners = await session.exec(select(Book.isbn, Book.uid).where(Book.isbn.in_(wanted_isbns)))
+            isbn_owners = dict(owners.all())
+
+        results: List[Optional[BookBatchItemResult]] = [None] * len(items)
+        groups: Dict[Tuple[str, ...], List[Tuple[int, uuid.UUID, dict]]] = {}
+        seen: Set[uuid.UUID] = set()
+        for index, item in enumerate(items):
+            changes = item.model_dump(exclude_unset=True, exclude={"uid"})
+            isbn = changes.get("isbn")
+            detail = None
+            status = "invalid"
+            if item.uid not in existing:
+                status, detail = "not_found", f"No book exists with uid {item.uid}"
+            elif item.uid in seen:
+                detail = "Book uid appears more than once in the batch"
+            elif isbn and isbn_owners.get(isbn, item.uid) != item.uid:
+                status, detail = "conflict", f"Book with ISBN '{isbn}' already exists"
+            elif changes.get("author_uid") and changes["author_uid"] not in known_authors:
+                detail = "Author not found"
+            elif changes.get("publisher_uid") and changes["publisher_uid"] not in known_publishers:
+                detail = "Publisher not found"
+            if detail:
+                results[index] = BookBatchItemResult(index=index, status=status, uid=item.uid, isbn=isbn, detail=detail)
+                continue
+            seen.add(item.uid)
+            if isbn:
+                isbn_owners[isbn] = item.uid
+            results[index] = BookBatchItemResult(index=index, status="updated", uid=item.uid, isbn=isbn)
+            if changes:
+                groups.setdefault(tuple(sorted(changes)), []).append((index, item.uid, changes))
+
+        book_columns = Book.__table__.c
+        update_from_values = capabilities(session).update_from_values
+        try:
+            for names, group in groups.items():
+                if not update_from_values:
+                    # One cached UPDATE ... WHERE uid = ? run for every row of the group.
+                    statement = (
+                        update(Book.__table__)
+                        .where(book_columns.uid == bindparam("b_uid"))
+                        .values({name: bindparam(name) for name in names})
+                    )
+                    await session.execute(statement, [{"b_uid": uid, **changes} for _, uid, changes in group])
+                    continue
+                batch = values(
+                    column("uid", book_columns.uid.type),
+                    *(column(name, book_columns[name].type) for name in names),
+                    name="batch",
+                ).data([(uid, *(changes[name] for name in names)) for _, uid, changes in group])
+                statement = (
+                    update(Book)
+                    .where(Book.uid == batch.c.uid)
+                    .values({name: batch.c[name] for name in names})
+                    .execution_options(synchronize_session=False)
+                )
+                await session.execute(statement)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise ValueError("Book batch conflicts with existing records")
+        for group in groups.values():
+            for _, uid, _ in group:
+                await book_cache.invalidate(uid)
+        return results
+
+    async def delete_books(self, book_uids: List[uuid.UUID], session: AsyncSession) -> List[BookBatchItemResult]:
+        existing = await self._existing_uids(Book, book_uids, session)
+        referenced: Set[uuid.UUID] = set()
+        if existing:
+            referenced_result = await session.exec(
+                select(loans_table.c.book_uid).where(loans_table.c.book_uid.in_(existing)).distinct()
+            )
+            referenced = set(referenced_result.all())
+
+        results: List[BookBatchItemResult] = []
+        deletable: Set[uuid.UUID] = set()
+        for index, book_uid in enumerate(book_uids):
+            if book_uid not in existing:
+                results.append(BookBatchItemResult(index=index, status="not_found", uid=book_uid, detail=f"No book exists with uid {book_uid}"))
+            elif book_uid in referenced:
+                results.append(BookBatchItemResult(
+                    index=index, status="conflict", uid=book_uid,
+                    detail="Book cannot be deleted because it is referenced by other records",
+                ))
+            else:
+                deletable.add(book_uid)
+                results.append(BookBatchItemResult(index=index, status="deleted", uid=book_uid))
+
+        if deletable:
+            try:
+                await session.execute(
+                    delete(Book).where(Book.uid.in_(deletable)).execution_options(synchronize_session=False)
+                )
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                raise ValueError("Book batch cannot be deleted because it is referenced by other records")
+            for book_uid in deletable:
+                await book_cache.invalidate(book_uid)
+        return results
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.config import Config
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a per-entry TTL.
+
+    Not thread-safe; it is meant to be used from the event loop thread.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class CacheBackend:
+    """Storage behind ``EntityCache``.
+
+    Backends that keep Python objects in process set ``stores_objects``; shared
+    backends (e.g. Redis) leave it False and receive JSON strings instead.
+    """
+
+    stores_objects = False
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self, prefix: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    stores_objects = True
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def clear(self, prefix: str) -> None:
+        for key in [key for key in self._cache.keys() if key.startswith(prefix)]:
+            self._cache.delete(key)
+
+
+class EntityCache:
+    """Read-through cache of response-schema snapshots keyed by entity uid.
+
+    Values are pydantic models, never ORM instances, so nothing cached is bound
+    to a session. Writers must call ``invalidate`` after committing. With the
+    in-process backend each worker has its own copy, so other workers may serve
+    a stale entry for up to ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        schema,
+        backend: Optional[CacheBackend] = None,
+        ttl_seconds: float = Config.ENTITY_CACHE_TTL_SECONDS,
+    ):
+        self.namespace = namespace
+        self.schema = schema
+        self.backend = backend or entity_cache_backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        entity_caches[namespace] = self
+
+    def _key(self, uid: Any) -> str:
+        return f"{self.namespace}:{uid}"
+
+    async def get_or_load(self, uid: Any, loader):
+        cached = await self.backend.get(self._key(uid))
+        if cached is not None:
+            self.hits += 1
+            return cached if self.backend.stores_objects else self.schema.model_validate_json(cached)
+        self.misses += 1
+        row = await loader()
+        if row is None:
+            return None
+        snapshot = self.schema.model_validate(row, from_attributes=True)
+        value = snapshot if self.backend.stores_objects else snapshot.model_dump_json()
+        await self.backend.set(self._key(uid), value, self.ttl_seconds)
+        return snapshot
+
+    async def invalidate(self, uid: Any) -> None:
+        await self.backend.delete(self._key(uid))
+
+    async def invalidate_all(self) -> None:
+        await self.backend.clear(f"{self.namespace}:")
+
+    def stats(self) -> dict:
+        return {"namespace": self.namespace, "hits": self.hits, "misses": self.misses}
+
+
+entity_caches: Dict[str, EntityCache] = {}
+
+entity_cache_backend: CacheBackend = InMemoryCacheBackend(
+    max_size=Config.ENTITY_CACHE_SIZE,
+    ttl_seconds=Config.ENTITY_CACHE_TTL_SECONDS,
+)
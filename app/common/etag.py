@@ -0,0 +1,33 @@
+import hashlib
+from typing import Any, Iterable, Sequence
+
+from fastapi import Request, Response
+
+
+def compute_etag(*parts: Any) -> str:
+    """Strong ETag over the given version parts (uids, updated_at values, query string...)."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def list_etag(request: Request, versions: Iterable[Sequence[Any]], has_more: bool) -> str:
+    """ETag of one list page: the query string plus each item's version tuple.
+
+    ``has_more`` is part of the tag because it decides whether ``next_cursor`` is sent.
+    """
+    return compute_etag(request.url.query, [tuple(version) for version in versions], has_more)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix still matches.
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,57 @@
+import csv
+import io
+from typing import AsyncIterator, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy import Row
+
+
+EXPORT_BATCH_SIZE = 1000
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _ndjson_batch(rows: Sequence[Row]) -> bytes:
+    return b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+
+
+def _csv_line(values) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _csv_batch(rows: Sequence[Row]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def _encode(batches: AsyncIterator[Sequence[Row]], columns: List[str], export_format: str) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        # The header goes out before the query runs, so clients see the first byte at once.
+        yield _csv_line(columns)
+        async for rows in batches:
+            yield _csv_batch(rows)
+    else:
+        async for rows in batches:
+            yield _ndjson_batch(rows)
+
+
+def export_response(
+    batches: AsyncIterator[Sequence[Row]],
+    columns: List[str],
+    export_format: str,
+    filename: str,
+) -> StreamingResponse:
+    """Stream ``batches`` of rows as NDJSON or CSV; only one batch is held in memory at a time.
+
+    ``batches`` must own its database session: the request's session is closed
+    before a streaming body starts.
+    """
+    return StreamingResponse(
+        _encode(batches, columns, export_format),
+        media_type=_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
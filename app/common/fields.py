@@ -0,0 +1,51 @@
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only
+
+
+# Always part of a sparse response.
+REQUIRED_FIELDS = frozenset({"uid"})
+# Always fetched even when not returned: keyset cursors need created_at and
+# ETags need updated_at, and touching an unloaded column would lazy-load it.
+ALWAYS_LOADED = frozenset({"uid", "created_at", "updated_at"})
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[FrozenSet[str]]:
+    """Split ``fields=uid,title`` into field names; None means "all fields"."""
+    if not fields:
+        return None
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    allowed = frozenset(allowed)
+    unknown = names - allowed
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed values: {', '.join(sorted(allowed))}"
+        )
+    return names | REQUIRED_FIELDS
+
+
+def column_fields(model) -> FrozenSet[str]:
+    return frozenset(model.__table__.columns.keys())
+
+
+def load_only_columns(model, fields: FrozenSet[str]):
+    """``load_only`` option for the requested columns, so unrequested ones (e.g. long text) are never selected."""
+    columns = (fields & column_fields(model)) | ALWAYS_LOADED
+    return load_only(*(getattr(model, name) for name in sorted(columns)))
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """A copy of ``schema`` restricted to ``fields``; cached so each fieldset builds its validator once."""
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
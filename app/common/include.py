@@ -0,0 +1,31 @@
+from typing import FrozenSet, Iterable, Optional
+
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def parse_include(include: Optional[str], allowed: Iterable[str]) -> FrozenSet[str]:
+    """Split ``include=author,publisher`` into relation names, rejecting unknown ones."""
+    if not include:
+        return frozenset()
+    names = frozenset(name.strip() for name in include.split(",") if name.strip())
+    allowed = frozenset(allowed)
+    unknown = names - allowed
+    if unknown:
+        raise ValueError(
+            f"Unknown include: {', '.join(sorted(unknown))}. Allowed values: {', '.join(sorted(allowed))}"
+        )
+    return names
+
+
+def omit_relations(rows: Iterable, relations: Iterable[str]) -> None:
+    """Set relations that were not included to None on loaded ORM rows.
+
+    Relationships are ``lazy="raise"``, so a response that reads one which was
+    not loaded fails loudly; the ones left out of include= render as null.
+    """
+    relations = tuple(relations)
+    if not relations:
+        return
+    for row in rows:
+        for name in relations:
+            set_committed_value(row, name, None)
@@ -1,7 +1,11 @@
+import atexit
+import copy
 import json
 import logging
+import queue
+import random
 from contextvars import ContextVar
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
@@ -39,24 +43,106 @@ class JsonFormatter(logging.Formatter):
             "path": getattr(record, "path", None),
             "status_code": getattr(record, "status_code", None),
             "duration_ms": getattr(record, "duration_ms", None),
+            "db_queries": getattr(record, "db_queries", None),
+            "db_rows": getattr(record, "db_rows", None),
+            "db_time_ms": getattr(record, "db_time_ms", None),
             "error_code": getattr(record, "error_code", None),
             "error_message": getattr(record, "error_message", None),
             "error_details": getattr(record, "error_details", None),
+            "repeated_statement": getattr(record, "repeated_statement", None),
+            "repeated_count": getattr(record, "repeated_count", None),
         }
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
         return json.dumps(payload, default=str)
 
 
-def setup_logging(log_dir: str = "logs") -> logging.Logger:
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to a background listener instead of writing them inline.
+
+    When the queue is full, records below ERROR are dropped (and counted) unless
+    ``block`` is set; errors always wait for room so they are never lost.
+    Waiting only happens while a listener drains the queue: with the listener
+    stopped (between lifespans) a full queue drops every record instead of
+    blocking the caller forever.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block: bool = False):
+        super().__init__(log_queue)
+        self.block = block
+        self.draining = False
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve the message here; JSON formatting (including exc_info)
+        # happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.draining and (self.block or record.levelno >= logging.ERROR):
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[BoundedQueueHandler] = None
+_queue_listener: Optional[QueueListener] = None
+_success_sample_rate = 1.0
+_sampled_out = 0
+
+
+def should_log_success() -> bool:
+    """Sampling decision for successful-request log lines; errors are always logged."""
+    global _sampled_out
+    if _success_sample_rate >= 1.0 or random.random() < _success_sample_rate:
+        return True
+    _sampled_out += 1
+    return False
+
+
+def get_logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "sampled_out": _sampled_out,
+    }
+
+
+def start_logging() -> None:
+    """(Re)start the listener thread; a no-op while it is running."""
+    if _queue_listener is not None and not _queue_handler.draining:
+        _queue_listener.start()
+        _queue_handler.draining = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread; ``start_logging`` resumes it."""
+    if _queue_listener is not None and _queue_handler.draining:
+        _queue_handler.draining = False
+        _queue_listener.stop()
+
+
+def setup_logging(
+    log_dir: str = "logs",
+    queue_size: int = 10000,
+    block_when_full: bool = False,
+    success_sample_rate: float = 1.0,
+) -> logging.Logger:
+    global _queue_handler, _queue_listener, _success_sample_rate
     logger = logging.getLogger("bookly")
     if logger.handlers:
+        start_logging()
         return logger
 
     Path(log_dir).mkdir(parents=True, exist_ok=True)
 
     formatter = JsonFormatter()
-    context_filter = RequestContextFilter()
 
     app_handler = TimedRotatingFileHandler(
         filename=str(Path(log_dir) / "app.log"),
@@ -68,7 +154,6 @@ def setup_logging(log_dir: str = "logs") -> logging.Logger:
     )
     app_handler.setLevel(logging.INFO)
     app_handler.setFormatter(formatter)
-    app_handler.addFilter(context_filter)
 
     error_handler = TimedRotatingFileHandler(
         filename=str(Path(log_dir) / "error.log"),
@@ -80,10 +165,19 @@ def setup_logging(log_dir: str = "logs") -> logging.Logger:
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    error_handler.addFilter(context_filter)
+
+    # The request id lives in a contextvar, so it must be captured on the
+    # calling thread before the record is queued.
+    _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), block=block_when_full)
+    _queue_handler.addFilter(RequestContextFilter())
+    _queue_listener = QueueListener(
+        _queue_handler.queue, app_handler, error_handler, respect_handler_level=True
+    )
+    start_logging()
+    atexit.register(shutdown_logging)
+    _success_sample_rate = success_sample_rate
 
     logger.setLevel(logging.INFO)
-    logger.addHandler(app_handler)
-    logger.addHandler(error_handler)
+    logger.addHandler(_queue_handler)
     logger.propagate = False
     return logger
@@ -0,0 +1,93 @@
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+# Seconds; the implicit +Inf bucket is added when rendering.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+class RequestMetrics:
+    """Per-route latency histograms, status counters and an in-flight gauge.
+
+    Routes are keyed by their template (``/api/v1/books/{book_uid}``) so label
+    cardinality stays bounded. Updated from the event loop thread only; each
+    worker process keeps its own numbers.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        # (method, route) -> [per-bucket counts (last one is +Inf), sum, count]
+        self._durations: Dict[Tuple[str, str], list] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status_code: int, duration_seconds: float) -> None:
+        self.in_flight -= 1
+        key = (method, route)
+        series = self._durations.get(key)
+        if series is None:
+            series = self._durations[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, duration_seconds)] += 1
+        series[1] += duration_seconds
+        series[2] += 1
+        status_key = (method, route, status_code)
+        self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def render(
+        self,
+        gauges: Optional[Mapping[str, Tuple[str, float]]] = None,
+        counters: Optional[Mapping[str, Tuple[str, float]]] = None,
+    ) -> str:
+        """Prometheus text exposition format (version 0.0.4).
+
+        ``gauges`` and ``counters`` map extra metric names to ``(help, value)``.
+        """
+        lines: List[str] = [
+            "# HELP bookly_http_request_duration_seconds Request latency by route template.",
+            "# TYPE bookly_http_request_duration_seconds histogram",
+        ]
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for (method, route), (counts, total, count) in sorted(self._durations.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"bookly_http_request_duration_seconds_bucket{{{_labels(method=method, route=route, le=bound)}}} {cumulative}"
+                )
+            labels = _labels(method=method, route=route)
+            lines.append(f"bookly_http_request_duration_seconds_sum{{{labels}}} {total}")
+            lines.append(f"bookly_http_request_duration_seconds_count{{{labels}}} {count}")
+
+        lines.append("# HELP bookly_http_requests_total Completed requests by route template and status code.")
+        lines.append("# TYPE bookly_http_requests_total counter")
+        for (method, route, status_code), count in sorted(self._statuses.items()):
+            lines.append(
+                f"bookly_http_requests_total{{{_labels(method=method, route=route, status=status_code)}}} {count}"
+            )
+
+        lines.append("# HELP bookly_http_requests_in_flight Requests currently being handled.")
+        lines.append("# TYPE bookly_http_requests_in_flight gauge")
+        lines.append(f"bookly_http_requests_in_flight {self.in_flight}")
+
+        for metric_type, metrics in (("gauge", gauges), ("counter", counters)):
+            for name, (help_text, value) in (metrics or {}).items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import uuid
+
+from sqlalchemy import tuple_
+from sqlmodel import desc
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, uid: uuid.UUID) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "u": str(uid)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(raw["c"]), uuid.UUID(raw["u"])
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def apply_keyset(statement, model, limit: int, cursor: Optional[str] = None):
+    """Order by (created_at, uid) descending and seek past ``cursor``.
+
+    One extra row is fetched so ``build_page`` can tell whether a next page exists.
+    """
+    if cursor:
+        created_at, uid = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.uid) < tuple_(created_at, uid))
+    return statement.order_by(desc(model.created_at), desc(model.uid)).limit(limit + 1)
+
+
+def build_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.uid)
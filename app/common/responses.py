@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def response_adapter(response_type: Any) -> TypeAdapter:
+    """One TypeAdapter per response type, built on first use and reused afterwards."""
+    return TypeAdapter(response_type)
+
+
+def api_response(
+    response_type: Any,
+    *,
+    status_code: int,
+    data: Any,
+    message: str,
+    next_cursor: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Validate ORM objects into ``response_type`` once and encode straight to JSON bytes.
+
+    Returning a ``Response`` makes FastAPI skip its own ``response_model``
+    validation and encoding; keep ``response_model`` on the route for OpenAPI.
+    """
+    adapter = response_adapter(response_type)
+    envelope = adapter.validate_python(
+        {
+            "status": "success",
+            "statusCode": status_code,
+            "data": data,
+            "message": message,
+            "errors": None,
+            "next_cursor": next_cursor,
+        },
+        from_attributes=True,
+    )
+    return Response(
+        content=adapter.dump_json(envelope),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -1,9 +1,14 @@
-from typing import Generic, List, Optional, TypeVar
+from typing import Annotated, Generic, List, Optional, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, WithJsonSchema
 
 T = TypeVar("T")
 
+# Email read back from the database, where it was stored after EmailStr
+# validation. Response schemas keep EmailStr's `format: email` contract but
+# skip re-running the email validator on every row.
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
 
 class APIResponse(BaseModel, Generic[T]):
     status: str
@@ -11,6 +16,7 @@ class APIResponse(BaseModel, Generic[T]):
     data: Optional[T] = None
     message: str
     errors: Optional[List[str]] = None
+    next_cursor: Optional[str] = None
 
 
 class APIErrorDetail(BaseModel):
@@ -8,6 +8,37 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     JWT_ACCESS_TOKEN_EXPIRE_SECONDS: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_TTL_SECONDS: int = 300
+    ENTITY_CACHE_SIZE: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: int = 60
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_QUERY_BUDGET: int = 20
+    DB_REPEATED_QUERY_LIMIT: int = 5
+    DEBUG: bool = False
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    FINE_DAILY_RATE: float = 0.50
+    FINE_GRACE_DAYS: int = 0
+    FINE_MAX_AMOUNT: float = 20.00
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = 3600
+    OVERDUE_SWEEP_BATCH_SIZE: int = 50000
+    ANALYTICS_REFRESH_INTERVAL_SECONDS: int = 300
+    ANALYTICS_REFRESH_BATCH_SIZE: int = 5000
+    ANALYTICS_REFRESH_LAG_SECONDS: int = 60
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_BLOCK: bool = False
+    LOG_SUCCESS_SAMPLE_RATE: float = 1.0
+    # Production workers rely on `alembic upgrade head` and skip create_all at boot.
+    DB_CREATE_ALL_ON_STARTUP: bool = True
+    # OpenAPI document written at build time by `python -m app.tools.openapi`.
+    OPENAPI_SCHEMA_PATH: str = ""
     # REDIS_URL: str = "redis://localhost:6379/0"
     # MAIL_USERNAME: str
     # MAIL_PASSWORD: str
@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+class Capabilities:
+    """Postgres-only SQL the services use when available, each with a portable fallback.
+
+    Decided from the dialect name: the app targets Postgres in production and
+    SQLite (aiosqlite) for laptop runs, CI and benchmarks.
+    """
+
+    __slots__ = ("writable_ctes", "update_from_values", "full_text_search", "advisory_locks", "skip_locked", "concurrent_writes")
+
+    def __init__(self, dialect_name: str):
+        postgres = dialect_name == "postgresql"
+        # WITH x AS (UPDATE ... RETURNING ...) feeding a second statement.
+        self.writable_ctes = postgres
+        # UPDATE ... FROM (VALUES ...) AS t (c1, c2).
+        self.update_from_values = postgres
+        # to_tsvector / pg_trgm title search.
+        self.full_text_search = postgres
+        # pg_try_advisory_xact_lock.
+        self.advisory_locks = postgres
+        # SELECT ... FOR UPDATE SKIP LOCKED; SQLite ignores FOR UPDATE entirely.
+        self.skip_locked = postgres
+        # Another connection may commit while a read cursor stays open. SQLite
+        # has one writer, and in-memory databases share a single connection.
+        self.concurrent_writes = postgres
+
+
+@lru_cache(maxsize=None)
+def _capabilities(dialect_name: str) -> Capabilities:
+    return Capabilities(dialect_name)
+
+
+def capabilities(session) -> Capabilities:
+    return _capabilities(session.bind.dialect.name)
+
+
+def upsert_insert(session, model):
+    """INSERT supporting ``on_conflict_do_nothing``/``on_conflict_do_update`` on the session's dialect."""
+    if session.bind.dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
@@ -1,26 +1,88 @@
-from sqlmodel import create_engine, text, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import AsyncGenerator
+
+from sqlmodel import SQLModel
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import Config
+from app.db.query_stats import install_query_stats
 from app.loans import models as loan_models  # noqa: F401
+from app.analytics import models as analytics_models  # noqa: F401
+
+
+def _is_memory_database(url) -> bool:
+    return url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+
+
+def _engine_options() -> dict:
+    url = make_url(Config.DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and _is_memory_database(url):
+        # Every new connection to :memory: would open its own empty database,
+        # so the whole process shares one connection.
+        return {
+            "echo": Config.DB_ECHO,
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    options = {
+        "echo": Config.DB_ECHO,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE}
+    elif url.get_backend_name() == "sqlite":
+        # Seconds a writer waits for SQLite's database lock before failing.
+        options["connect_args"] = {"timeout": Config.DB_POOL_TIMEOUT}
+    return options
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # Postgres always enforces foreign keys; SQLite only when asked.
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # WAL lets readers keep going while a writer commits (no-op for :memory:).
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
 
-engine = AsyncEngine(
-    create_engine(Config.DATABASE_URL, echo=True, future=True)
+def install_sqlite_pragmas(engine: AsyncEngine) -> None:
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _configure_sqlite_connection)
+
+
+engine: AsyncEngine = create_async_engine(Config.DATABASE_URL, **_engine_options())
+install_query_stats(engine)
+install_sqlite_pragmas(engine)
+
+# Built once per process; creating a sessionmaker per request is wasted work.
+async_session_maker = sessionmaker(
+    bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+def pool_stats() -> dict:
+    """Current connection pool counters; empty for pools that do not track them (e.g. NullPool)."""
+    pool = engine.pool
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            stats[name] = reader()
+    return stats
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
-async def get_session() -> AsyncEngine:
-
-    Session = sessionmaker(
-        bind=engine, class_=AsyncSession, expire_on_commit=False
-    )
 
-    async with Session() as session:
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_maker() as session:
         yield session
-    
-        
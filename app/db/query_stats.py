@@ -0,0 +1,83 @@
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryStats:
+    """SQL statements, rows and database time accumulated for one request."""
+
+    __slots__ = ("queries", "rows", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def db_time_ms(self) -> float:
+        return round(self.db_time * 1000, 2)
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        """The statement text executed most often and how many times.
+
+        Identical SQL run over and over within one request is the usual N+1
+        signature (one lazy load per parent row).
+        """
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+# The middleware sets a fresh QueryStats next to the request id; the handler
+# runs in a copied context, so it shares the object rather than the variable.
+_query_stats_ctx: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    stats = QueryStats()
+    _query_stats_ctx.set(stats)
+    return stats
+
+
+def clear_query_stats() -> None:
+    _query_stats_ctx.set(None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats_ctx.get() is not None:
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats_ctx.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.db_time += perf_counter() - starts.pop()
+    stats.queries += 1
+    stats.statements[statement] += 1
+    rowcount = cursor.rowcount
+    if rowcount is not None and rowcount >= 0:
+        stats.rows += rowcount
+    else:
+        # SELECTs report -1; the async driver adapters have already buffered
+        # the result rows at this point.
+        stats.rows += len(getattr(cursor, "_rows", ()))
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def install_query_stats(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
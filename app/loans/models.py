@@ -3,8 +3,7 @@ from decimal import Decimal
 from typing import Optional
 import uuid
 
-import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Column, ForeignKey, Index, text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Numeric, Uuid, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.books.models import Book
@@ -17,11 +16,30 @@ class Loan(SQLModel, table=True):
         Index("ix_loans_book_uid", "book_uid"),
         Index("ix_loans_member_uid", "member_uid"),
         Index("ix_loans_borrowed_at", "borrowed_at"),
+        Index("ix_loans_created_at_uid", "created_at", "uid"),
+        # Analytics refreshes walk loans changed since their watermark.
+        Index("ix_loans_updated_at_uid", "updated_at", "uid"),
+        # At most one open loan per member and book; the database enforces it.
+        Index(
+            "uq_loans_active_book_member",
+            "book_uid",
+            "member_uid",
+            unique=True,
+            postgresql_where=text("returned_at IS NULL"),
+            sqlite_where=text("returned_at IS NULL"),
+        ),
+        Index(
+            "ix_loans_active_created_at_uid",
+            "created_at",
+            "uid",
+            postgresql_where=text("returned_at IS NULL"),
+            sqlite_where=text("returned_at IS NULL"),
+        ),
     )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             unique=True,
             index=True,
             nullable=False,
@@ -31,46 +49,46 @@ class Loan(SQLModel, table=True):
     )
     book_uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             ForeignKey("books.uid"),
             nullable=False,
         )
     )
     member_uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             ForeignKey("members.uid"),
             nullable=False,
         )
     )
-    book: Optional[Book] = Relationship(sa_relationship_kwargs={"lazy": "selectin"})
-    member: Optional[Member] = Relationship(sa_relationship_kwargs={"lazy": "selectin"})
+    book: Optional[Book] = Relationship(sa_relationship_kwargs={"lazy": "raise"})
+    member: Optional[Member] = Relationship(sa_relationship_kwargs={"lazy": "raise"})
     borrowed_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, nullable=False)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, nullable=False)
     )
     due_date: datetime | None = Field(
         default=None,
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
     )
     reissued_at: datetime | None = Field(
         default=None,
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=True),
+        sa_column=Column(DateTime(timezone=True), nullable=True),
     )
     returned_at: datetime | None = Field(
         default=None,
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=True),
+        sa_column=Column(DateTime(timezone=True), nullable=True),
     )
     fine_amount: Decimal = Field(
         default=Decimal("0.00"),
-        sa_column=Column(pg.NUMERIC(10, 2), nullable=False, server_default=text("0.00")),
+        sa_column=Column(Numeric(10, 2), nullable=False, server_default=text("0.00")),
     )
     fine_grace_amount: Decimal = Field(
         default=Decimal("0.00"),
-        sa_column=Column(pg.NUMERIC(10, 2), nullable=False, server_default=text("0.00")),
+        sa_column=Column(Numeric(10, 2), nullable=False, server_default=text("0.00")),
     )
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
     )
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from datetime import datetime
+from decimal import Decimal
+from time import perf_counter
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Row, bindparam, column, func, select, update, values
+
+from app.config import Config
+from app.db.capabilities import capabilities
+from app.loans.models import Loan
+
+if TYPE_CHECKING:
+    # numpy is imported by the sweep itself, not at app import, to keep worker startup fast.
+    import numpy as np
+
+
+logger = logging.getLogger("bookly")
+
+SECONDS_PER_DAY = 86400
+# Two bind parameters per row; asyncpg allows at most 32767 per statement.
+MAX_ROWS_PER_UPDATE = 16000
+# Arbitrary constant so concurrent workers agree on one sweeper.
+SWEEP_ADVISORY_LOCK = 0x6F766572
+
+
+class FinePolicy:
+    """Overdue fine rules: ``daily_rate`` per full day late after ``grace_days``, capped at ``max_amount``."""
+
+    def __init__(self, daily_rate: float, grace_days: int, max_amount: float):
+        # Work in integer cents so the vectorized maths is exact.
+        self.daily_rate_cents = int(round(daily_rate * 100))
+        self.grace_days = grace_days
+        self.max_amount_cents = int(round(max_amount * 100))
+
+    @classmethod
+    def from_config(cls) -> "FinePolicy":
+        return cls(
+            daily_rate=Config.FINE_DAILY_RATE,
+            grace_days=Config.FINE_GRACE_DAYS,
+            max_amount=Config.FINE_MAX_AMOUNT,
+        )
+
+    def fines_cents(self, due_timestamps: "np.ndarray", now_timestamp: float) -> "np.ndarray":
+        import numpy as np
+
+        days_late = np.floor((now_timestamp - due_timestamps) / SECONDS_PER_DAY).astype(np.int64)
+        chargeable = np.clip(days_late - self.grace_days, 0, None)
+        return np.minimum(chargeable * self.daily_rate_cents, self.max_amount_cents)
+
+
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(value: datetime) -> float:
+    # Naive datetimes are what the app writes with datetime.now(); asyncpg
+    # stores them as UTC, so read them back the same way.
+    if value.tzinfo is None:
+        return (value - _NAIVE_EPOCH).total_seconds()
+    return value.timestamp()
+
+
+def _accrued_fines(rows: Sequence[Row], policy: FinePolicy, now_timestamp: float):
+    """(uids, new fines in cents) for the rows whose fine has grown since the last sweep."""
+    import numpy as np
+
+    count = len(rows)
+    due = np.fromiter((_epoch(row.due_date) for row in rows), dtype=np.float64, count=count)
+    current = np.rint(np.fromiter((row.fine_amount for row in rows), dtype=np.float64, count=count) * 100).astype(np.int64)
+    fines = policy.fines_cents(due, now_timestamp)
+    # Fines only ever grow here; lower stored values were set by hand and stay.
+    changed = np.flatnonzero(fines > current)
+    return [rows[index].uid for index in changed.tolist()], fines[changed]
+
+
+async def _write_fines(session, uids, fines_cents: "np.ndarray", now: datetime) -> int:
+    if not uids:
+        return 0
+    loan_columns = Loan.__table__.c
+    rows = [(uid, Decimal(int(cents)) / 100) for uid, cents in zip(uids, fines_cents)]
+    if not capabilities(session).update_from_values:
+        statement = (
+            update(Loan.__table__)
+            .where(loan_columns.uid == bindparam("f_uid"), loan_columns.returned_at.is_(None))
+            .values(fine_amount=bindparam("fine"), updated_at=now)
+        )
+        result = await session.execute(statement, [{"f_uid": uid, "fine": fine} for uid, fine in rows])
+        await session.commit()
+        return result.rowcount
+    updated = 0
+    for start in range(0, len(rows), MAX_ROWS_PER_UPDATE):
+        batch = values(
+            column("uid", loan_columns.uid.type),
+            column("fine_amount", loan_columns.fine_amount.type),
+            name="fines",
+        ).data(rows[start:start + MAX_ROWS_PER_UPDATE])
+        statement = (
+            update(Loan)
+            .where(Loan.uid == batch.c.uid, Loan.returned_at.is_(None))
+            .values(fine_amount=batch.c.fine_amount, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement)
+        updated += result.rowcount
+    await session.commit()
+    return updated
+
+
+def _overdue_statement(now: datetime):
+    return select(Loan.uid, Loan.due_date, Loan.fine_amount).where(Loan.returned_at.is_(None), Loan.due_date < now)
+
+
+async def _streamed_batches(session, now: datetime, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    result = await session.stream(_overdue_statement(now).execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield rows
+
+
+async def _keyset_batches(session, now: datetime, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    # For databases with a single writer: no cursor stays open across the
+    # commits of the batches, each batch is a fresh query after the last uid.
+    last_uid = None
+    while True:
+        statement = _overdue_statement(now).order_by(Loan.uid).limit(batch_size)
+        if last_uid is not None:
+            statement = statement.where(Loan.uid > last_uid)
+        rows = (await session.execute(statement)).all()
+        if not rows:
+            return
+        yield rows
+        last_uid = rows[-1].uid
+
+
+async def _sweep_batches(batches, writer, policy: FinePolicy, now: datetime):
+    now_timestamp = _epoch(now)
+    scanned = updated = 0
+    async for rows in batches:
+        scanned += len(rows)
+        uids, fines = _accrued_fines(rows, policy, now_timestamp)
+        updated += await _write_fines(writer, uids, fines, now)
+    return scanned, updated
+
+
+async def sweep_overdue_loans(
+    session_maker,
+    policy: Optional[FinePolicy] = None,
+    batch_size: int = Config.OVERDUE_SWEEP_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Accrue fines on every active overdue loan.
+
+    Overdue loans are streamed from a server-side cursor in ``batch_size``
+    chunks; each chunk's fines are computed with NumPy and written back with one
+    UPDATE ... FROM (VALUES ...) on a second session. On SQLite the chunks are
+    keyset queries on the one session instead.
+    """
+    policy = policy or FinePolicy.from_config()
+    now = now or datetime.now()
+    started = perf_counter()
+    async with session_maker() as reader:
+        features = capabilities(reader)
+        if features.advisory_locks:
+            locked = await reader.scalar(select(func.pg_try_advisory_xact_lock(SWEEP_ADVISORY_LOCK)))
+            if not locked:
+                return {"skipped": True, "scanned": 0, "updated": 0, "seconds": 0.0}
+        if features.concurrent_writes:
+            async with session_maker() as writer:
+                scanned, updated = await _sweep_batches(_streamed_batches(reader, now, batch_size), writer, policy, now)
+        else:
+            scanned, updated = await _sweep_batches(_keyset_batches(reader, now, batch_size), reader, policy, now)
+    return {"skipped": False, "scanned": scanned, "updated": updated, "seconds": round(perf_counter() - started, 3)}
+
+
+async def run_overdue_sweeps(session_maker, interval_seconds: float) -> None:
+    """Sweep forever every ``interval_seconds``; a failed sweep is logged and retried next time."""
+    while True:
+        try:
+            stats = await sweep_overdue_loans(session_maker)
+            if not stats["skipped"]:
+                logger.info(
+                    "Overdue sweep finished: %d overdue loans scanned, %d fines updated",
+                    stats["scanned"],
+                    stats["updated"],
+                    extra={"duration_ms": round(stats["seconds"] * 1000, 2)},
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Overdue sweep failed")
+        await asyncio.sleep(interval_seconds)
@@ -1,15 +1,20 @@
 from typing import List
 import uuid
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.auth.dependencies import AccessTokenBearer
 from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, list_etag, not_modified
+from app.common.export import export_response
+from app.common.fields import parse_fields, sparse_model
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.common.responses import api_response
 from app.common.schemas import APIResponse
-from app.db.main import get_session
-from app.loans.schemas import Loan, LoanCreate, LoanReissue, LoanReturn
-from app.loans.service import LoanService
+from app.db.main import async_session_maker, get_session
+from app.loans.schemas import Loan, LoanBatchItemResult, LoanBatchReturnRequest, LoanCreate, LoanReissue, LoanReturn
+from app.loans.service import LOAN_EXPORT_COLUMNS, LOAN_FIELDS, LoanService, loan_version
 
 
 loan_router = APIRouter()
@@ -19,22 +24,60 @@ access_token_bearer = AccessTokenBearer()
 
 @loan_router.get("/", response_model=APIResponse[List[Loan]])
 async def read_loans(
+    request: Request,
     book_uid: uuid.UUID | None = None,
     member_uid: uuid.UUID | None = None,
+    active: bool | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. uid,due_date,book"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    loans = await loan_service.get_all_loans(
-        session=session,
+    try:
+        selected = parse_fields(fields, LOAN_FIELDS)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_FIELDS",
+            message="Loans could not be fetched",
+            details=str(exc),
+        )
+    response_type = Loan if selected is None else sparse_model(Loan, selected)
+    filters = dict(
         book_uid=book_uid,
         member_uid=member_uid,
+        active=active,
+        limit=limit,
+        cursor=cursor,
+        fields=selected,
     )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = None
+    try:
+        if request.headers.get("if-none-match"):
+            versions = await loan_service.get_loans_version(session=session, **filters)
+            etag = list_etag(request, versions[:limit], len(versions) > limit)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        loans, next_cursor = await loan_service.get_all_loans(session=session, **filters)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+            message="Loans could not be fetched",
+            details=str(exc),
+        )
+    if etag is None:
+        etag = list_etag(request, [loan_version(loan) for loan in loans], next_cursor is not None)
+    return api_response(
+        APIResponse[List[response_type]],
+        status_code=status.HTTP_200_OK,
         data=loans,
         message="Loans fetched successfully",
-        errors=None,
+        next_cursor=next_cursor,
+        headers={"ETag": etag},
     )
 
 
@@ -69,6 +112,55 @@ async def create_loan(
     )
 
 
+# Registered before "/{loan_uid}" so "returns" is not parsed as a uid.
+@loan_router.post("/returns", status_code=status.HTTP_200_OK, response_model=APIResponse[List[LoanBatchItemResult]])
+async def return_loans_batch(
+    request: Request,
+    payload: LoanBatchReturnRequest,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    try:
+        results = await loan_service.return_loans(payload.items, session)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="LOAN_CONFLICT",
+            message="Loan batch could not be returned",
+            details=str(exc),
+        )
+    return APIResponse(
+        status="success",
+        statusCode=status.HTTP_200_OK,
+        data=results,
+        message="Loan batch processed",
+        errors=None,
+    )
+
+
+# Registered before "/{loan_uid}" for the same reason as "/returns".
+@loan_router.get("/export")
+async def export_loans(
+    book_uid: uuid.UUID | None = None,
+    member_uid: uuid.UUID | None = None,
+    active: bool | None = None,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    token_details: dict = Depends(access_token_bearer),
+):
+    async def batches():
+        async with async_session_maker() as session:
+            async for rows in loan_service.stream_loans(
+                session,
+                book_uid=book_uid,
+                member_uid=member_uid,
+                active=active,
+            ):
+                yield rows
+
+    return export_response(batches(), LOAN_EXPORT_COLUMNS, export_format, "loans")
+
+
 @loan_router.get("/{loan_uid}", response_model=APIResponse[Loan])
 async def read_loan(
     request: Request,
@@ -85,12 +177,15 @@ async def read_loan(
             message="Loan not found",
             details=f"No loan exists with uid {loan_uid}",
         )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = compute_etag(*loan_version(loan))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return api_response(
+        APIResponse[Loan],
+        status_code=status.HTTP_200_OK,
         data=loan,
         message="Loan fetched successfully",
-        errors=None,
+        headers={"ETag": etag},
     )
 
 
@@ -1,11 +1,11 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 import uuid
 
 from pydantic import BaseModel, Field
 
-from app.books.schemas import BookForLoan
+from app.books.schemas import MAX_BATCH_SIZE, BookForLoan
 from app.members.schemas import MemberForLoan
 
 
@@ -32,6 +32,23 @@ class LoanReturn(BaseModel):
     fine_amount: Decimal = Decimal("0.00")
     fine_grace_amount: Decimal = Decimal("0.00")
 
+
+class LoanBatchReturnItem(LoanReturn):
+    uid: uuid.UUID
+
+
+class LoanBatchReturnRequest(BaseModel):
+    items: List[LoanBatchReturnItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class LoanBatchItemResult(BaseModel):
+    index: int
+    status: str
+    uid: uuid.UUID
+    book_uid: Optional[uuid.UUID] = None
+    fine_amount: Optional[Decimal] = None
+    detail: Optional[str] = None
+
 class Loan(LoanBase):
     uid: uuid.UUID
     book: Optional[BookForLoan] = None
@@ -1,35 +1,139 @@
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Sequence
 import uuid
 
+from sqlalchemy import Row, bindparam, cast, column, func, insert, literal, null, update, values
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlmodel import desc, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.books.models import Book
+from app.books.service import book_cache
+from app.common.export import EXPORT_BATCH_SIZE
+from app.common.fields import column_fields, load_only_columns
+from app.common.include import omit_relations
+from app.common.pagination import DEFAULT_PAGE_SIZE, apply_keyset, build_page
+from app.db.capabilities import capabilities
 from app.loans.models import Loan
-from app.loans.schemas import LoanCreate, LoanReissue, LoanReturn
+from app.members.models import Member
+from app.loans.schemas import LoanBatchItemResult, LoanBatchReturnItem, LoanCreate, LoanReissue, LoanReturn
+
+
+ACTIVE_LOAN_INDEX = "uq_loans_active_book_member"
+# SQLite names the columns instead of the index when it is violated.
+ACTIVE_LOAN_SQLITE_ERROR = "UNIQUE constraint failed: loans.book_uid, loans.member_uid"
+
+
+def _is_active_loan_conflict(exc: IntegrityError) -> bool:
+    message = str(exc.orig)
+    return ACTIVE_LOAN_INDEX in message or ACTIVE_LOAN_SQLITE_ERROR in message
+
+
+# Nested records embedded in a loan response; fields= may leave them out.
+LOAN_RELATIONS = {"book": Loan.book, "member": Loan.member}
+LOAN_FIELDS = column_fields(Loan) | LOAN_RELATIONS.keys()
+LOAN_EXPORT_COLUMNS = list(Loan.__table__.columns.keys())
+
+
+def loan_relations(fields: FrozenSet[str] | None) -> FrozenSet[str]:
+    return frozenset(LOAN_RELATIONS) if fields is None else fields & LOAN_RELATIONS.keys()
+
+
+def loan_version(loan) -> tuple:
+    """Same shape as a row of LoanService.get_loans_version."""
+    return (
+        loan.uid,
+        loan.updated_at,
+        loan.book.updated_at if loan.book else None,
+        loan.member.updated_at if loan.member else None,
+    )
 
 
 class LoanService:
 
+    def _filter_loans(
+        self,
+        statement,
+        book_uid: uuid.UUID | None,
+        member_uid: uuid.UUID | None,
+        active: bool | None,
+    ):
+        if book_uid:
+            statement = statement.where(Loan.book_uid == book_uid)
+        if member_uid:
+            statement = statement.where(Loan.member_uid == member_uid)
+        if active is True:
+            statement = statement.where(Loan.returned_at.is_(None))
+        elif active is False:
+            statement = statement.where(Loan.returned_at.is_not(None))
+        return statement
+
     async def get_all_loans(
         self,
         session: AsyncSession,
         book_uid: uuid.UUID | None = None,
         member_uid: uuid.UUID | None = None,
+        active: bool | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        fields: FrozenSet[str] | None = None,
     ):
-        statement = (
-            select(Loan)
-            .options(selectinload(Loan.book), selectinload(Loan.member))
-            .order_by(desc(Loan.created_at))
+        statement = select(Loan).options(
+            *(selectinload(LOAN_RELATIONS[name]) for name in sorted(loan_relations(fields)))
         )
-        if book_uid:
-            statement = statement.where(Loan.book_uid == book_uid)
-        if member_uid:
-            statement = statement.where(Loan.member_uid == member_uid)
+        if fields is not None:
+            statement = statement.options(load_only_columns(Loan, fields))
+        statement = self._filter_loans(statement, book_uid, member_uid, active)
+        statement = apply_keyset(statement, Loan, limit, cursor)
+        result = await session.exec(statement)
+        loans = result.all()
+        omit_relations(loans, LOAN_RELATIONS.keys() - loan_relations(fields))
+        return build_page(loans, limit)
+
+    async def get_loans_version(
+        self,
+        session: AsyncSession,
+        book_uid: uuid.UUID | None = None,
+        member_uid: uuid.UUID | None = None,
+        active: bool | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        fields: FrozenSet[str] | None = None,
+    ):
+        """Version columns of the page get_all_loans would return, including the embedded book and member."""
+        relations = loan_relations(fields)
+        statement = select(
+            Loan.uid,
+            Loan.updated_at,
+            Book.updated_at if "book" in relations else null(),
+            Member.updated_at if "member" in relations else null(),
+        )
+        if "book" in relations:
+            statement = statement.outerjoin(Book, Loan.book_uid == Book.uid)
+        if "member" in relations:
+            statement = statement.outerjoin(Member, Loan.member_uid == Member.uid)
+        statement = self._filter_loans(statement, book_uid, member_uid, active)
+        statement = apply_keyset(statement, Loan, limit, cursor)
         result = await session.exec(statement)
         return result.all()
 
+    async def stream_loans(
+        self,
+        session: AsyncSession,
+        book_uid: uuid.UUID | None = None,
+        member_uid: uuid.UUID | None = None,
+        active: bool | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield every matching loans row in batches from a server-side cursor, newest first."""
+        statement = self._filter_loans(select(*Loan.__table__.columns), book_uid, member_uid, active)
+        statement = statement.order_by(desc(Loan.created_at), desc(Loan.uid)).execution_options(yield_per=batch_size)
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            yield rows
+
     async def get_loan(self, loan_uid: uuid.UUID, session: AsyncSession):
         statement = (
             select(Loan)
@@ -41,77 +145,275 @@ class LoanService:
         return loan if loan else None
 
     async def create_loan(self, loan_data: LoanCreate, session: AsyncSession):
-        book_statement = select(Book).where(Book.uid == loan_data.book_uid)
-        book_result = await session.exec(book_statement)
-        book = book_result.first()
-        if not book:
-            raise ValueError("Book not found")
-        if book.available_copies <= 0:
-            raise ValueError("Book is out of stock")
-
-        active_loan_statement = select(Loan).where(
-            Loan.book_uid == loan_data.book_uid,
-            Loan.member_uid == loan_data.member_uid,
-            Loan.returned_at.is_(None),
+        """Check out a copy with one statement: decrement stock and insert the loan together.
+
+        The stock UPDATE only matches while copies remain, so concurrent checkouts
+        can never oversell; a second active loan for the same member and book is
+        rejected by the uq_loans_active_book_member index, which also undoes the
+        decrement. Without writable CTEs (SQLite) the same two statements run
+        back to back in the transaction.
+        """
+        now = datetime.now()
+        loan_uid = uuid.uuid4()
+        stock = (
+            update(Book)
+            .where(Book.uid == loan_data.book_uid, Book.available_copies > 0)
+            .values(available_copies=Book.available_copies - 1, updated_at=now)
+            .returning(Book.uid)
         )
-        active_loan_result = await session.exec(active_loan_statement)
-        active_loan = active_loan_result.first()
-        if active_loan:
-            raise ValueError("Member already has an active loan for this book")
-
-        new_loan = Loan(**loan_data.model_dump())
-        book.available_copies -= 1
-        session.add(new_loan)
-        session.add(book)
+        loan_values = {
+            "uid": loan_uid,
+            "member_uid": loan_data.member_uid,
+            "borrowed_at": loan_data.borrowed_at,
+            "due_date": loan_data.due_date,
+            "reissued_at": loan_data.reissued_at,
+            "returned_at": loan_data.returned_at,
+            "created_at": now,
+            "updated_at": now,
+        }
         try:
+            created = await self._checkout(stock, loan_values, session)
+            if created is None:
+                await session.rollback()
+                raise ValueError(await self._checkout_failure_reason(loan_data, session))
             await session.commit()
-        except IntegrityError:
+        except IntegrityError as exc:
             await session.rollback()
+            if _is_active_loan_conflict(exc):
+                raise ValueError("Member already has an active loan for this book")
             raise ValueError("Loan could not be created due to a data conflict")
-        await session.refresh(new_loan)
-        return new_loan
+        await book_cache.invalidate(loan_data.book_uid)
+        return await self.get_loan(loan_uid, session)
 
-    async def reissue_loan(self, loan_uid: uuid.UUID, reissue_data: LoanReissue, session: AsyncSession):
-        loan = await self.get_loan(loan_uid, session)
-        if not loan:
-            return None
+    async def _checkout(self, stock, loan_values: dict, session: AsyncSession) -> Optional[uuid.UUID]:
+        """Run the stock decrement and the loan insert; None when no copy could be taken."""
+        if not capabilities(session).writable_ctes:
+            result = await session.execute(stock)
+            book_uid = result.scalar_one_or_none()
+            if book_uid is None:
+                return None
+            result = await session.execute(insert(Loan).values(book_uid=book_uid, **loan_values).returning(Loan.uid))
+            return result.scalar_one()
+        stock = stock.cte("stock")
+        columns = Loan.__table__.c
+        statement = insert(Loan).from_select(
+            ["book_uid", *loan_values],
+            select(stock.c.uid, *(literal(value, columns[name].type) for name, value in loan_values.items())),
+        ).returning(Loan.uid)
+        result = await session.execute(statement)
+        return result.scalar_one_or_none()
 
-        loan.due_date = reissue_data.due_date
-        loan.reissued_at = reissue_data.reissued_at
+    async def _checkout_failure_reason(self, loan_data: LoanCreate, session: AsyncSession) -> str:
+        # Only reached when the checkout statement matched no row.
+        book_result = await session.exec(select(Book.uid).where(Book.uid == loan_data.book_uid))
+        return "Book not found" if book_result.first() is None else "Book is out of stock"
 
-        session.add(loan)
+    async def reissue_loan(self, loan_uid: uuid.UUID, reissue_data: LoanReissue, session: AsyncSession):
+        statement = (
+            update(Loan)
+            .where(Loan.uid == loan_uid)
+            .values(
+                due_date=reissue_data.due_date,
+                reissued_at=reissue_data.reissued_at,
+                updated_at=datetime.now(),
+            )
+            .returning(Loan.uid)
+            .execution_options(synchronize_session=False)
+        )
         try:
+            result = await session.execute(statement)
+            if result.scalar_one_or_none() is None:
+                await session.rollback()
+                return None
             await session.commit()
         except IntegrityError:
             await session.rollback()
             raise ValueError("Loan could not be reissued due to a data conflict")
-        await session.refresh(loan)
-        return loan
+        return await self.get_loan(loan_uid, session)
 
     async def return_loan(self, loan_uid: uuid.UUID, return_data: LoanReturn, session: AsyncSession):
-        loan = await self.get_loan(loan_uid, session)
-        if not loan:
-            return None
-        if loan.returned_at is not None:
-            raise ValueError("Loan has already been returned")
-
-        book_statement = select(Book).where(Book.uid == loan.book_uid)
-        book_result = await session.exec(book_statement)
-        book = book_result.first()
-        if not book:
-            raise ValueError("Book not found")
-
-        loan.returned_at = return_data.returned_at
-        loan.fine_amount = return_data.fine_amount
-        loan.fine_grace_amount = return_data.fine_grace_amount
-        book.available_copies += 1
-
-        session.add(loan)
-        session.add(book)
+        """Mark the loan returned and restock its book in one statement."""
+        now = datetime.now()
+        returned = (
+            update(Loan)
+            .where(Loan.uid == loan_uid, Loan.returned_at.is_(None))
+            .values(
+                returned_at=return_data.returned_at,
+                # Without an explicit amount the fine accrued by the overdue sweep stands.
+                fine_amount=return_data.fine_amount if "fine_amount" in return_data.model_fields_set else Loan.fine_amount,
+                fine_grace_amount=return_data.fine_grace_amount,
+                updated_at=now,
+            )
+            .returning(Loan.book_uid)
+        )
         try:
+            book_uid = await self._return_and_restock(returned, now, session)
+            if book_uid is None:
+                await session.rollback()
+                exists_result = await session.exec(select(Loan.uid).where(Loan.uid == loan_uid))
+                if exists_result.first() is None:
+                    return None
+                raise ValueError("Loan has already been returned")
             await session.commit()
         except IntegrityError:
             await session.rollback()
             raise ValueError("Loan could not be returned due to a data conflict")
-        await session.refresh(loan)
-        return loan
+        await book_cache.invalidate(book_uid)
+        return await self.get_loan(loan_uid, session)
+
+    async def _return_and_restock(self, returned, now: datetime, session: AsyncSession) -> Optional[uuid.UUID]:
+        """Run the loan update and give its book a copy back; None when no loan was returned."""
+        if not capabilities(session).writable_ctes:
+            result = await session.execute(returned.execution_options(synchronize_session=False))
+            book_uid = result.scalar_one_or_none()
+            if book_uid is not None:
+                await session.execute(
+                    update(Book)
+                    .where(Book.uid == book_uid)
+                    .values(available_copies=Book.available_copies + 1, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            return book_uid
+        returned = returned.cte("returned")
+        statement = (
+            update(Book)
+            .where(Book.uid == returned.c.book_uid)
+            .values(available_copies=Book.available_copies + 1, updated_at=now)
+            .returning(returned.c.book_uid)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def return_loans(self, items: List[LoanBatchReturnItem], session: AsyncSession) -> List[LoanBatchItemResult]:
+        """Return a batch of loans and restock their books in one statement.
+
+        Loans are marked returned with UPDATE ... FROM (VALUES ...); each book then
+        gains one copy per returned loan through a grouped
+        UPDATE books ... FROM (SELECT book_uid, count(*) ...). Databases without
+        writable CTEs update the loans one by one instead.
+        """
+        results: List[Optional[LoanBatchItemResult]] = [None] * len(items)
+        pending: Dict[uuid.UUID, LoanBatchReturnItem] = {}
+        indexes: Dict[uuid.UUID, int] = {}
+        for index, item in enumerate(items):
+            if item.uid in pending:
+                results[index] = LoanBatchItemResult(
+                    index=index, status="invalid", uid=item.uid, detail="Loan uid appears more than once in the batch"
+                )
+                continue
+            pending[item.uid] = item
+            indexes[item.uid] = index
+
+        now = datetime.now()
+        try:
+            if capabilities(session).writable_ctes:
+                returned_rows = await self._return_batch(pending, now, session)
+            else:
+                returned_rows = await self._return_each(pending, now, session)
+            missing = pending.keys() - returned_rows.keys()
+            existing = set()
+            if missing:
+                existing_result = await session.exec(select(Loan.uid).where(Loan.uid.in_(missing)))
+                existing = set(existing_result.all())
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise ValueError("Loan batch could not be returned due to a data conflict")
+
+        for uid, index in indexes.items():
+            row = returned_rows.get(uid)
+            if row is not None:
+                results[index] = LoanBatchItemResult(
+                    index=index, status="returned", uid=uid, book_uid=row.book_uid, fine_amount=row.fine_amount
+                )
+            elif uid in existing:
+                results[index] = LoanBatchItemResult(
+                    index=index, status="already_returned", uid=uid, detail="Loan has already been returned"
+                )
+            else:
+                results[index] = LoanBatchItemResult(
+                    index=index, status="not_found", uid=uid, detail=f"No loan exists with uid {uid}"
+                )
+        for book_uid in {row.book_uid for row in returned_rows.values()}:
+            await book_cache.invalidate(book_uid)
+        return results
+
+    async def _return_batch(
+        self, pending: Dict[uuid.UUID, LoanBatchReturnItem], now: datetime, session: AsyncSession
+    ) -> Dict[uuid.UUID, Row]:
+        """Returned loans by uid, from one UPDATE ... FROM (VALUES ...) feeding a grouped restock."""
+        loan_columns = Loan.__table__.c
+        batch = values(
+            column("uid", loan_columns.uid.type),
+            column("returned_at", loan_columns.returned_at.type),
+            column("fine_amount", loan_columns.fine_amount.type),
+            column("fine_grace_amount", loan_columns.fine_grace_amount.type),
+            name="batch",
+        ).data([
+            (
+                item.uid,
+                item.returned_at,
+                item.fine_amount if "fine_amount" in item.model_fields_set else None,
+                item.fine_grace_amount,
+            )
+            for item in pending.values()
+        ])
+        returned = (
+            update(Loan)
+            .where(Loan.uid == batch.c.uid, Loan.returned_at.is_(None))
+            .values(
+                returned_at=batch.c.returned_at,
+                # Without an explicit amount the fine accrued by the overdue sweep stands.
+                # The cast types the column even when every row sends NULL.
+                fine_amount=func.coalesce(cast(batch.c.fine_amount, loan_columns.fine_amount.type), Loan.fine_amount),
+                fine_grace_amount=batch.c.fine_grace_amount,
+                updated_at=now,
+            )
+            .returning(Loan.uid, Loan.book_uid, Loan.fine_amount)
+            .cte("returned")
+        )
+        copies = (
+            select(returned.c.book_uid, func.count().label("copies"))
+            .group_by(returned.c.book_uid)
+            .subquery("copies")
+        )
+        restocked = (
+            update(Book)
+            .where(Book.uid == copies.c.book_uid)
+            .values(available_copies=Book.available_copies + copies.c.copies, updated_at=now)
+            .cte("restocked")
+        )
+        statement = select(returned.c.uid, returned.c.book_uid, returned.c.fine_amount).add_cte(restocked)
+        result = await session.execute(statement)
+        return {row.uid: row for row in result.all()}
+
+    async def _return_each(
+        self, pending: Dict[uuid.UUID, LoanBatchReturnItem], now: datetime, session: AsyncSession
+    ) -> Dict[uuid.UUID, Row]:
+        """Fallback for return_loans without writable CTEs: one UPDATE per loan, then one restock per book."""
+        returned_rows = {}
+        for uid, item in pending.items():
+            changes = {"returned_at": item.returned_at, "fine_grace_amount": item.fine_grace_amount, "updated_at": now}
+            if "fine_amount" in item.model_fields_set:
+                changes["fine_amount"] = item.fine_amount
+            result = await session.execute(
+                update(Loan)
+                .where(Loan.uid == uid, Loan.returned_at.is_(None))
+                .values(changes)
+                .returning(Loan.uid, Loan.book_uid, Loan.fine_amount)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            if row is not None:
+                returned_rows[uid] = row
+        copies = Counter(row.book_uid for row in returned_rows.values())
+        if copies:
+            book_columns = Book.__table__.c
+            await session.execute(
+                update(Book.__table__)
+                .where(book_columns.uid == bindparam("b_uid"))
+                .values(available_copies=book_columns.available_copies + bindparam("copies"), updated_at=now),
+                [{"b_uid": book_uid, "copies": count} for book_uid, count in copies.items()],
+            )
+        return returned_rows
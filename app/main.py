@@ -1,10 +1,13 @@
+import asyncio
+import json
 import uuid
+from contextlib import suppress
 from time import perf_counter
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.books.routes import book_router
@@ -13,20 +16,52 @@ from app.author.routes import author_router
 from app.members.routes import member_router
 from app.publisher.routes import publisher_router
 from app.loans.routes import loan_router
+from app.loans.overdue import run_overdue_sweeps
+from app.analytics.rollups import run_rollup_refreshes
+from app.analytics.routes import analytics_router
 from contextlib import asynccontextmanager
 from app.common.error_repsonses import _error_response
-from app.common.logging import clear_request_id, set_request_id, setup_logging
-from app.db.main import init_db
+from app.common.logging import (
+    clear_request_id,
+    get_logging_stats,
+    set_request_id,
+    setup_logging,
+    should_log_success,
+    shutdown_logging,
+    start_logging,
+)
+from app.common.metrics import UNMATCHED_ROUTE, request_metrics
+from app.db.main import async_session_maker, engine, init_db, pool_stats
+from app.db.query_stats import QueryStats, clear_query_stats, start_query_stats
+from app.auth.utils import password_hasher
 from app.config import Config
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Perform any startup tasks here (e.g., connect to the database)
     print("Starting up...")
-    await init_db()  # Initialize the database (create tables, etc.)    
+    start_logging()  # The previous lifespan in this process may have stopped it
+    if Config.DB_CREATE_ALL_ON_STARTUP:
+        await init_db()  # Initialize the database (create tables, etc.)
+    background_tasks = []
+    if Config.OVERDUE_SWEEP_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            run_overdue_sweeps(async_session_maker, Config.OVERDUE_SWEEP_INTERVAL_SECONDS)
+        ))
+    if Config.ANALYTICS_REFRESH_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            run_rollup_refreshes(async_session_maker, Config.ANALYTICS_REFRESH_INTERVAL_SECONDS)
+        ))
     yield
     # Perform any shutdown tasks here (e.g., disconnect from the database)
     print("Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await engine.dispose()  # Close pooled connections so workers exit cleanly
+    password_hasher.shutdown()
+    shutdown_logging()
 
 version = "v1"  # Define API version
 
@@ -36,12 +71,14 @@ app = FastAPI(
     version=version,
     lifespan=lifespan
 ) 
-logger = setup_logging()
+logger = setup_logging(
+    queue_size=Config.LOG_QUEUE_SIZE,
+    block_when_full=Config.LOG_QUEUE_BLOCK,
+    success_sample_rate=Config.LOG_SUCCESS_SAMPLE_RATE,
+)
 
 
-def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
+def build_openapi() -> dict:
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -49,7 +86,25 @@ def custom_openapi():
         routes=app.routes,
     )
     openapi_schema["openapi"] = "3.0.3"
-    app.openapi_schema = openapi_schema
+    return openapi_schema
+
+
+def _precomputed_openapi():
+    # Generated at build time so workers never walk every route's models.
+    if not Config.OPENAPI_SCHEMA_PATH:
+        return None
+    try:
+        with open(Config.OPENAPI_SCHEMA_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        logger.warning("OpenAPI schema %s not found, generating it", Config.OPENAPI_SCHEMA_PATH)
+        return None
+
+
+def custom_openapi():
+    if app.openapi_schema:
+        return app.openapi_schema
+    app.openapi_schema = _precomputed_openapi() or build_openapi()
     return app.openapi_schema
 
 
@@ -63,6 +118,7 @@ crud_prefixes = (
     f"/api/{version}/members",
     f"/api/{version}/publishers",
     f"/api/{version}/loans",
+    f"/api/{version}/analytics",
 )
 
 
@@ -70,17 +126,48 @@ def _is_crud_request(request: Request) -> bool:
     return request.url.path.startswith(crud_prefixes)
 
 
+def _route_template(request: Request) -> str:
+    # The router stores the matched route in the scope; its path is the
+    # template (/api/v1/books/{book_uid}), which keeps metric labels bounded.
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _query_fields(stats: QueryStats) -> dict:
+    return {"db_queries": stats.queries, "db_rows": stats.rows, "db_time_ms": stats.db_time_ms}
+
+
+def _check_query_budget(request: Request, stats: QueryStats) -> None:
+    statement, repeats = stats.most_repeated()
+    if stats.queries <= Config.DB_QUERY_BUDGET and repeats < Config.DB_REPEATED_QUERY_LIMIT:
+        return
+    logger.warning(
+        "Query budget exceeded",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            **_query_fields(stats),
+            "repeated_statement": statement[:500] if repeats > 1 else None,
+            "repeated_count": repeats,
+        },
+    )
+
+
 @app.middleware("http")
 async def request_context_logging_middleware(request: Request, call_next):
     request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
     request.state.request_id = request_id
     set_request_id(request_id)
+    query_stats = start_query_stats()
 
     start_time = perf_counter()
+    request_metrics.request_started()
     try:
         response = await call_next(request)
     except Exception:
-        duration_ms = round((perf_counter() - start_time) * 1000, 2)
+        elapsed = perf_counter() - start_time
+        request_metrics.request_finished(request.method, _route_template(request), 500, elapsed)
+        duration_ms = round(elapsed * 1000, 2)
         logger.exception(
             "Request failed",
             extra={
@@ -88,26 +175,44 @@ async def request_context_logging_middleware(request: Request, call_next):
                 "path": request.url.path,
                 "status_code": 500,
                 "duration_ms": duration_ms,
+                **_query_fields(query_stats),
             },
         )
+        clear_query_stats()
         clear_request_id()
         raise
 
     response.headers["X-Request-ID"] = request_id
-    duration_ms = round((perf_counter() - start_time) * 1000, 2)
-    log_payload = {
-        "method": request.method,
-        "path": request.url.path,
-        "status_code": response.status_code,
-        "duration_ms": duration_ms,
-    }
+    if Config.DEBUG:
+        response.headers["X-DB-Queries"] = str(query_stats.queries)
+        response.headers["X-DB-Rows"] = str(query_stats.rows)
+        response.headers["X-DB-Time-Ms"] = str(query_stats.db_time_ms)
+    _check_query_budget(request, query_stats)
+    elapsed = perf_counter() - start_time
+    request_metrics.request_finished(request.method, _route_template(request), response.status_code, elapsed)
+    duration_ms = round(elapsed * 1000, 2)
     if response.status_code >= 400:
-        log_payload["error_code"] = getattr(request.state, "error_code", None)
-        log_payload["error_message"] = getattr(request.state, "error_message", None)
-        log_payload["error_details"] = getattr(request.state, "error_details", None)
+        log_payload = {
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": duration_ms,
+            "error_code": getattr(request.state, "error_code", None),
+            "error_message": getattr(request.state, "error_message", None),
+            "error_details": getattr(request.state, "error_details", None),
+            **_query_fields(query_stats),
+        }
         logger.error("Request failed", extra=log_payload)
-    else:
+    elif should_log_success():
+        log_payload = {
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": duration_ms,
+            **_query_fields(query_stats),
+        }
         logger.info("Request completed", extra=log_payload)
+    clear_query_stats()
     clear_request_id()
     return response
 
@@ -166,6 +271,56 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     )
 
 
+_POOL_GAUGE_HELP = {
+    "size": "Persistent connections the pool keeps.",
+    "checkedin": "Idle connections available in the pool.",
+    "checkedout": "Connections currently checked out.",
+    "overflow": "Connections open beyond the pool size (negative while the pool is filling).",
+}
+
+
+_PASSWORD_HASH_GAUGE_HELP = {
+    "in_flight": "Password hashes running or waiting for a bcrypt thread.",
+    "queue_depth": "Password hashes waiting for a bcrypt thread.",
+}
+
+_PASSWORD_HASH_COUNTER_HELP = {
+    "completed": "Password hashes and verifications finished.",
+    "failed": "Password hashes and verifications that raised.",
+    "rejected": "Password operations refused because the queue was full (503 AUTH_BUSY).",
+}
+
+
+_LOG_COUNTER_HELP = {
+    "dropped": "Log records dropped because the log queue was full.",
+    "sampled_out": "Successful-request log lines skipped by LOG_SUCCESS_SAMPLE_RATE.",
+}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    gauges = {
+        f"bookly_db_pool_{name}": (_POOL_GAUGE_HELP[name], value)
+        for name, value in pool_stats().items()
+    }
+    hasher_stats = password_hasher.stats()
+    gauges.update({
+        f"bookly_password_hash_{name}": (help_text, hasher_stats[name])
+        for name, help_text in _PASSWORD_HASH_GAUGE_HELP.items()
+    })
+    counters = {
+        f"bookly_password_hash_{name}_total": (help_text, hasher_stats[name])
+        for name, help_text in _PASSWORD_HASH_COUNTER_HELP.items()
+    }
+    logging_stats = get_logging_stats()
+    gauges["bookly_log_queue_depth"] = ("Log records waiting for the writer thread.", logging_stats["queued"])
+    counters.update({
+        f"bookly_log_records_{name}_total": (help_text, logging_stats[name])
+        for name, help_text in _LOG_COUNTER_HELP.items()
+    })
+    return PlainTextResponse(request_metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
+
+
 # @app.get("/")
 # def home():
 #     d = Config.DATABASE_URL
@@ -177,3 +332,4 @@ app.include_router(author_router, prefix=f"/api/{version}/authors", tags=["Autho
 app.include_router(member_router, prefix=f"/api/{version}/members", tags=["Members"])  # Include the member router to handle member-related endpoints
 app.include_router(publisher_router, prefix=f"/api/{version}/publishers", tags=["Publishers"])  # Include the publisher router to handle publisher-related endpoints
 app.include_router(loan_router, prefix=f"/api/{version}/loans", tags=["Loans"])  # Include the loan router to handle loan-related endpoints
+app.include_router(analytics_router, prefix=f"/api/{version}/analytics", tags=["Analytics"])  # Include the analytics router to serve circulation rollups
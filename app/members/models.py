@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Column
-import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import DateTime, Index, Uuid
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -7,10 +7,13 @@ import uuid
 
 class Member(SQLModel, table=True):
     __tablename__ = "members"
+    __table_args__ = (
+        Index("ix_members_created_at_uid", "created_at", "uid"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             unique=True,
             index=True,
             nullable=False,
@@ -25,14 +28,14 @@ class Member(SQLModel, table=True):
     address: Optional[str] = Field(default=None, max_length=255)
     city: Optional[str] = Field(default=None, max_length=100)
     join_date: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     is_active: bool = Field(default=True)
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
     )
 
     def __repr__(self):
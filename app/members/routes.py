@@ -1,15 +1,19 @@
 from typing import List
 import uuid
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.auth.dependencies import AccessTokenBearer
 from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, list_etag, not_modified
+from app.common.fields import parse_fields, sparse_model
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.common.responses import api_response
 from app.common.schemas import APIResponse
 from app.db.main import get_session
 from app.members.schemas import Member, MemberCreate, MemberUpdate
-from app.members.service import MemberService
+from app.members.service import MEMBER_FIELDS, MemberService
 
 
 member_router = APIRouter()
@@ -19,16 +23,49 @@ access_token_bearer = AccessTokenBearer()
 
 @member_router.get("/", response_model=APIResponse[List[Member]])
 async def read_members(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. uid,first_name,last_name"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    members = await member_service.get_all_members(session)
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    try:
+        selected = parse_fields(fields, MEMBER_FIELDS)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_FIELDS",
+            message="Members could not be fetched",
+            details=str(exc),
+        )
+    response_type = Member if selected is None else sparse_model(Member, selected)
+    etag = None
+    try:
+        if request.headers.get("if-none-match"):
+            versions = await member_service.get_members_version(session, limit=limit, cursor=cursor)
+            etag = list_etag(request, versions[:limit], len(versions) > limit)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        members, next_cursor = await member_service.get_all_members(session, limit=limit, cursor=cursor, fields=selected)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+            message="Members could not be fetched",
+            details=str(exc),
+        )
+    if etag is None:
+        etag = list_etag(request, [(member.uid, member.updated_at) for member in members], next_cursor is not None)
+    return api_response(
+        APIResponse[List[response_type]],
+        status_code=status.HTTP_200_OK,
         data=members,
         message="Members fetched successfully",
-        errors=None,
+        next_cursor=next_cursor,
+        headers={"ETag": etag},
     )
 
 
@@ -79,12 +116,15 @@ async def read_member(
             message="Member not found",
             details=f"No member exists with uid {member_uid}",
         )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = compute_etag(member.uid, member.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return api_response(
+        APIResponse[Member],
+        status_code=status.HTTP_200_OK,
         data=member,
         message="Member fetched successfully",
-        errors=None,
+        headers={"ETag": etag},
     )
 
 
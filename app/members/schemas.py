@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from app.common.schemas import StoredEmail
 
 
 class MemberBase(BaseModel):
@@ -32,6 +33,7 @@ class MemberUpdate(BaseModel):
 
 class Member(MemberBase):
     uid: uuid.UUID
+    email: StoredEmail
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
@@ -43,7 +45,7 @@ class MemberForLoan(BaseModel):
     uid: uuid.UUID
     first_name: str
     last_name: str
-    email: EmailStr
+    email: StoredEmail
 
     class Config:
         from_attributes = True
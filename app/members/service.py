@@ -1,21 +1,54 @@
+from typing import FrozenSet
 import uuid
 
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import desc, select
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.common.cache import EntityCache
+from app.common.fields import column_fields, load_only_columns
+from app.common.pagination import DEFAULT_PAGE_SIZE, apply_keyset, build_page
 from app.members.models import Member
-from app.members.schemas import MemberCreate, MemberUpdate
+from app.members.schemas import Member as MemberSchema, MemberCreate, MemberUpdate
+
+
+member_cache = EntityCache("member", MemberSchema)
+
+# Columns a caller may pick with fields=.
+MEMBER_FIELDS = column_fields(Member)
 
 
 class MemberService:
 
-    async def get_all_members(self, session: AsyncSession):
-        statement = select(Member).order_by(desc(Member.created_at))
+    async def get_all_members(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        fields: FrozenSet[str] | None = None,
+    ):
+        statement = select(Member)
+        if fields is not None:
+            statement = statement.options(load_only_columns(Member, fields))
+        statement = apply_keyset(statement, Member, limit, cursor)
+        result = await session.exec(statement)
+        return build_page(result.all(), limit)
+
+    async def get_members_version(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ):
+        """(uid, updated_at) of the page get_all_members would return, without loading the rows."""
+        statement = apply_keyset(select(Member.uid, Member.updated_at), Member, limit, cursor)
         result = await session.exec(statement)
         return result.all()
 
     async def get_member(self, member_uid: uuid.UUID, session: AsyncSession):
+        return await member_cache.get_or_load(member_uid, lambda: self._get_member_row(member_uid, session))
+
+    async def _get_member_row(self, member_uid: uuid.UUID, session: AsyncSession):
         statement = select(Member).where(Member.uid == member_uid)
         result = await session.exec(statement)
         member = result.first()
@@ -33,7 +66,7 @@ class MemberService:
         return new_member
 
     async def update_member(self, member_uid: uuid.UUID, member_data: MemberUpdate, session: AsyncSession):
-        member = await self.get_member(member_uid, session)
+        member = await self._get_member_row(member_uid, session)
         if not member:
             return None
 
@@ -47,10 +80,11 @@ class MemberService:
             await session.rollback()
             raise ValueError("Member with this email already exists")
         await session.refresh(member)
+        await member_cache.invalidate(member_uid)
         return member
 
     async def delete_member(self, member_uid: uuid.UUID, session: AsyncSession):
-        member = await self.get_member(member_uid, session)
+        member = await self._get_member_row(member_uid, session)
         if not member:
             return False
 
@@ -60,4 +94,5 @@ class MemberService:
         except IntegrityError:
             await session.rollback()
             raise ValueError("Member cannot be deleted because it is referenced by other records")
+        await member_cache.invalidate(member_uid)
         return True
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Column, DateTime, Relationship
-import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import Index, Uuid
 from typing import Optional, List
 from datetime import datetime
 from app.books import models
@@ -8,9 +8,12 @@ import uuid
 
 class Publisher(SQLModel, table=True):
     __tablename__ = "publishers"
+    __table_args__ = (
+        Index("ix_publishers_created_at_uid", "created_at", "uid"),
+    )
     uid: uuid.UUID = Field(
         sa_column=Column(
-            pg.UUID(as_uuid=True),
+            Uuid(as_uuid=True),
             unique=True,
             index=True,
             nullable=False,
@@ -21,12 +24,12 @@ class Publisher(SQLModel, table=True):
     first_name: str = Field(..., min_length=1, max_length=50)
     last_name: str = Field(..., min_length=1, max_length=50)
     email: str = Field(index=True, unique=True)
-    books: List["models.Book"] = Relationship(back_populates="publisher", sa_relationship_kwargs={"lazy": "selectin"})
+    books: List["models.Book"] = Relationship(back_populates="publisher", sa_relationship_kwargs={"lazy": "raise"})
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now, onupdate=datetime.now)
+        sa_column=Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
     )
 
     def __repr__(self):
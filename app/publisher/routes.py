@@ -1,15 +1,20 @@
 from typing import List
 import uuid
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.auth.dependencies import AccessTokenBearer
 from app.common.error_repsonses import _error_response
+from app.common.etag import compute_etag, etag_matches, list_etag, not_modified
+from app.common.include import parse_include
+from app.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.common.responses import api_response
 from app.common.schemas import APIResponse
+from app.books.schemas import PublisherWithBooks
 from app.db.main import get_session
 from app.publisher.schemas import Publisher, PublisherCreate, PublisherUpdate
-from app.publisher.service import PublisherService
+from app.publisher.service import PUBLISHER_INCLUDES, PublisherService, publisher_version
 
 
 publisher_router = APIRouter()
@@ -17,18 +22,51 @@ publisher_service = PublisherService()
 access_token_bearer = AccessTokenBearer()
 
 
-@publisher_router.get("/", response_model=APIResponse[List[Publisher]])
+@publisher_router.get("/", response_model=APIResponse[List[PublisherWithBooks]])
 async def read_publishers(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include: str | None = Query(None, description="Comma-separated relations to embed: books"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    publishers = await publisher_service.get_all_publishers(session)
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    try:
+        relations = parse_include(include, PUBLISHER_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Publishers could not be fetched",
+            details=str(exc),
+        )
+    response_type = PublisherWithBooks if relations else Publisher
+    etag = None
+    try:
+        if request.headers.get("if-none-match"):
+            versions = await publisher_service.get_publishers_version(session, limit=limit, cursor=cursor, include=relations)
+            etag = list_etag(request, versions[:limit], len(versions) > limit)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        publishers, next_cursor = await publisher_service.get_all_publishers(session, limit=limit, cursor=cursor, include=relations)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+            message="Publishers could not be fetched",
+            details=str(exc),
+        )
+    if etag is None:
+        etag = list_etag(request, [publisher_version(publisher, relations) for publisher in publishers], next_cursor is not None)
+    return api_response(
+        APIResponse[List[response_type]],
+        status_code=status.HTTP_200_OK,
         data=publishers,
         message="Publishers fetched successfully",
-        errors=None,
+        next_cursor=next_cursor,
+        headers={"ETag": etag},
     )
 
 
@@ -63,14 +101,26 @@ async def create_publisher(
     )
 
 
-@publisher_router.get("/{publisher_uid}", response_model=APIResponse[Publisher])
+@publisher_router.get("/{publisher_uid}", response_model=APIResponse[PublisherWithBooks])
 async def read_publisher(
     request: Request,
     publisher_uid: uuid.UUID,
+    include: str | None = Query(None, description="Comma-separated relations to embed: books"),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    publisher = await publisher_service.get_publisher(publisher_uid, session)
+    try:
+        relations = parse_include(include, PUBLISHER_INCLUDES)
+    except ValueError as exc:
+        return _error_response(
+            request=request,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_INCLUDE",
+            message="Publisher could not be fetched",
+            details=str(exc),
+        )
+    response_type = PublisherWithBooks if relations else Publisher
+    publisher = await publisher_service.get_publisher(publisher_uid, session, include=relations)
     if not publisher:
         return _error_response(
             request=request,
@@ -79,12 +129,15 @@ async def read_publisher(
             message="Publisher not found",
             details=f"No publisher exists with uid {publisher_uid}",
         )
-    return APIResponse(
-        status="success",
-        statusCode=status.HTTP_200_OK,
+    etag = compute_etag(*publisher_version(publisher, relations))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return api_response(
+        APIResponse[response_type],
+        status_code=status.HTTP_200_OK,
         data=publisher,
         message="Publisher fetched successfully",
-        errors=None,
+        headers={"ETag": etag},
     )
 
 
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 import uuid
+from app.common.schemas import StoredEmail
 
 class PublisherBase(BaseModel):
     first_name: str = Field(..., min_length=1, max_length=50)
@@ -21,6 +22,7 @@ class PublisherUpdate(BaseModel):
 
 class Publisher(PublisherBase):
     uid: uuid.UUID
+    email: StoredEmail
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
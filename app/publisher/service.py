@@ -1,22 +1,81 @@
+from typing import FrozenSet
 import uuid
 
+from sqlalchemy import func, update
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import desc, select
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.books.models import Book
+from app.books.service import book_cache
+from app.common.cache import EntityCache
+from app.common.pagination import DEFAULT_PAGE_SIZE, apply_keyset, build_page
 from app.publisher.models import Publisher
-from app.publisher.schemas import PublisherCreate, PublisherUpdate
+from app.publisher.schemas import Publisher as PublisherSchema, PublisherCreate, PublisherUpdate
+
+
+publisher_cache = EntityCache("publisher", PublisherSchema)
+
+PUBLISHER_INCLUDES = {"books": Publisher.books}
+
+
+def publisher_load_options(include: FrozenSet[str]) -> list:
+    return [selectinload(PUBLISHER_INCLUDES[name]) for name in sorted(include)]
+
+
+def publisher_version(publisher, include: FrozenSet[str] = frozenset()) -> tuple:
+    """Same shape as a row of PublisherService.get_publishers_version."""
+    if "books" not in include:
+        return (publisher.uid, publisher.updated_at)
+    newest = max((book.updated_at for book in publisher.books), default=None)
+    return (publisher.uid, publisher.updated_at, newest, len(publisher.books))
 
 
 class PublisherService:
 
-    async def get_all_publishers(self, session: AsyncSession):
-        statement = select(Publisher).order_by(desc(Publisher.created_at))
+    async def get_all_publishers(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include: FrozenSet[str] = frozenset(),
+    ):
+        statement = select(Publisher).options(*publisher_load_options(include))
+        statement = apply_keyset(statement, Publisher, limit, cursor)
+        result = await session.exec(statement)
+        return build_page(result.all(), limit)
+
+    async def get_publishers_version(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include: FrozenSet[str] = frozenset(),
+    ):
+        """Version columns of the page get_all_publishers would return, without loading the rows."""
+        if "books" in include:
+            # Adding, editing, moving or deleting a book changes either the
+            # newest updated_at or the count of its publisher's books.
+            statement = (
+                select(Publisher.uid, Publisher.updated_at, func.max(Book.updated_at), func.count(Book.uid))
+                .outerjoin(Book, Book.publisher_uid == Publisher.uid)
+                .group_by(Publisher.uid, Publisher.updated_at, Publisher.created_at)
+            )
+        else:
+            statement = select(Publisher.uid, Publisher.updated_at)
+        statement = apply_keyset(statement, Publisher, limit, cursor)
         result = await session.exec(statement)
         return result.all()
 
-    async def get_publisher(self, publisher_uid: uuid.UUID, session: AsyncSession):
-        statement = select(Publisher).where(Publisher.uid == publisher_uid)
+    async def get_publisher(self, publisher_uid: uuid.UUID, session: AsyncSession, include: FrozenSet[str] = frozenset()):
+        if include:
+            # Snapshots hold the publisher alone; embedded books are always read fresh.
+            return await self._get_publisher_row(publisher_uid, session, include=include)
+        return await publisher_cache.get_or_load(publisher_uid, lambda: self._get_publisher_row(publisher_uid, session))
+
+    async def _get_publisher_row(self, publisher_uid: uuid.UUID, session: AsyncSession, include: FrozenSet[str] = frozenset()):
+        statement = select(Publisher).options(*publisher_load_options(include)).where(Publisher.uid == publisher_uid)
         result = await session.exec(statement)
         publisher = result.first()
         return publisher if publisher else None
@@ -33,7 +92,7 @@ class PublisherService:
         return new_publisher
 
     async def update_publisher(self, publisher_uid: uuid.UUID, publisher_data: PublisherUpdate, session: AsyncSession):
-        publisher = await self.get_publisher(publisher_uid, session)
+        publisher = await self._get_publisher_row(publisher_uid, session)
         if not publisher:
             return None
 
@@ -47,17 +106,26 @@ class PublisherService:
             await session.rollback()
             raise ValueError("Publisher with this email already exists")
         await session.refresh(publisher)
+        await publisher_cache.invalidate(publisher_uid)
+        await book_cache.invalidate_all()
         return publisher
 
     async def delete_publisher(self, publisher_uid: uuid.UUID, session: AsyncSession):
-        publisher = await self.get_publisher(publisher_uid, session)
+        publisher = await self._get_publisher_row(publisher_uid, session)
         if not publisher:
             return False
 
+        # Books keep existing without a publisher; detach them in one statement
+        # rather than loading the collection.
+        await session.execute(
+            update(Book).where(Book.publisher_uid == publisher_uid).values(publisher_uid=None).execution_options(synchronize_session=False)
+        )
         await session.delete(publisher)
         try:
             await session.commit()
         except IntegrityError:
             await session.rollback()
             raise ValueError("Publisher cannot be deleted because it is referenced by other records")
+        await publisher_cache.invalidate(publisher_uid)
+        await book_cache.invalidate_all()
         return True
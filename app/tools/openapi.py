@@ -0,0 +1,44 @@
+"""Write the OpenAPI document at build time.
+
+Workers started with ``OPENAPI_SCHEMA_PATH`` pointing at the written file serve
+it as is instead of generating the schema from every route. Nothing connects
+to the database, but the settings still have to load, so build steps can pass
+placeholder ``DATABASE_URL`` and ``JWT_*`` values. ``--check`` exits non-zero
+when the file no longer matches the routes, e.g. in CI.
+
+    python -m app.tools.openapi --output openapi.json
+    python -m app.tools.openapi --output openapi.json --check
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from app.main import build_openapi
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="openapi.json", help="file to write (or compare with --check)")
+    parser.add_argument("--check", action="store_true", help="compare with the file instead of writing it")
+    args = parser.parse_args(argv)
+
+    schema = build_openapi()
+    if args.check:
+        try:
+            with open(args.output, encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except FileNotFoundError:
+            stored = None
+        if stored != schema:
+            print(f"{args.output} is out of date; regenerate it with python -m app.tools.openapi --output {args.output}")
+            sys.exit(1)
+        print(f"{args.output} is up to date.")
+        return
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(schema, fh, separators=(",", ":"))
+    print(f"Wrote {len(schema['paths'])} paths to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
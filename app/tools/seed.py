@@ -0,0 +1,361 @@
+"""Bulk-load synthetic data for scale testing.
+
+Generates authors, publishers, books, members, users and loans straight into
+their tables, bypassing the service layer: ``COPY`` through asyncpg on
+Postgres, executemany INSERTs elsewhere (SQLite). Rows are appended under a
+fresh run id, so ISBNs, emails and usernames never collide with existing
+data, and every foreign key points at a row loaded earlier in the run.
+
+Loans follow skewed popularity: books are drawn with a Zipf-like law of
+exponent ``--book-skew`` and members with ``--member-skew`` (0 is uniform).
+``--active-fraction`` of loans are still open, at most one per member and
+book as ``uq_loans_active_book_member`` requires and never more than the
+book's copies; a book's ``available_copies`` is what its open loans leave on
+the shelf. The rest were returned within the last ``--history-days`` days,
+fined per ``FINE_*`` settings when late.
+
+    python -m app.tools.seed --authors 100000 --publishers 100000 --books 1000000 \\
+        --members 500000 --users 1000 --loans 50000000
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import repeat
+from time import perf_counter
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from app.auth.models import User
+from app.auth.utils import generate_password_hash
+from app.books.models import Author, Book, Publisher
+from app.config import Config
+from app.db.main import engine, init_db
+from app.loans.models import Loan
+from app.members.models import Member
+
+
+FIRST_NAMES = ["Ada", "Bola", "Chen", "Dara", "Emeka", "Farah", "Goran", "Hana", "Ines", "Jon", "Kemi", "Luis"]
+LAST_NAMES = ["Okafor", "Silva", "Nguyen", "Haddad", "Kowalski", "Mensah", "Ito", "Novak", "Reyes", "Berg"]
+WORDS = [
+    "harry", "potter", "stone", "chamber", "secret", "lord", "rings", "tower",
+    "shadow", "river", "garden", "winter", "summer", "empire", "ocean", "night",
+    "silent", "golden", "broken", "hidden", "kingdom", "journey", "storm", "city",
+    "machine", "history", "letters", "dragon", "island", "mountain", "forest", "glass",
+]
+# Listed from most to least common.
+CITIES = ["Lagos", "Lima", "Oslo", "Pune", "Quito", "Rome", "Seoul", "Tunis", "Accra", "Hanoi"]
+LANGUAGES = ["en", "es", "fr", "de", "hi", "pt", "ja"]
+SEED_PASSWORD = "seed-password"
+SECONDS_PER_DAY = 86400
+ZERO = Decimal("0.00")
+
+
+def zipf_sampler(rng: np.random.Generator, size: int, skew: float) -> Callable[[int], np.ndarray]:
+    """Draw indexes in ``range(size)`` where the k-th most popular has weight ``1 / k**skew``.
+
+    Popularity ranks are shuffled so the popular rows are spread over the table.
+    """
+    cdf = np.cumsum(1.0 / np.arange(1, size + 1, dtype=np.float64) ** skew)
+    cdf /= cdf[-1]
+    ranked = rng.permutation(size)
+
+    def sample(count: int) -> np.ndarray:
+        return ranked[np.minimum(np.searchsorted(cdf, rng.random(count)), size - 1)]
+
+    return sample
+
+
+def sequential_uids(rng: np.random.Generator, start: int, count: int) -> List[uuid.UUID]:
+    # A random 64-bit prefix per table and run, then a counter: unique, cheap
+    # to build and appended in index order.
+    prefix = int(rng.integers(1, 2**63)) << 64
+    return [uuid.UUID(int=prefix | index) for index in range(start, start + count)]
+
+
+def timestamps(now: datetime, seconds_ago: np.ndarray) -> list:
+    """Naive datetimes ``seconds_ago`` before ``now``, as the app writes them."""
+    return (np.datetime64(now, "us") - seconds_ago.astype("timedelta64[s]")).tolist()
+
+
+class BulkLoader:
+    """Appends records (tuples in ``columns`` order) to a table, one transaction per chunk."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.copy = engine.dialect.driver == "asyncpg"
+
+    async def load(self, table, columns: List[str], records: list) -> None:
+        async with self.engine.begin() as conn:
+            if self.copy:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+            else:
+                await conn.execute(insert(table), [dict(zip(columns, record)) for record in records])
+
+    async def analyze(self, tables) -> None:
+        if not self.copy:
+            return
+        async with self.engine.begin() as conn:
+            for table in tables:
+                await conn.execute(text(f"ANALYZE {table.name}"))
+
+
+def _people(uids, kind: str, run_id: str, now: datetime, start: int) -> Iterator[tuple]:
+    for offset, uid in enumerate(uids):
+        index = start + offset
+        yield (
+            uid,
+            FIRST_NAMES[index % len(FIRST_NAMES)],
+            LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)],
+            f"{kind}-{run_id}-{index}@seed.example.com",
+            now,
+            now,
+        )
+
+
+class Generator:
+    """Synthetic rows for one run; ``--seed`` makes the run reproducible."""
+
+    def __init__(self, args, now: datetime):
+        self.args = args
+        self.now = now
+        self.rng = np.random.default_rng(args.seed)
+        self.run_id = f"{int(self.rng.integers(16**8)):08x}"
+        # Catalog rows predate the loan history they are borrowed in.
+        self.catalog_age = (args.history_days + 365) * SECONDS_PER_DAY
+        # Kept in memory so books and loans can reference them by index.
+        self.author_uids = sequential_uids(self.rng, 0, args.authors)
+        self.publisher_uids = sequential_uids(self.rng, 0, args.publishers)
+        self.book_uids = sequential_uids(self.rng, 0, args.books)
+        self.member_uids = sequential_uids(self.rng, 0, args.members)
+        self.copies = self.rng.integers(0, args.max_copies + 1, args.books)
+        if args.loans:
+            self.book_sampler = zipf_sampler(self.rng, args.books, args.book_skew)
+            self.member_sampler = zipf_sampler(self.rng, args.members, args.member_skew)
+        # Open loans are drawn before the books are written, so each book's
+        # available_copies can leave out the copies they hold.
+        self.open_books, self.open_members = self._open_loans()
+        self.available_copies = self.copies - np.bincount(self.open_books, minlength=args.books)
+
+    def _open_loans(self):
+        """(book indexes, member indexes) of the open loans, within each book's copies."""
+        args = self.args
+        if not args.loans:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        count = int(self.rng.binomial(args.loans, args.active_fraction))
+        books, members = self.book_sampler(count), self.member_sampler(count)
+        # At most one open loan per (book, member); the first draw wins.
+        _, first = np.unique(books * args.members + members, return_index=True)
+        first.sort()
+        books, members = books[first], members[first]
+        # Rank of each draw among the draws of its book, in draw order.
+        order = np.argsort(books, kind="stable")
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(len(order)) - np.searchsorted(books[order], books[order])
+        within_stock = ranks < self.copies[books]
+        return books[within_stock], members[within_stock]
+
+    def _created(self, count: int) -> list:
+        return timestamps(self.now, self.rng.integers(self.catalog_age // 2, self.catalog_age, count))
+
+    def people(self, kind: str, uids: List[uuid.UUID]) -> Iterator[list]:
+        created = self.now - timedelta(seconds=self.catalog_age)
+        for start in range(0, len(uids), self.args.chunk_size):
+            yield list(_people(uids[start:start + self.args.chunk_size], kind, self.run_id, created, start))
+
+    def books(self) -> Iterator[list]:
+        args, rng = self.args, self.rng
+        authors = zipf_sampler(rng, len(self.author_uids), args.author_skew)
+        publishers = zipf_sampler(rng, len(self.publisher_uids), args.author_skew) if self.publisher_uids else None
+        for start in range(0, args.books, args.chunk_size):
+            count = min(args.chunk_size, args.books - start)
+            author_uids = [self.author_uids[index] for index in authors(count).tolist()]
+            publisher_uids = (
+                [self.publisher_uids[index] for index in publishers(count).tolist()] if publishers else repeat(None)
+            )
+            word_counts = rng.integers(2, 6, count).tolist()
+            titles = [" ".join(random.sample(WORDS, words)).title() for words in word_counts]
+            created = self._created(count)
+            # A plain SQLModel datetime field: it only accepts aware values.
+            published = [
+                value.replace(tzinfo=timezone.utc)
+                for value in timestamps(self.now, rng.integers(self.catalog_age, self.catalog_age * 10, count))
+            ]
+            yield list(zip(
+                self.book_uids[start:start + count],
+                titles,
+                author_uids,
+                publisher_uids,
+                (f"S{self.run_id}{index:011d}" for index in range(start, start + count)),
+                repeat(None),
+                published,
+                rng.integers(40, 1200, count).tolist(),
+                rng.choice(LANGUAGES, count, p=_skewed_weights(len(LANGUAGES))).tolist(),
+                self.available_copies[start:start + count].tolist(),
+                created,
+                created,
+            ))
+
+    def members(self) -> Iterator[list]:
+        args, rng = self.args, self.rng
+        for start in range(0, args.members, args.chunk_size):
+            count = min(args.chunk_size, args.members - start)
+            created = self._created(count)
+            cities = rng.choice(CITIES, count, p=_skewed_weights(len(CITIES))).tolist()
+            yield [
+                (uid, first, last, email, None, None, city, joined, True, joined, joined)
+                for (uid, first, last, email, _, _), city, joined in zip(
+                    _people(self.member_uids[start:start + count], "member", self.run_id, self.now, start),
+                    cities,
+                    created,
+                )
+            ]
+
+    def users(self) -> Iterator[list]:
+        # One bcrypt hash for everyone: hashing per user would dominate the run.
+        password_hash = generate_password_hash(SEED_PASSWORD)
+        args = self.args
+        for start in range(0, args.users, args.chunk_size):
+            count = min(args.chunk_size, args.users - start)
+            uids = sequential_uids(self.rng, start, count)
+            yield [
+                (uid, email.split("@")[0], email, password_hash, first, last, True, True, created, created)
+                for uid, first, last, email, created, _ in _people(uids, "user", self.run_id, self.now, start)
+            ]
+
+    def loans(self) -> Iterator[list]:
+        args, rng = self.args, self.rng
+        loan_seconds = args.loan_days * SECONDS_PER_DAY
+        history_seconds = args.history_days * SECONDS_PER_DAY
+        daily_cents = int(round(Config.FINE_DAILY_RATE * 100))
+        max_cents = int(round(Config.FINE_MAX_AMOUNT * 100))
+        fines = {}
+        opened = 0
+        for start in range(0, args.loans, args.chunk_size):
+            count = min(args.chunk_size, args.loans - start)
+            book_index = self.book_sampler(count)
+            member_index = self.member_sampler(count)
+            # Spread the planned open loans over the chunks at random, all of them by the last one.
+            remaining_open = len(self.open_books) - opened
+            open_here = int(rng.hypergeometric(remaining_open, args.loans - start - remaining_open, count))
+            active = np.zeros(count, dtype=bool)
+            active[rng.choice(count, open_here, replace=False)] = True
+            book_index[active] = self.open_books[opened:opened + open_here]
+            member_index[active] = self.open_members[opened:opened + open_here]
+            opened += open_here
+
+            # Open loans started within two loan periods, so some are overdue;
+            # returned ones anywhere in the history, kept up to twice the period.
+            borrowed_ago = np.where(
+                active,
+                rng.integers(0, 2 * loan_seconds, count),
+                rng.integers(2 * loan_seconds, max(history_seconds, 2 * loan_seconds + 1), count),
+            )
+            kept = rng.integers(SECONDS_PER_DAY, 2 * loan_seconds, count)
+            returned_ago = borrowed_ago - kept
+            late_days = np.maximum(kept - loan_seconds, 0) // SECONDS_PER_DAY
+            fine_cents = np.where(active, 0, np.minimum(late_days * daily_cents, max_cents))
+            for cents in np.unique(fine_cents).tolist():
+                if cents not in fines:
+                    fines[cents] = Decimal(cents) / 100
+
+            borrowed = timestamps(self.now, borrowed_ago)
+            due = timestamps(self.now, borrowed_ago - loan_seconds)
+            returned = [
+                None if is_open else value
+                for value, is_open in zip(timestamps(self.now, returned_ago), active.tolist())
+            ]
+            yield list(zip(
+                sequential_uids(rng, start, count),
+                [self.book_uids[index] for index in book_index.tolist()],
+                [self.member_uids[index] for index in member_index.tolist()],
+                borrowed,
+                due,
+                repeat(None),
+                returned,
+                [fines[cents] for cents in fine_cents.tolist()],
+                repeat(ZERO),
+                borrowed,
+                [value or start_at for value, start_at in zip(returned, borrowed)],
+            ))
+
+
+def _skewed_weights(count: int) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1)
+    return weights / weights.sum()
+
+
+async def _load_table(loader: BulkLoader, model, chunks, report: list) -> None:
+    table = model.__table__
+    columns = list(table.columns.keys())
+    rows = 0
+    started = perf_counter()
+    for records in chunks:
+        await loader.load(table, columns, records)
+        rows += len(records)
+        elapsed = perf_counter() - started
+        print(f"  {table.name:<12} {rows:>12,} rows  {rows / elapsed * 60:>14,.0f} rows/min", end="\r", flush=True)
+    seconds = perf_counter() - started
+    print(" " * 72, end="\r")
+    report.append({"table": table.name, "rows": rows, "seconds": round(seconds, 1)})
+
+
+async def seed(args) -> list:
+    if args.create_tables:
+        await init_db()
+    random.seed(args.seed)
+    generator = Generator(args, datetime.now())
+    loader = BulkLoader(engine)
+    report: list = []
+    try:
+        await _load_table(loader, Author, generator.people("author", generator.author_uids), report)
+        await _load_table(loader, Publisher, generator.people("publisher", generator.publisher_uids), report)
+        await _load_table(loader, Book, generator.books(), report)
+        await _load_table(loader, Member, generator.members(), report)
+        await _load_table(loader, User, generator.users(), report)
+        await _load_table(loader, Loan, generator.loans(), report)
+        await loader.analyze([Author.__table__, Publisher.__table__, Book.__table__, Member.__table__, User.__table__, Loan.__table__])
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--publishers", type=int, default=200)
+    parser.add_argument("--books", type=int, default=10000)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--loans", type=int, default=100000)
+    parser.add_argument("--book-skew", type=float, default=1.0, help="Zipf exponent of book popularity in loans")
+    parser.add_argument("--member-skew", type=float, default=0.5, help="Zipf exponent of member activity")
+    parser.add_argument("--author-skew", type=float, default=0.8, help="Zipf exponent of books per author/publisher")
+    parser.add_argument("--active-fraction", type=float, default=0.02, help="share of loans still open")
+    parser.add_argument("--loan-days", type=int, default=14, help="days between borrowing and due date")
+    parser.add_argument("--history-days", type=int, default=1095, help="days of loan history")
+    parser.add_argument("--max-copies", type=int, default=10, help="upper bound of copies per book, on loan or not")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows per COPY/INSERT transaction")
+    parser.add_argument("--seed", type=int, help="random seed; the same seed regenerates the same rows")
+    parser.add_argument("--create-tables", action="store_true", help="create missing tables first (no migrations)")
+    args = parser.parse_args(argv)
+
+    if args.books and not args.authors:
+        parser.error("--books needs at least one author")
+    if args.loans and not (args.books and args.members):
+        parser.error("--loans needs books and members")
+
+    report = asyncio.run(seed(args))
+    print(f"{'table':<12} {'rows':>12} {'seconds':>9} {'rows/min':>14}")
+    for row in report:
+        rate = f"{row['rows'] / row['seconds'] * 60:,.0f}" if row["seconds"] else "-"
+        print(f"{row['table']:<12} {row['rows']:>12,} {row['seconds']:>9} {rate:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Analytics rollup refresh cost against the amount of new loan activity.
+
+Seeds ``--base`` returned loans and folds them into the rollups once, then
+for each size in ``--changes`` inserts and updates that many loans (half
+each) and times the incremental refresh. The refresh time should follow
+the number of changed loans, not the size of ``loans``. Seeded rows and
+their rollup contributions are removed afterwards. Runs against
+``DATABASE_URL``.
+
+    python -m bench.analytics_refresh --base 200000 --changes 0,100,1000,10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, insert, update
+
+from app.analytics.rollups import refresh_loan_rollups, remove_loan_facts
+from app.books.models import Author, Book
+from app.db.main import async_session_maker, engine
+from app.loans.models import Loan
+from app.members.models import Member
+
+
+CITIES = ["Lagos", "Lima", "Oslo", "Pune", "Quito", "Rome", "Seoul", "Tunis", None]
+LANGUAGES = ["en", "fr", "de", "es", "hi", None]
+INSERT_CHUNK = 5000
+
+
+async def _insert(session, model, rows) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        await session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+def _loan_rows(count: int, book_uids, member_uids, updated_at: datetime):
+    rows = []
+    for _ in range(count):
+        borrowed_at = updated_at - timedelta(days=random.randint(1, 365))
+        rows.append({
+            "uid": uuid.uuid4(),
+            "book_uid": random.choice(book_uids),
+            "member_uid": random.choice(member_uids),
+            "borrowed_at": borrowed_at,
+            "due_date": borrowed_at + timedelta(days=14),
+            "returned_at": borrowed_at + timedelta(days=random.randint(1, 30)),
+            "fine_amount": Decimal(random.randint(0, 8) * 50) / 100,
+            "created_at": updated_at,
+            "updated_at": updated_at,
+        })
+    return rows
+
+
+async def seed(books: int, members: int, base: int):
+    run_id = uuid.uuid4().hex[:12]
+    past = datetime.now() - timedelta(days=2)
+    author_uid = uuid.uuid4()
+    book_uids = [uuid.uuid4() for _ in range(books)]
+    member_uids = [uuid.uuid4() for _ in range(members)]
+    async with async_session_maker() as session:
+        await session.execute(insert(Author).values(
+            uid=author_uid, first_name="Analytics", last_name="Bench", email=f"analytics-{run_id}@bench.local",
+            created_at=past, updated_at=past,
+        ))
+        await _insert(session, Book, [
+            {
+                "uid": uid, "title": f"Analytics {run_id} {i}", "author_uid": author_uid, "isbn": f"A{run_id}{i}",
+                "language": random.choice(LANGUAGES), "available_copies": 10, "created_at": past, "updated_at": past,
+            }
+            for i, uid in enumerate(book_uids)
+        ])
+        await _insert(session, Member, [
+            {
+                "uid": uid, "first_name": "Analytics", "last_name": str(i), "email": f"analytics-{run_id}-{i}@bench.local",
+                "city": random.choice(CITIES), "is_active": True, "join_date": past, "created_at": past, "updated_at": past,
+            }
+            for i, uid in enumerate(member_uids)
+        ])
+        loans = _loan_rows(base, book_uids, member_uids, past)
+        await _insert(session, Loan, loans)
+        await session.commit()
+    return author_uid, book_uids, member_uids, [loan["uid"] for loan in loans]
+
+
+async def add_activity(count: int, book_uids, member_uids, loan_uids) -> None:
+    """Insert ``count // 2`` loans and change the fine on ``count - count // 2`` existing ones."""
+    now = datetime.now()
+    new_loans = _loan_rows(count // 2, book_uids, member_uids, now)
+    async with async_session_maker() as session:
+        await _insert(session, Loan, new_loans)
+        for loan_uid in random.sample(loan_uids, count - count // 2):
+            await session.execute(
+                update(Loan).where(Loan.uid == loan_uid).values(fine_amount=Loan.fine_amount + Decimal("0.50"), updated_at=now)
+            )
+        await session.commit()
+    loan_uids.extend(loan["uid"] for loan in new_loans)
+
+
+async def cleanup(author_uid, book_uids, member_uids, loan_uids) -> None:
+    async with async_session_maker() as session:
+        for start in range(0, len(loan_uids), INSERT_CHUNK):
+            chunk = loan_uids[start:start + INSERT_CHUNK]
+            await remove_loan_facts(session, chunk)
+            await session.execute(delete(Loan).where(Loan.uid.in_(chunk)))
+        await session.execute(delete(Book).where(Book.uid.in_(book_uids)))
+        await session.execute(delete(Member).where(Member.uid.in_(member_uids)))
+        await session.execute(delete(Author).where(Author.uid == author_uid))
+        await session.commit()
+
+
+async def run(books: int, members: int, base: int, changes, batch_size: int) -> list:
+    author_uid, book_uids, member_uids, loan_uids = await seed(books, members, base)
+    results = []
+    try:
+        stats = await refresh_loan_rollups(async_session_maker, batch_size=batch_size, lag_seconds=0)
+        results.append({"phase": "initial", "loans": len(loan_uids), **stats})
+        for count in changes:
+            await add_activity(count, book_uids, member_uids, loan_uids)
+            stats = await refresh_loan_rollups(async_session_maker, batch_size=batch_size, lag_seconds=0)
+            results.append({"phase": f"+{count}", "loans": len(loan_uids), **stats})
+    finally:
+        await cleanup(author_uid, book_uids, member_uids, loan_uids)
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=500)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--base", type=int, default=200000, help="loans seeded before the first refresh")
+    parser.add_argument("--changes", default="0,100,1000,10000", help="comma separated activity sizes")
+    parser.add_argument("--batch-size", type=int, default=5000, help="loans folded in per refresh transaction")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    changes = [int(count) for count in args.changes.split(",")]
+    results = asyncio.run(run(args.books, args.members, args.base, changes, args.batch_size))
+
+    print(f"{'phase':>10} {'loans':>10} {'scanned':>10} {'changed':>10} {'seconds':>10} {'us/change':>10}")
+    for row in results:
+        per_change = round(row["seconds"] * 1e6 / row["changed"]) if row["changed"] else "-"
+        print(
+            f"{row['phase']:>10} {row['loans']:>10} {row['scanned']:>10} {row['changed']:>10} "
+            f"{row['seconds']:>10} {per_change:>10}"
+        )
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare benchmark results with a stored baseline.
+
+Results are flat ``{name: {metric: value}}`` mappings written as JSON, so a
+run saved with ``--json`` can later be passed back as ``--baseline``.
+
+No baselines are committed: timings depend on the CPU, the database server
+and its data, so a file recorded on one machine would gate runs on another.
+``bench/baselines/`` is git-ignored; record one there on the machine that
+runs the check.
+"""
+import json
+import os
+from typing import Dict, List
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_results(path: str, results) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+
+
+def find_regressions(current: dict, baseline: dict, metrics: Dict[str, bool], tolerance: float) -> List[dict]:
+    """Entries of ``current`` worse than ``baseline`` by more than ``tolerance`` (0.2 = 20%).
+
+    ``metrics`` maps each compared metric to True when higher is better
+    (throughput) and False when lower is better (latency). Names or metrics
+    missing from either side are not compared.
+    """
+    regressions = []
+    for name, values in current.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, higher_is_better in metrics.items():
+            now, before = values.get(metric), reference.get(metric)
+            if now is None or not before:
+                continue
+            change = (now - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({
+                    "name": name,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": now,
+                    "change_pct": round(change * 100, 1),
+                })
+    return regressions
+
+
+def print_regressions(regressions: List[dict], tolerance: float) -> None:
+    if not regressions:
+        print(f"No regressions beyond {tolerance:.0%} of the baseline.")
+        return
+    print(f"{len(regressions)} regression(s) beyond {tolerance:.0%} of the baseline:")
+    for row in regressions:
+        print(
+            f"  {row['name']:<40} {row['metric']:<10} {row['baseline']:>10} -> {row['current']:>10} "
+            f"({row['change_pct']:+}%)"
+        )
@@ -0,0 +1,389 @@
+"""End-to-end load test of the API with scripted traffic mixes.
+
+Seeds a scratch catalog (authors, books with skewed popularity, members and
+signin users), then for each ``--scenario`` runs ``--concurrency`` virtual
+users for ``--duration`` seconds after a ``--warmup``. Each virtual user
+loops over the scenario's weighted operations:
+
+    signin    POST /auth/signin storms (bcrypt bound)
+    browse    book lists with filters, q= search, next pages and book details
+    checkout  POST /loans/ followed by PATCH /loans/{uid}/return
+    mixed     mostly browsing, with checkouts, active loan lists and signins
+
+Requests go through an in-process ASGI transport by default, or through a
+real uvicorn socket with ``--mode socket``. Throughput and p50/p95/p99
+latency are reported per route. ``--json`` saves the results; passing a
+saved file as ``--baseline`` exits non-zero when a route's throughput or
+p95 is worse by more than ``--tolerance``; only baseline rows recorded
+with the same ``--mode`` and ``--concurrency`` are compared. Seeded rows are removed
+afterwards. Runs against ``DATABASE_URL``.
+
+    python -m bench.load_test --scenario browse,checkout,mixed --concurrency 50 --duration 30
+    python -m bench.load_test --json bench/baselines/load.json
+    python -m bench.load_test --baseline bench/baselines/load.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import uuid
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+from time import perf_counter
+
+import httpx
+import uvicorn
+from sqlalchemy import delete, insert
+
+from app.auth.models import User
+from app.auth.utils import generate_password_hash
+from app.books.models import Author, Book
+from app.config import Config
+from app.db.main import async_session_maker
+from app.loans.models import Loan
+from app.main import app, version
+from app.members.models import Member
+from bench.baseline import find_regressions, load_results, print_regressions, save_results
+
+
+API = f"/api/{version}"
+WORDS = [
+    "harry", "potter", "stone", "chamber", "secret", "lord", "rings", "tower",
+    "shadow", "river", "garden", "winter", "summer", "empire", "ocean", "night",
+    "silent", "golden", "broken", "hidden", "kingdom", "journey", "storm", "city",
+]
+LANGUAGES = ["en", "fr", "de", "es", "hi"]
+PASSWORD = "load-test-password"
+INSERT_CHUNK = 5000
+# Compared against --baseline: True when higher is better.
+BASELINE_METRICS = {"rps": True, "p95_ms": False}
+
+
+class Catalog:
+    """Seeded rows the operations pick from; books are drawn with Zipf-like popularity."""
+
+    def __init__(self, author_uids, book_uids, isbns, member_uids, user_emails, skew: float):
+        self.author_uids = author_uids
+        self.book_uids = book_uids
+        self.isbns = isbns
+        self.member_uids = member_uids
+        self.user_emails = user_emails
+        self.book_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(len(book_uids))))
+
+    def popular_book(self) -> int:
+        return random.choices(range(len(self.book_uids)), cum_weights=self.book_weights)[0]
+
+
+class Recorder:
+    def __init__(self):
+        self.recording = False
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def reset(self, recording: bool) -> None:
+        self.recording = recording
+        self.latencies.clear()
+        self.statuses.clear()
+
+
+class Workload:
+    """What one virtual user needs to issue requests and record their timings."""
+
+    def __init__(self, client: httpx.AsyncClient, catalog: Catalog, recorder: Recorder, token: str):
+        self.client = client
+        self.catalog = catalog
+        self.recorder = recorder
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def request(self, route: str, method: str, url: str, **kwargs):
+        started = perf_counter()
+        try:
+            response = await self.client.request(method, API + url, headers=self.headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, "error"
+        if self.recorder.recording:
+            self.recorder.latencies[route].append(perf_counter() - started)
+            self.recorder.statuses[route][status] += 1
+        return response
+
+
+async def signin(workload: Workload) -> None:
+    email = random.choice(workload.catalog.user_emails)
+    await workload.request("POST /auth/signin", "POST", "/auth/signin", json={"email": email, "password": PASSWORD})
+
+
+async def list_books(workload: Workload) -> None:
+    await workload.request("GET /books/", "GET", "/books/", params={"limit": 20})
+
+
+async def filter_books(workload: Workload) -> None:
+    catalog = workload.catalog
+    kind = random.choice(("author_uid", "isbn", "title"))
+    if kind == "author_uid":
+        value = str(random.choice(catalog.author_uids))
+    elif kind == "isbn":
+        value = catalog.isbns[catalog.popular_book()]
+    else:
+        value = random.choice(WORDS)
+    await workload.request(f"GET /books/?{kind}=", "GET", "/books/", params={kind: value, "limit": 20})
+
+
+async def search_books(workload: Workload) -> None:
+    q = " ".join(random.sample(WORDS, random.randint(1, 2)))
+    await workload.request("GET /books/?q=", "GET", "/books/", params={"q": q[:random.randint(3, len(q))], "limit": 20})
+
+
+async def next_page(workload: Workload) -> None:
+    response = await workload.request("GET /books/", "GET", "/books/", params={"limit": 20})
+    cursor = response.json().get("next_cursor") if response is not None and response.status_code == 200 else None
+    if cursor:
+        await workload.request("GET /books/?cursor=", "GET", "/books/", params={"limit": 20, "cursor": cursor})
+
+
+async def book_detail(workload: Workload) -> None:
+    uid = workload.catalog.book_uids[workload.catalog.popular_book()]
+    await workload.request("GET /books/{uid}", "GET", f"/books/{uid}")
+
+
+async def checkout_return(workload: Workload) -> None:
+    catalog = workload.catalog
+    now = datetime.now()
+    response = await workload.request("POST /loans/", "POST", "/loans/", json={
+        "book_uid": str(catalog.book_uids[catalog.popular_book()]),
+        "member_uid": str(random.choice(catalog.member_uids)),
+        "due_date": (now + timedelta(days=14)).isoformat(),
+    })
+    if response is not None and response.status_code == 201:
+        loan_uid = response.json()["data"]["uid"]
+        await workload.request("PATCH /loans/{uid}/return", "PATCH", f"/loans/{loan_uid}/return", json={})
+
+
+async def active_loans(workload: Workload) -> None:
+    await workload.request("GET /loans/?active=true", "GET", "/loans/", params={"active": "true", "limit": 20})
+
+
+SCENARIOS = {
+    "signin": [(signin, 1)],
+    "browse": [(list_books, 3), (filter_books, 2), (search_books, 2), (next_page, 1), (book_detail, 4)],
+    "checkout": [(checkout_return, 1)],
+    "mixed": [
+        (book_detail, 8), (list_books, 4), (search_books, 3), (filter_books, 2),
+        (checkout_return, 3), (active_loans, 1), (signin, 1),
+    ],
+}
+
+
+async def _insert(session, model, rows) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        await session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+async def seed(authors: int, books: int, members: int, users: int, skew: float) -> Catalog:
+    run_id = uuid.uuid4().hex[:12]
+    now = datetime.now()
+    author_uids = [uuid.uuid4() for _ in range(authors)]
+    book_uids = [uuid.uuid4() for _ in range(books)]
+    isbns = [f"L{run_id}{i:07d}" for i in range(books)]
+    member_uids = [uuid.uuid4() for _ in range(members)]
+    user_emails = [f"load-{run_id}-{i}@bench.example.com" for i in range(users)]
+    # One bcrypt hash shared by every user: signins still verify it in full.
+    password_hash = generate_password_hash(PASSWORD)
+    async with async_session_maker() as session:
+        await _insert(session, Author, [
+            {"uid": uid, "first_name": "Load", "last_name": str(i), "email": f"load-{run_id}-author-{i}@bench.example.com",
+             "created_at": now, "updated_at": now}
+            for i, uid in enumerate(author_uids)
+        ])
+        await _insert(session, Book, [
+            {
+                "uid": uid, "title": " ".join(random.sample(WORDS, 3)).title(), "author_uid": random.choice(author_uids),
+                "isbn": isbns[i], "language": random.choice(LANGUAGES), "available_copies": 5,
+                "created_at": now - timedelta(seconds=i), "updated_at": now,
+            }
+            for i, uid in enumerate(book_uids)
+        ])
+        await _insert(session, Member, [
+            {"uid": uid, "first_name": "Load", "last_name": str(i), "email": f"load-{run_id}-member-{i}@bench.example.com",
+             "is_active": True, "join_date": now, "created_at": now, "updated_at": now}
+            for i, uid in enumerate(member_uids)
+        ])
+        await _insert(session, User, [
+            {"uid": uuid.uuid4(), "username": email.split("@")[0], "email": email, "password_hash": password_hash,
+             "is_verified": True, "is_active": True, "created_at": now, "updated_at": now}
+            for email in user_emails
+        ])
+        await session.commit()
+    random.shuffle(book_uids)
+    return Catalog(author_uids, book_uids, isbns, member_uids, user_emails, skew)
+
+
+async def cleanup(catalog: Catalog) -> None:
+    async with async_session_maker() as session:
+        for start in range(0, len(catalog.book_uids), INSERT_CHUNK):
+            chunk = catalog.book_uids[start:start + INSERT_CHUNK]
+            await session.execute(delete(Loan).where(Loan.book_uid.in_(chunk)))
+            await session.execute(delete(Book).where(Book.uid.in_(chunk)))
+        for start in range(0, len(catalog.member_uids), INSERT_CHUNK):
+            await session.execute(delete(Member).where(Member.uid.in_(catalog.member_uids[start:start + INSERT_CHUNK])))
+        await session.execute(delete(User).where(User.email.in_(catalog.user_emails)))
+        await session.execute(delete(Author).where(Author.uid.in_(catalog.author_uids)))
+        await session.commit()
+
+
+@asynccontextmanager
+async def asgi_client():
+    # The lifespan creates the tables and disposes of the engine, as under uvicorn.
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+@asynccontextmanager
+async def socket_client(concurrency: int, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+            raise RuntimeError("uvicorn exited before it started")
+        await asyncio.sleep(0.05)
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def _percentile(ordered, pct: float) -> float:
+    # Nearest rank on an already sorted list.
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _route_stats(latencies, statuses: Counter, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status == "error" or status >= 500)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+async def _virtual_user(workload: Workload, operations, cum_weights, deadline: float) -> None:
+    while perf_counter() < deadline:
+        operation = random.choices(operations, cum_weights=cum_weights)[0]
+        await operation(workload)
+
+
+async def run_scenario(name: str, workloads, recorder: Recorder, duration: float, warmup: float) -> dict:
+    operations = [operation for operation, _ in SCENARIOS[name]]
+    cum_weights = list(accumulate(weight for _, weight in SCENARIOS[name]))
+    for recording, seconds in ((False, warmup), (True, duration)):
+        recorder.reset(recording)
+        started = perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(*(_virtual_user(workload, operations, cum_weights, deadline) for workload in workloads))
+    elapsed = perf_counter() - started
+
+    results = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        results[f"{name} {route}"] = _route_stats(latencies, recorder.statuses[route], elapsed)
+    every_latency = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    if every_latency:
+        results[f"{name} total"] = _route_stats(every_latency, sum(recorder.statuses.values(), Counter()), elapsed)
+    return results
+
+
+async def run(args) -> dict:
+    # Periodic sweeps would land in the middle of the measurements.
+    Config.OVERDUE_SWEEP_INTERVAL_SECONDS = 0
+    Config.ANALYTICS_REFRESH_INTERVAL_SECONDS = 0
+    if args.mode == "socket":
+        client_context = socket_client(args.concurrency, args.port)
+    else:
+        client_context = asgi_client()
+    results = {}
+    async with client_context as client:
+        catalog = await seed(args.authors, args.books, args.members, args.users, args.skew)
+        try:
+            response = await client.post(
+                f"{API}/auth/signin", json={"email": catalog.user_emails[0], "password": PASSWORD}
+            )
+            response.raise_for_status()
+            token = response.json()["data"]["access_token"]
+            recorder = Recorder()
+            workloads = [Workload(client, catalog, recorder, token) for _ in range(args.concurrency)]
+            for name in args.scenarios:
+                scenario = await run_scenario(name, workloads, recorder, args.duration, args.warmup)
+                for stats in scenario.values():
+                    stats.update(mode=args.mode, concurrency=args.concurrency)
+                results.update(scenario)
+        finally:
+            await cleanup(catalog)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="signin,browse,checkout,mixed",
+                        help=f"comma separated, from {', '.join(SCENARIOS)}")
+    parser.add_argument("--mode", choices=("asgi", "socket"), default="asgi",
+                        help="in-process ASGI transport or a real uvicorn socket")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn port for --mode socket")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--authors", type=int, default=100)
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of book popularity")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    args.scenarios = args.scenario.split(",")
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one with --json {args.baseline}")
+
+    results = asyncio.run(run(args))
+
+    print(f"{'route':<40} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        print(
+            f"{name:<40} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9} "
+            f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}"
+        )
+    if args.json_path:
+        save_results(args.json_path, results)
+    if args.baseline:
+        baseline = {
+            name: row for name, row in load_results(args.baseline).items()
+            if row.get("mode") == args.mode and row.get("concurrency") == args.concurrency
+        }
+        if not baseline:
+            print(f"Baseline has no results for --mode {args.mode} at --concurrency {args.concurrency}.")
+        regressions = find_regressions(results, baseline, BASELINE_METRICS, args.tolerance)
+        print_regressions(regressions, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
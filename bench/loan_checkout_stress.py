@@ -0,0 +1,115 @@
+"""Concurrent checkout stress test for LoanService.create_loan.
+
+Seeds one book with ``--copies`` copies and one member per request, fires
+``--requests`` checkouts at ``--concurrency`` in parallel, then checks the
+stock invariant: exactly ``min(copies, requests)`` loans exist, stock never
+goes negative, and ``available_copies`` matches. Exits non-zero on violation.
+All seeded rows are removed afterwards. Runs against ``DATABASE_URL``.
+
+    python -m bench.loan_checkout_stress --copies 500 --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import select
+
+from app.books.models import Author, Book
+from app.db.main import async_session_maker, engine
+from app.loans.models import Loan
+from app.loans.schemas import LoanCreate
+from app.loans.service import LoanService
+from app.members.models import Member
+
+
+loan_service = LoanService()
+
+
+async def seed(copies: int, members: int):
+    run_id = uuid.uuid4().hex[:12]
+    now = datetime.now()
+    author_uid, book_uid = uuid.uuid4(), uuid.uuid4()
+    member_uids = [uuid.uuid4() for _ in range(members)]
+    async with async_session_maker() as session:
+        await session.execute(insert(Author).values(
+            uid=author_uid, first_name="Stress", last_name="Test", email=f"stress-{run_id}@bench.local",
+            created_at=now, updated_at=now,
+        ))
+        await session.execute(insert(Book).values(
+            uid=book_uid, title=f"Stress {run_id}", author_uid=author_uid, isbn=f"S{run_id}",
+            available_copies=copies, created_at=now, updated_at=now,
+        ))
+        await session.execute(insert(Member), [
+            {
+                "uid": uid, "first_name": "Stress", "last_name": str(i), "email": f"stress-{run_id}-{i}@bench.local",
+                "is_active": True, "join_date": now, "created_at": now, "updated_at": now,
+            }
+            for i, uid in enumerate(member_uids)
+        ])
+        await session.commit()
+    return author_uid, book_uid, member_uids
+
+
+async def cleanup(author_uid, book_uid, member_uids) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(Loan).where(Loan.book_uid == book_uid))
+        await session.execute(delete(Book).where(Book.uid == book_uid))
+        await session.execute(delete(Member).where(Member.uid.in_(member_uids)))
+        await session.execute(delete(Author).where(Author.uid == author_uid))
+        await session.commit()
+
+
+async def checkout(book_uid, member_uid, semaphore: asyncio.Semaphore) -> str:
+    async with semaphore:
+        async with async_session_maker() as session:
+            try:
+                await loan_service.create_loan(
+                    LoanCreate(book_uid=book_uid, member_uid=member_uid, due_date=datetime.now() + timedelta(days=14)),
+                    session,
+                )
+                return "created"
+            except ValueError as exc:
+                return str(exc)
+
+
+async def run(copies: int, requests: int, concurrency: int) -> bool:
+    author_uid, book_uid, member_uids = await seed(copies, requests)
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+        start = perf_counter()
+        outcomes = await asyncio.gather(*(checkout(book_uid, uid, semaphore) for uid in member_uids))
+        elapsed = perf_counter() - start
+
+        async with async_session_maker() as session:
+            stock = (await session.exec(select(Book.available_copies).where(Book.uid == book_uid))).one()
+            loans = (await session.exec(select(func.count()).select_from(Loan).where(Loan.book_uid == book_uid))).one()
+    finally:
+        await cleanup(author_uid, book_uid, member_uids)
+        await engine.dispose()
+
+    counts = Counter(outcomes)
+    expected = min(copies, requests)
+    ok = counts["created"] == expected == loans and stock == copies - expected and stock >= 0
+    print(f"{requests} checkouts at concurrency {concurrency} in {elapsed:.2f}s ({requests / elapsed:.0f}/s)")
+    for outcome, count in counts.most_common():
+        print(f"  {count:>7}  {outcome}")
+    print(f"loans={loans} expected={expected} available_copies={stock} -> {'OK' if ok else 'INVARIANT VIOLATED'}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.copies, args.requests, args.concurrency)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Regression-gated micro-benchmarks of the hot paths.
+
+Times, per operation:
+
+    books.get_all_books[...]     BookService.get_all_books for every combination
+                                 of the title, author_uid, publisher_uid, isbn
+                                 and q filters (needs DATABASE_URL)
+    loans.create_loan            LoanService.create_loan (needs DATABASE_URL)
+    loans.return_loan            LoanService.return_loan (needs DATABASE_URL)
+    auth.create_access_token     JWT signing
+    auth.decode_access_token     JWT verification, cached and uncached
+    errors._error_response       error envelope construction
+    logging.JsonFormatter        one access log record
+    serialization.books[n]       APIResponse[List[Book]] via api_response, n = 10, 1000, 10000
+
+Each benchmark is calibrated to run at least ``--min-time`` seconds per
+round; the median of ``--repeat`` rounds is reported in microseconds per
+operation. ``--save-baseline`` stores the results (``bench/baselines/micro.json``
+by default) and ``--check`` exits non-zero when a benchmark's median is
+slower than the stored one by more than ``--tolerance``. The baseline is
+not committed (see bench.baseline): record it on the machine that runs the
+check. Seeded rows are removed afterwards.
+
+    python -m bench.micro --save-baseline
+    python -m bench.micro --check --tolerance 0.25
+    python -m bench.micro --only auth,errors,logging,serialization
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import os
+import statistics
+import sys
+import uuid
+from datetime import datetime, timedelta
+from itertools import combinations
+from time import perf_counter
+from typing import List
+
+from fastapi import Request
+from sqlalchemy import delete, insert
+
+from app.auth.utils import create_access_token, decode_access_token
+from app.books.models import Author, Book, Publisher
+from app.books.schemas import Book as BookSchema
+from app.books.service import BookService
+from app.common.error_repsonses import _error_response
+from app.common.logging import JsonFormatter
+from app.common.responses import api_response
+from app.common.schemas import APIResponse
+from app.db.main import async_session_maker, engine
+from app.loans.models import Loan
+from app.loans.schemas import LoanCreate, LoanReturn
+from app.loans.service import LoanService
+from app.members.models import Member
+from bench.baseline import find_regressions, load_results, print_regressions, save_results
+from bench.serialization import make_books
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+BASELINE_METRICS = {"median_us": False}
+BOOK_FILTERS = ("title", "author_uid", "publisher_uid", "isbn", "q")
+SERIALIZATION_SIZES = (10, 1000, 10000)
+SEED_BOOKS = 2000
+
+book_service = BookService()
+loan_service = LoanService()
+
+
+class Benchmark:
+    """One timed operation; ``func`` may be async.
+
+    With ``self_timed`` the call returns the seconds of the part it measures,
+    so setup it needs per operation stays out of the result.
+    """
+
+    def __init__(self, name: str, func, self_timed: bool = False):
+        self.name = name
+        self.func = func
+        self.self_timed = self_timed
+        self.is_async = inspect.iscoroutinefunction(func)
+
+    async def run(self, number: int) -> float:
+        elapsed = 0.0
+        for _ in range(number):
+            started = perf_counter()
+            result = await self.func() if self.is_async else self.func()
+            elapsed += result if self.self_timed else perf_counter() - started
+        return elapsed
+
+
+async def measure(benchmark: Benchmark, repeat: int, min_time: float) -> dict:
+    number = 1
+    while True:
+        elapsed = await benchmark.run(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    rounds = [await benchmark.run(number) / number * 1e6 for _ in range(repeat)]
+    return {
+        "median_us": round(statistics.median(rounds), 2),
+        "min_us": round(min(rounds), 2),
+        "ops": number * repeat,
+    }
+
+
+def _selected(name: str, only) -> bool:
+    return not only or any(name.startswith(part) for part in only)
+
+
+def _filter_combinations():
+    for size in range(len(BOOK_FILTERS) + 1):
+        for names in combinations(BOOK_FILTERS, size):
+            yield f"books.get_all_books[{'+'.join(names) or 'none'}]", names
+
+
+DB_BENCHMARKS = [name for name, _ in _filter_combinations()] + ["loans.create_loan", "loans.return_loan"]
+
+
+def cpu_benchmarks(only) -> List[Benchmark]:
+    token = create_access_token({"sub": str(uuid.uuid4()), "email": "micro@bench.example.com"})
+    decode_access_token(token)
+
+    def decode_uncached():
+        fresh = create_access_token({"sub": str(uuid.uuid4()), "email": "micro@bench.example.com"})
+        started = perf_counter()
+        decode_access_token(fresh)
+        return perf_counter() - started
+
+    def error_response():
+        request = Request({"type": "http", "method": "GET", "path": "/api/v1/books/x", "headers": [], "query_string": b""})
+        started = perf_counter()
+        _error_response(
+            request=request, status_code=404, error_code="BOOK_NOT_FOUND",
+            message="Book not found", details="No book exists with uid x",
+        )
+        return perf_counter() - started
+
+    formatter = JsonFormatter()
+    record = logging.LogRecord("bookly", logging.INFO, __file__, 1, "Request completed", None, None)
+    record.__dict__.update(
+        request_id=str(uuid.uuid4()), method="GET", path="/api/v1/books/", status_code=200,
+        duration_ms=3.21, db_queries=2, db_rows=20, db_time_ms=1.1,
+    )
+
+    benchmarks = [
+        Benchmark("auth.create_access_token", lambda: create_access_token({"sub": "u", "email": "micro@bench.example.com"})),
+        Benchmark("auth.decode_access_token[cached]", lambda: decode_access_token(token)),
+        Benchmark("auth.decode_access_token[uncached]", decode_uncached, self_timed=True),
+        Benchmark("errors._error_response", error_response, self_timed=True),
+        Benchmark("logging.JsonFormatter.format", lambda: formatter.format(record)),
+    ]
+    for size in SERIALIZATION_SIZES:
+        name = f"serialization.books[{size}]"
+        if not _selected(name, only):
+            continue
+        books = make_books(size)
+        benchmarks.append(Benchmark(
+            name,
+            lambda books=books: api_response(
+                APIResponse[List[BookSchema]], status_code=200, data=books, message="Books fetched successfully"
+            ),
+        ))
+    return benchmarks
+
+
+async def seed():
+    run_id = uuid.uuid4().hex[:12]
+    now = datetime.now()
+    author_uids = [uuid.uuid4() for _ in range(20)]
+    publisher_uids = [uuid.uuid4() for _ in range(5)]
+    book_uids = [uuid.uuid4() for _ in range(SEED_BOOKS)]
+    member_uid = uuid.uuid4()
+    async with async_session_maker() as session:
+        await session.execute(insert(Author), [
+            {"uid": uid, "first_name": "Micro", "last_name": str(i), "email": f"micro-{run_id}-author-{i}@bench.example.com",
+             "created_at": now, "updated_at": now}
+            for i, uid in enumerate(author_uids)
+        ])
+        await session.execute(insert(Publisher), [
+            {"uid": uid, "first_name": "Micro", "last_name": str(i), "email": f"micro-{run_id}-publisher-{i}@bench.example.com",
+             "created_at": now, "updated_at": now}
+            for i, uid in enumerate(publisher_uids)
+        ])
+        await session.execute(insert(Book), [
+            {
+                # One book in ten matches the title/q filters.
+                "uid": uid, "title": f"Harry Potter {i}" if i % 10 == 0 else f"Garden Storm {i}",
+                "author_uid": author_uids[i % len(author_uids)], "publisher_uid": publisher_uids[i % len(publisher_uids)],
+                "isbn": f"M{run_id}{i:05d}", "language": "en", "available_copies": 1000,
+                "created_at": now - timedelta(seconds=i), "updated_at": now,
+            }
+            for i, uid in enumerate(book_uids)
+        ])
+        await session.execute(insert(Member).values(
+            uid=member_uid, first_name="Micro", last_name="Member", email=f"micro-{run_id}-member@bench.example.com",
+            is_active=True, join_date=now, created_at=now, updated_at=now,
+        ))
+        await session.commit()
+    return {
+        "run_id": run_id, "author_uids": author_uids, "publisher_uids": publisher_uids,
+        "book_uids": book_uids, "member_uid": member_uid,
+    }
+
+
+async def cleanup(seeded) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(Loan).where(Loan.member_uid == seeded["member_uid"]))
+        await session.execute(delete(Book).where(Book.uid.in_(seeded["book_uids"])))
+        await session.execute(delete(Member).where(Member.uid == seeded["member_uid"]))
+        await session.execute(delete(Publisher).where(Publisher.uid.in_(seeded["publisher_uids"])))
+        await session.execute(delete(Author).where(Author.uid.in_(seeded["author_uids"])))
+        await session.commit()
+
+
+def db_benchmarks(seeded, session) -> List[Benchmark]:
+    # Values that all match book 0, so every combination returns rows.
+    values = {
+        "title": "potter",
+        "author_uid": seeded["author_uids"][0],
+        "publisher_uid": seeded["publisher_uids"][0],
+        "isbn": f"M{seeded['run_id']}00000",
+        "q": "harry pot",
+    }
+    def list_books(filters):
+        async def run():
+            await book_service.get_all_books(session, limit=20, **filters)
+        return run
+
+    benchmarks = []
+    for name, names in _filter_combinations():
+        filters = {filter_name: values[filter_name] for filter_name in names}
+        benchmarks.append(Benchmark(name, list_books(filters)))
+
+    book_uid, member_uid = seeded["book_uids"][0], seeded["member_uid"]
+
+    def checkout():
+        return LoanCreate(book_uid=book_uid, member_uid=member_uid, due_date=datetime.now() + timedelta(days=14))
+
+    async def create_loan():
+        started = perf_counter()
+        loan = await loan_service.create_loan(checkout(), session)
+        elapsed = perf_counter() - started
+        await loan_service.return_loan(loan.uid, LoanReturn(), session)
+        return elapsed
+
+    async def return_loan():
+        loan = await loan_service.create_loan(checkout(), session)
+        started = perf_counter()
+        await loan_service.return_loan(loan.uid, LoanReturn(), session)
+        return perf_counter() - started
+
+    benchmarks.append(Benchmark("loans.create_loan", create_loan, self_timed=True))
+    benchmarks.append(Benchmark("loans.return_loan", return_loan, self_timed=True))
+    return benchmarks
+
+
+async def run(args) -> dict:
+    results = {}
+
+    async def measure_all(benchmarks) -> None:
+        for benchmark in benchmarks:
+            if _selected(benchmark.name, args.only):
+                results[benchmark.name] = await measure(benchmark, args.repeat, args.min_time)
+                print(f"  {benchmark.name:<58} {results[benchmark.name]['median_us']:>12} us", flush=True)
+
+    await measure_all(cpu_benchmarks(args.only))
+    if any(_selected(name, args.only) for name in DB_BENCHMARKS):
+        seeded = await seed()
+        try:
+            async with async_session_maker() as session:
+                await measure_all(db_benchmarks(seeded, session))
+        finally:
+            await cleanup(seeded)
+            await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="comma separated name prefixes, e.g. auth,books.get_all_books[q")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per benchmark, median is reported")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds each round runs at least")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file for --save-baseline/--check")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit non-zero on slowdowns against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+    args.only = [part for part in (args.only or "").split(",") if part]
+    if args.check and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one with --save-baseline")
+
+    results = asyncio.run(run(args))
+
+    print(f"{'benchmark':<58} {'median us':>12} {'min us':>12} {'ops':>9}")
+    for name, row in results.items():
+        print(f"{name:<58} {row['median_us']:>12} {row['min_us']:>12} {row['ops']:>9}")
+    if args.json_path:
+        save_results(args.json_path, results)
+    if args.save_baseline:
+        # Merge so a partial --only run refreshes just its own entries.
+        stored = load_results(args.baseline) if os.path.exists(args.baseline) else {}
+        save_results(args.baseline, {**stored, **results})
+        print(f"Baseline saved to {args.baseline}")
+    if args.check:
+        regressions = find_regressions(results, load_results(args.baseline), BASELINE_METRICS, args.tolerance)
+        print_regressions(regressions, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Book title search latency as the catalog grows.
+
+Builds a scratch ``bench_books_search`` table carrying the same GIN indexes as
+``books`` and times the legacy ``ILIKE '%..%'`` filter against the ``q=``
+full-text/trigram search at each table size. Requires Postgres with pg_trgm.
+
+    python -m bench.search_latency --sizes 10000,100000,1000000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+from time import perf_counter
+
+from sqlalchemy import Column, MetaData, String, Table, desc, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.books.search import title_search_clause, title_search_rank
+from app.config import Config
+
+
+TABLE_NAME = "bench_books_search"
+WORDS = [
+    "harry", "potter", "stone", "chamber", "secret", "lord", "rings", "tower",
+    "shadow", "river", "garden", "winter", "summer", "empire", "ocean", "night",
+    "silent", "golden", "broken", "hidden", "kingdom", "journey", "storm", "city",
+    "machine", "history", "letters", "dragon", "island", "mountain", "forest", "glass",
+]
+QUERIES = ["harry", "pot", "secret chamber", "mount", "glass tow"]
+
+metadata = MetaData()
+bench_books = Table(
+    TABLE_NAME,
+    metadata,
+    Column("uid", UUID(as_uuid=True), primary_key=True),
+    Column("title", String(255), nullable=False),
+)
+
+
+def _random_title_sql(word_count: int = 4) -> str:
+    words = "ARRAY[" + ",".join(f"'{word}'" for word in WORDS) + "]"
+    parts = [f"({words})[1 + floor(random() * {len(WORDS)})::int]" for _ in range(word_count)]
+    return " || ' ' || ".join(parts)
+
+
+async def _setup(conn) -> None:
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+    await conn.run_sync(metadata.create_all)
+    await conn.execute(text(
+        f"CREATE INDEX ix_{TABLE_NAME}_tsv ON {TABLE_NAME} USING gin (to_tsvector('simple', title))"
+    ))
+    await conn.execute(text(
+        f"CREATE INDEX ix_{TABLE_NAME}_trgm ON {TABLE_NAME} USING gin (title gin_trgm_ops)"
+    ))
+
+
+async def _grow_to(conn, current: int, target: int) -> None:
+    if target <= current:
+        return
+    await conn.execute(text(
+        f"INSERT INTO {TABLE_NAME} (uid, title) "
+        f"SELECT gen_random_uuid(), {_random_title_sql()} FROM generate_series(1, :n)"
+    ), {"n": target - current})
+    await conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+
+
+async def _time_statement(conn, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = await conn.execute(statement)
+        result.all()
+        timings.append((perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def run(sizes, repeat: int, limit: int, keep: bool) -> list:
+    engine = create_async_engine(Config.DATABASE_URL)
+    results = []
+    try:
+        async with engine.begin() as conn:
+            await _setup(conn)
+        current = 0
+        for size in sizes:
+            async with engine.begin() as conn:
+                await _grow_to(conn, current, size)
+            current = max(current, size)
+            async with engine.connect() as conn:
+                for q in QUERIES:
+                    ilike = select(bench_books).where(bench_books.c.title.ilike(f"%{q}%")).limit(limit)
+                    search = (
+                        select(bench_books)
+                        .where(title_search_clause(bench_books.c.title, q))
+                        .order_by(desc(title_search_rank(bench_books.c.title, q)))
+                        .limit(limit)
+                    )
+                    results.append({
+                        "rows": size,
+                        "query": q,
+                        "ilike_ms": round(await _time_statement(conn, ilike, repeat), 2),
+                        "search_ms": round(await _time_statement(conn, search, repeat), 2),
+                    })
+    finally:
+        if not keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma separated table sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query, median is reported")
+    parser.add_argument("--limit", type=int, default=50, help="page size used by both queries")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table afterwards")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    results = asyncio.run(run(sizes, args.repeat, args.limit, args.keep))
+
+    print(f"{'rows':>10}  {'query':<16} {'ilike ms':>10} {'search ms':>10}")
+    for row in results:
+        print(f"{row['rows']:>10}  {row['query']:<16} {row['ilike_ms']:>10} {row['search_ms']:>10}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""APIResponse encoding: FastAPI response_model path vs the api_response fast path.
+
+Builds in-memory ``Book`` ORM objects (with author and publisher loaded) and
+encodes them the way ``read_books`` used to (``serialize_response`` against the
+route's response field, then ``JSONResponse``) and the way it does now
+(``app.common.responses.api_response``). No database is needed.
+
+    python -m bench.serialization --items 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import uuid
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.books.models import Author, Book, Publisher
+from app.books.schemas import Book as BookSchema
+from app.common.responses import api_response
+from app.common.schemas import APIResponse
+from app.main import app
+
+
+def make_books(count: int) -> list:
+    now = datetime.now()
+    author = Author(uid=uuid.uuid4(), first_name="Ada", last_name="Lovelace", email="ada@example.com", created_at=now, updated_at=now)
+    publisher = Publisher(uid=uuid.uuid4(), first_name="Pen", last_name="Press", email="pen@example.com", created_at=now, updated_at=now)
+    books = []
+    for i in range(count):
+        created = now - timedelta(minutes=i)
+        books.append(Book(
+            uid=uuid.uuid4(),
+            title=f"Book number {i}",
+            author_uid=author.uid,
+            publisher_uid=publisher.uid,
+            isbn=f"978{i:010d}",
+            description="A fairly ordinary description of a book. " * 4,
+            published_date=created,
+            pages=100 + i % 500,
+            language="en",
+            available_copies=i % 7,
+            author=author,
+            publisher=publisher,
+            created_at=created,
+            updated_at=created,
+        ))
+    return books
+
+
+def _list_route_field():
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == "/api/v1/books/" and "GET" in route.methods:
+            return route.secure_cloned_response_field
+    raise RuntimeError("read_books route not found")
+
+
+async def legacy_encode(field, books) -> bytes:
+    content = await serialize_response(
+        field=field,
+        response_content=APIResponse(
+            status="success", statusCode=200, data=books, message="Books fetched successfully", errors=None
+        ),
+    )
+    return JSONResponse(content=content).body
+
+
+def fast_encode(books) -> bytes:
+    return api_response(
+        APIResponse[List[BookSchema]], status_code=200, data=books, message="Books fetched successfully"
+    ).body
+
+
+async def run(items: int, repeat: int) -> dict:
+    books = make_books(items)
+    field = _list_route_field()
+    assert json.loads(await legacy_encode(field, books)) == json.loads(fast_encode(books))
+
+    legacy, fast = [], []
+    for _ in range(repeat):
+        start = perf_counter()
+        await legacy_encode(field, books)
+        legacy.append((perf_counter() - start) * 1000)
+        start = perf_counter()
+        fast_encode(books)
+        fast.append((perf_counter() - start) * 1000)
+    legacy_ms, fast_ms = statistics.median(legacy), statistics.median(fast)
+    return {
+        "items": items,
+        "legacy_ms": round(legacy_ms, 3),
+        "fast_ms": round(fast_ms, 3),
+        "speedup": round(legacy_ms / fast_ms, 2) if fast_ms else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="books per response")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per path, median is reported")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.items, args.repeat))
+    print(f"{result['items']} books: response_model {result['legacy_ms']} ms, "
+          f"api_response {result['fast_ms']} ms ({result['speedup']}x)")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Cold start time of one API worker.
+
+Each run spawns a fresh ``uvicorn app.main:app`` process, as an autoscaled pod
+would, and measures:
+
+    import_ms      importing app.main in a fresh interpreter
+    ready_ms       process spawn until the first 200 from /metrics, i.e. the
+                   interpreter, imports and lifespan startup together
+    openapi_ms     the first GET /openapi.json after that
+
+for each ``--profile``:
+
+    default        create_all at boot, OpenAPI schema generated on first use
+    production     DB_CREATE_ALL_ON_STARTUP=false and OPENAPI_SCHEMA_PATH set to
+                   a document written by app.tools.openapi beforehand
+
+The median of ``--runs`` runs is reported, plus the heavy optional modules
+(numpy, passlib, bcrypt) a worker has loaded once it is up. Background
+sweeps and refreshes are disabled in the spawned workers so they do not add
+noise. Runs against ``DATABASE_URL``, whose tables must already exist (e.g.
+after ``alembic upgrade head``).
+
+    python -m bench.startup --runs 10
+    python -m bench.startup --json bench/baselines/startup.json
+    python -m bench.startup --baseline bench/baselines/startup.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+import httpx
+
+from bench.baseline import find_regressions, load_results, print_regressions, save_results
+
+
+PROFILES = {
+    "default": {"DB_CREATE_ALL_ON_STARTUP": "true", "OPENAPI_SCHEMA_PATH": ""},
+    "production": {"DB_CREATE_ALL_ON_STARTUP": "false"},
+}
+HEAVY_MODULES = ("numpy", "passlib", "bcrypt")
+BASELINE_METRICS = {"import_ms": False, "ready_ms": False, "openapi_ms": False}
+
+IMPORT_PROBE = f"""
+import json, sys
+from time import perf_counter
+started = perf_counter()
+import app.main
+print(json.dumps({{
+    "import_ms": (perf_counter() - started) * 1000,
+    "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_worker(env: dict, timeout: float) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            while True:
+                if worker.poll() is not None:
+                    raise RuntimeError(f"worker exited before it was ready:\n{worker.stderr.read().decode()}")
+                if perf_counter() - started > timeout:
+                    raise RuntimeError(f"worker not ready after {timeout}s")
+                try:
+                    if client.get("/metrics").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                sleep(0.005)
+            ready = perf_counter() - started
+            requested = perf_counter()
+            client.get("/openapi.json").raise_for_status()
+            openapi = perf_counter() - requested
+    finally:
+        worker.terminate()
+        worker.wait()
+    return {"ready_ms": ready * 1000, "openapi_ms": openapi * 1000}
+
+
+def run_profile(name: str, runs: int, timeout: float, schema_path: str) -> dict:
+    env = {
+        **os.environ,
+        "OVERDUE_SWEEP_INTERVAL_SECONDS": "0",
+        "ANALYTICS_REFRESH_INTERVAL_SECONDS": "0",
+        "OPENAPI_SCHEMA_PATH": schema_path,
+        **PROFILES[name],
+    }
+    samples = {metric: [] for metric in BASELINE_METRICS}
+    heavy_modules = set()
+    for _ in range(runs):
+        probe = measure_import(env)
+        samples["import_ms"].append(probe["import_ms"])
+        heavy_modules.update(probe["heavy_modules"])
+        for metric, value in measure_worker(env, timeout).items():
+            samples[metric].append(value)
+    return {
+        "runs": runs,
+        **{metric: round(statistics.median(values), 1) for metric, values in samples.items()},
+        "ready_ms_min": round(min(samples["ready_ms"]), 1),
+        "heavy_modules": sorted(heavy_modules),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="default,production", help=f"comma separated, from {', '.join(PROFILES)}")
+    parser.add_argument("--runs", type=int, default=5, help="workers started per profile, median is reported")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds a worker may take to become ready")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    profiles = args.profile.split(",")
+    unknown = [name for name in profiles if name not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one with --json {args.baseline}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        schema_path = os.path.join(scratch, "openapi.json")
+        # Same build step a production image runs.
+        subprocess.run(
+            [sys.executable, "-m", "app.tools.openapi", "--output", schema_path],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        for name in profiles:
+            print(f"Starting {args.runs} {name} workers...", flush=True)
+            results[name] = run_profile(name, args.runs, args.timeout, schema_path)
+
+    print(f"{'profile':<12} {'import ms':>10} {'ready ms':>10} {'ready min':>10} {'openapi ms':>11}  heavy modules")
+    for name, row in results.items():
+        print(
+            f"{name:<12} {row['import_ms']:>10} {row['ready_ms']:>10} {row['ready_ms_min']:>10} "
+            f"{row['openapi_ms']:>11}  {', '.join(row['heavy_modules']) or '-'}"
+        )
+    if args.json_path:
+        save_results(args.json_path, results)
+    if args.baseline:
+        regressions = find_regressions(results, load_results(args.baseline), BASELINE_METRICS, args.tolerance)
+        print_regressions(regressions, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
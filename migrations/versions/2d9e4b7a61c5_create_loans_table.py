@@ -0,0 +1,58 @@
+"""Create the loans table
+
+Revision ID: 2d9e4b7a61c5
+Revises: cbf746de710d
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9e4b7a61c5'
+down_revision: Union[str, Sequence[str], None] = 'cbf746de710d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # f333f2e6ce93 and cbf746de710d drop loans, which until now only came back
+    # through SQLModel.metadata.create_all at startup. Databases that already
+    # have it from there keep their table; the revisions after this one add
+    # the newer indexes to either.
+    if sa.inspect(op.get_bind()).has_table('loans'):
+        return
+    op.create_table('loans',
+    sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('book_uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('member_uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('borrowed_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('due_date', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('reissued_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('returned_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('fine_amount', sa.NUMERIC(precision=10, scale=2), server_default=sa.text('0.00'), nullable=False),
+    sa.Column('fine_grace_amount', sa.NUMERIC(precision=10, scale=2), server_default=sa.text('0.00'), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['book_uid'], ['books.uid'], name=op.f('loans_book_uid_fkey')),
+    sa.ForeignKeyConstraint(['member_uid'], ['members.uid'], name=op.f('loans_member_uid_fkey')),
+    sa.PrimaryKeyConstraint('uid', name=op.f('loans_pkey'))
+    )
+    op.create_index(op.f('ix_loans_uid'), 'loans', ['uid'], unique=True)
+    op.create_index(op.f('ix_loans_member_uid'), 'loans', ['member_uid'], unique=False)
+    op.create_index(op.f('ix_loans_borrowed_at'), 'loans', ['borrowed_at'], unique=False)
+    op.create_index(op.f('ix_loans_book_uid'), 'loans', ['book_uid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_loans_book_uid'), table_name='loans')
+    op.drop_index(op.f('ix_loans_borrowed_at'), table_name='loans')
+    op.drop_index(op.f('ix_loans_member_uid'), table_name='loans')
+    op.drop_index(op.f('ix_loans_uid'), table_name='loans')
+    op.drop_table('loans')
@@ -0,0 +1,33 @@
+"""Add (created_at, uid) indexes for keyset pagination
+
+Revision ID: 5b8e1d2c4a90
+Revises: 2d9e4b7a61c5
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1d2c4a90'
+down_revision: Union[str, Sequence[str], None] = '2d9e4b7a61c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('books', 'authors', 'publishers', 'members', 'loans')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.create_index(f'ix_{table}_created_at_uid', table, ['created_at', 'uid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_created_at_uid', table_name=table)
@@ -0,0 +1,38 @@
+"""Add full-text and trigram search indexes on books.title
+
+Revision ID: 8c3f6a1e7d25
+Revises: 5b8e1d2c4a90
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f6a1e7d25'
+down_revision: Union[str, Sequence[str], None] = '5b8e1d2c4a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Expression must stay in sync with app.books.search.title_tsvector.
+    op.execute("CREATE INDEX ix_books_title_tsv ON books USING gin (to_tsvector('simple', title))")
+    op.create_index(
+        'ix_books_title_trgm',
+        'books',
+        ['title'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_title_trgm', table_name='books')
+    op.drop_index('ix_books_title_tsv', table_name='books')
@@ -0,0 +1,44 @@
+"""Add partial indexes for active loans
+
+Revision ID: b41d7e9a0c3f
+Revises: 8c3f6a1e7d25
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7e9a0c3f'
+down_revision: Union[str, Sequence[str], None] = '8c3f6a1e7d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Creating the unique index fails if a member currently holds two open
+    # loans for the same book; close the duplicate first.
+    op.create_index(
+        'uq_loans_active_book_member',
+        'loans',
+        ['book_uid', 'member_uid'],
+        unique=True,
+        postgresql_where=sa.text('returned_at IS NULL'),
+    )
+    op.create_index(
+        'ix_loans_active_created_at_uid',
+        'loans',
+        ['created_at', 'uid'],
+        unique=False,
+        postgresql_where=sa.text('returned_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loans_active_created_at_uid', table_name='loans')
+    op.drop_index('uq_loans_active_book_member', table_name='loans')
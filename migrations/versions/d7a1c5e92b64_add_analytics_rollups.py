@@ -0,0 +1,60 @@
+"""Add analytics rollup tables
+
+Revision ID: d7a1c5e92b64
+Revises: b41d7e9a0c3f
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a1c5e92b64'
+down_revision: Union[str, Sequence[str], None] = 'b41d7e9a0c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analytics_loan_facts',
+    sa.Column('loan_uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('book_uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('city', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('language', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('returned', sa.Boolean(), nullable=False),
+    sa.Column('fine_amount', postgresql.NUMERIC(10, 2), server_default=sa.text('0.00'), nullable=False),
+    sa.PrimaryKeyConstraint('loan_uid')
+    )
+    op.create_table('analytics_loan_rollups',
+    sa.Column('dimension', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('loans', sa.Integer(), nullable=False),
+    sa.Column('returned', sa.Integer(), nullable=False),
+    sa.Column('fine_amount', postgresql.NUMERIC(14, 2), server_default=sa.text('0.00'), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'day', 'key')
+    )
+    op.create_table('analytics_watermarks',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('loan_uid', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('refreshed_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Analytics refreshes walk loans changed since their watermark.
+    op.create_index('ix_loans_updated_at_uid', 'loans', ['updated_at', 'uid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loans_updated_at_uid', table_name='loans')
+    op.drop_table('analytics_watermarks')
+    op.drop_table('analytics_loan_rollups')
+    op.drop_table('analytics_loan_facts')
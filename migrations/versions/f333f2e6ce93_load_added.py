@@ -22,11 +22,14 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_index(op.f('ix_loans_book_uid'), table_name='loans')
-    op.drop_index(op.f('ix_loans_borrowed_at'), table_name='loans')
-    op.drop_index(op.f('ix_loans_member_uid'), table_name='loans')
-    op.drop_index(op.f('ix_loans_uid'), table_name='loans')
-    op.drop_table('loans')
+    # loans was only ever created by SQLModel.metadata.create_all, so a fresh
+    # database reaches this revision without it; 2d9e4b7a61c5 creates it.
+    if sa.inspect(op.get_bind()).has_table('loans'):
+        op.drop_index(op.f('ix_loans_book_uid'), table_name='loans')
+        op.drop_index(op.f('ix_loans_borrowed_at'), table_name='loans')
+        op.drop_index(op.f('ix_loans_member_uid'), table_name='loans')
+        op.drop_index(op.f('ix_loans_uid'), table_name='loans')
+        op.drop_table('loans')
     # ### end Alembic commands ###
 
 
@@ -4,6 +4,34 @@ set -euo pipefail
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$ROOT_DIR"
 
+APP_PORT="${APP_PORT:-8000}"
+MAX_WAIT_SECONDS="${MAX_WAIT_SECONDS:-120}"
+START_TS="$(date +%s)"
+
+# --local: no containers, run uvicorn from this checkout against an in-memory SQLite database.
+if [ "${1:-}" = "--local" ]; then
+  export DATABASE_URL="${DATABASE_URL:-sqlite+aiosqlite:///:memory:}"
+  echo "Starting app locally against ${DATABASE_URL}..."
+  python -m uvicorn app.main:app --port "$APP_PORT" >/tmp/bookly-validate.log 2>&1 &
+  APP_PID=$!
+  trap 'kill "$APP_PID" 2>/dev/null || true' EXIT
+
+  until curl -fsS "http://127.0.0.1:${APP_PORT}/docs" >/dev/null 2>&1; do
+    if ! kill -0 "$APP_PID" 2>/dev/null || [ $(( "$(date +%s)" - START_TS )) -ge "$MAX_WAIT_SECONDS" ]; then
+      echo "App did not start. Recent app logs:"
+      tail -n 120 /tmp/bookly-validate.log || true
+      exit 1
+    fi
+    sleep 1
+  done
+
+  echo "Running HTTP checks..."
+  curl -fsS "http://127.0.0.1:${APP_PORT}/openapi.json" >/dev/null
+  curl -fsS "http://127.0.0.1:${APP_PORT}/metrics" >/dev/null
+  echo "Runtime validation passed."
+  exit 0
+fi
+
 if ! command -v docker >/dev/null 2>&1; then
   echo "docker is required to run runtime validation."
   exit 1
@@ -14,10 +42,6 @@ if ! docker compose version >/dev/null 2>&1; then
   exit 1
 fi
 
-APP_PORT="${APP_PORT:-8000}"
-MAX_WAIT_SECONDS="${MAX_WAIT_SECONDS:-120}"
-START_TS="$(date +%s)"
-
 echo "Starting app and database containers..."
 docker compose up -d --build db app
 
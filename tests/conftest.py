@@ -0,0 +1,76 @@
+import os
+
+# Settings are read when app modules are imported, so configure them first.
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_SECONDS", "3600")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "1")
+os.environ["OVERDUE_SWEEP_INTERVAL_SECONDS"] = "0"
+os.environ["ANALYTICS_REFRESH_INTERVAL_SECONDS"] = "0"
+# Tests refresh the rollups right after changing loans.
+os.environ["ANALYTICS_REFRESH_LAG_SECONDS"] = "0"
+
+from datetime import datetime, timedelta
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.utils import create_access_token
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    return {"Authorization": f"Bearer {create_access_token({'email': 'tests@example.com'})}"}
+
+
+def created(response):
+    assert response.status_code in (200, 201), response.text
+    return response.json()["data"]
+
+
+@pytest.fixture
+def make_member(client, auth_headers):
+    def make(**fields):
+        suffix = uuid.uuid4().hex[:8]
+        return created(client.post("/api/v1/members/", json={
+            "first_name": "Max", "last_name": "Reader", "email": f"member-{suffix}@example.com", "city": "Oslo",
+            **fields,
+        }, headers=auth_headers))
+    return make
+
+
+@pytest.fixture
+def make_books(client, auth_headers):
+    """Create books by one new author in a single batch, so they share created_at."""
+    def make(*copies, **fields):
+        suffix = uuid.uuid4().hex[:8]
+        author = created(client.post("/api/v1/authors/", json={
+            "first_name": "Ada", "last_name": "Writer", "email": f"author-{suffix}@example.com",
+        }, headers=auth_headers))
+        return created(client.post("/api/v1/books/batch", json={"items": [
+            {"title": f"Book {index}", "author_uid": author["uid"], "isbn": f"978{suffix}{index}",
+             "available_copies": count, **fields}
+            for index, count in enumerate(copies)
+        ]}, headers=auth_headers))
+    return make
+
+
+@pytest.fixture
+def checkout(client, auth_headers):
+    """POST a loan and return the raw response, so tests can assert on refusals."""
+    def check_out(book, member, **fields):
+        return client.post("/api/v1/loans/", json={
+            "book_uid": book["uid"], "member_uid": member["uid"],
+            "due_date": (datetime.now() + timedelta(days=14)).isoformat(),
+            **fields,
+        }, headers=auth_headers)
+    return check_out
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+
+BORROWED_ON = "2001-02-03"
+
+
+def _rows(client, auth_headers, path):
+    response = client.get(
+        f"/api/v1/analytics/loans/{path}", params={"start": BORROWED_ON, "end": BORROWED_ON}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    return [
+        (row["loans"], row["returned"], row["fine_amount"]) for row in response.json()["data"]["rows"]
+    ]
+
+
+def _refresh(client, auth_headers):
+    response = client.post("/api/v1/analytics/refresh", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_refresh_replaces_the_previous_fact_of_a_changed_loan(client, auth_headers, make_books, make_member, checkout):
+    (book,) = make_books(1, language="Latin")
+    borrowed_at = datetime.fromisoformat(f"{BORROWED_ON}T10:00:00")
+    loan = checkout(book, make_member(city="Bergen"), borrowed_at=borrowed_at.isoformat())
+    assert loan.status_code == 201, loan.text
+
+    assert _refresh(client, auth_headers)["changed"] >= 1
+    assert _rows(client, auth_headers, "daily") == [(1, 0, "0.00")]
+    assert _rows(client, auth_headers, "by-book") == [(1, 0, "0.00")]
+
+    returned = client.patch(
+        f"/api/v1/loans/{loan.json()['data']['uid']}/return", json={"fine_amount": "2.50"}, headers=auth_headers
+    )
+    assert returned.status_code == 200, returned.text
+    _refresh(client, auth_headers)
+
+    # Still one loan: the open fact was subtracted before the returned one was added.
+    assert _rows(client, auth_headers, "daily") == [(1, 1, "2.50")]
+    assert _rows(client, auth_headers, "by-book") == [(1, 1, "2.50")]
+
+    assert _refresh(client, auth_headers)["changed"] == 0
+    assert _rows(client, auth_headers, "daily") == [(1, 1, "2.50")]
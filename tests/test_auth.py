@@ -0,0 +1,24 @@
+import uuid
+
+from app.auth.utils import password_hasher
+
+
+def test_signin_works_after_the_hasher_was_shut_down(client):
+    # A previous lifespan (TestClient, uvicorn reload) shuts the hasher down.
+    credentials = {"email": f"reader-{uuid.uuid4().hex[:8]}@example.com", "password": "correct horse"}
+    signup = client.post("/api/v1/auth/signup", json={"username": credentials["email"], **credentials})
+    assert signup.status_code == 201, signup.text
+
+    password_hasher.shutdown()
+
+    signin = client.post("/api/v1/auth/signin", json=credentials)
+    assert signin.status_code == 200, signin.text
+
+
+def test_metrics_expose_password_hasher_counters(client):
+    body = client.get("/metrics").text
+
+    for name in ("in_flight", "queue_depth"):
+        assert f"# TYPE bookly_password_hash_{name} gauge" in body
+    for name in ("completed", "failed", "rejected"):
+        assert f"# TYPE bookly_password_hash_{name}_total counter" in body
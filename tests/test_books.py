@@ -0,0 +1,52 @@
+def test_cursor_pages_through_books_with_equal_created_at(client, auth_headers, make_books):
+    books = make_books(1, 1, 1, 1, 1)
+    author_uid = client.get(f"/api/v1/books/{books[0]['uid']}", headers=auth_headers).json()["data"]["author_uid"]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"author_uid": author_uid, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/books/", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen.extend(book["uid"] for book in body["data"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    # Newest first, ties on created_at broken by uid, each book exactly once.
+    assert seen == sorted((book["uid"] for book in books), reverse=True)
+
+
+def test_book_etag_answers_304_until_the_book_changes(client, auth_headers, make_books):
+    (book,) = make_books(1)
+    url = f"/api/v1/books/{book['uid']}"
+
+    first = client.get(url, headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert first.json()["data"]["title"] == "Book 0"
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    updated = client.patch(url, json={"title": "Renamed"}, headers=auth_headers)
+    assert updated.status_code == 200, updated.text
+
+    # The update drops the cached book, so the stale ETag no longer matches.
+    after = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json()["data"]["title"] == "Renamed"
+    assert after.headers["ETag"] != etag
+
+
+def test_book_list_etag_changes_when_a_listed_book_changes(client, auth_headers, make_books):
+    (book,) = make_books(1)
+    author_uid = client.get(f"/api/v1/books/{book['uid']}", headers=auth_headers).json()["data"]["author_uid"]
+    params = {"author_uid": author_uid}
+
+    etag = client.get("/api/v1/books/", params=params, headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get("/api/v1/books/", params=params, headers=conditional).status_code == 304
+
+    client.patch(f"/api/v1/books/{book['uid']}", json={"available_copies": 3}, headers=auth_headers)
+
+    assert client.get("/api/v1/books/", params=params, headers=conditional).status_code == 200
@@ -0,0 +1,15 @@
+def test_batch_delete_reports_books_on_loan_as_conflicts(client, auth_headers, make_books, make_member, checkout):
+    on_loan, on_shelf = make_books(1, 1)
+    assert checkout(on_loan, make_member()).status_code == 201
+
+    response = client.request(
+        "DELETE", "/api/v1/books/batch", json={"uids": [on_loan["uid"], on_shelf["uid"]]}, headers=auth_headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert [(item["uid"], item["status"]) for item in response.json()["data"]] == [
+        (on_loan["uid"], "conflict"),
+        (on_shelf["uid"], "deleted"),
+    ]
+    assert client.get(f"/api/v1/books/{on_loan['uid']}", headers=auth_headers).status_code == 200
+    assert client.get(f"/api/v1/books/{on_shelf['uid']}", headers=auth_headers).status_code == 404
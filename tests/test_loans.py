@@ -0,0 +1,76 @@
+import uuid
+
+
+def _copies(client, auth_headers, book):
+    response = client.get(f"/api/v1/books/{book['uid']}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["available_copies"]
+
+
+def _error(response, status_code):
+    assert response.status_code == status_code, response.text
+    return response.json()["error"]["details"]
+
+
+def test_checkout_takes_a_copy_and_refuses_when_none_are_left(client, auth_headers, make_books, make_member, checkout):
+    (book,) = make_books(1)
+    first, second = make_member(), make_member()
+
+    loan = checkout(book, first)
+    assert loan.status_code == 201, loan.text
+    assert _copies(client, auth_headers, book) == 0
+
+    assert _error(checkout(book, second), 409) == "Book is out of stock"
+    assert _copies(client, auth_headers, book) == 0
+
+    returned = client.patch(f"/api/v1/loans/{loan.json()['data']['uid']}/return", json={}, headers=auth_headers)
+    assert returned.status_code == 200, returned.text
+    assert _copies(client, auth_headers, book) == 1
+    assert checkout(book, second).status_code == 201
+
+
+def test_checkout_of_a_missing_book_is_refused(make_member, checkout):
+    assert _error(checkout({"uid": str(uuid.uuid4())}, make_member()), 409) == "Book not found"
+
+
+def test_member_holds_one_active_loan_per_book(client, auth_headers, make_books, make_member, checkout):
+    (book,) = make_books(2)
+    member = make_member()
+
+    loan = checkout(book, member)
+    assert loan.status_code == 201, loan.text
+    assert _error(checkout(book, member), 409) == "Member already has an active loan for this book"
+    # The refused checkout gives its copy back.
+    assert _copies(client, auth_headers, book) == 1
+
+    client.patch(f"/api/v1/loans/{loan.json()['data']['uid']}/return", json={}, headers=auth_headers)
+    assert checkout(book, member).status_code == 201
+
+
+def test_bulk_return_reports_an_outcome_per_item(client, auth_headers, make_books, make_member, checkout):
+    first_book, second_book = make_books(1, 1)
+    member = make_member()
+    open_uid = checkout(first_book, member).json()["data"]["uid"]
+    closed_uid = checkout(second_book, member).json()["data"]["uid"]
+    client.patch(f"/api/v1/loans/{closed_uid}/return", json={}, headers=auth_headers)
+    missing_uid = str(uuid.uuid4())
+
+    response = client.post("/api/v1/loans/returns", json={"items": [
+        {"uid": open_uid, "fine_amount": "1.50"},
+        {"uid": open_uid},
+        {"uid": closed_uid},
+        {"uid": missing_uid},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    results = response.json()["data"]
+    assert [(item["index"], item["uid"], item["status"]) for item in results] == [
+        (0, open_uid, "returned"),
+        (1, open_uid, "invalid"),
+        (2, closed_uid, "already_returned"),
+        (3, missing_uid, "not_found"),
+    ]
+    assert results[0]["book_uid"] == first_book["uid"]
+    assert results[0]["fine_amount"] == "1.50"
+    assert _copies(client, auth_headers, first_book) == 1
+    assert _copies(client, auth_headers, second_book) == 1
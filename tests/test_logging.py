@@ -0,0 +1,39 @@
+import logging
+import queue
+import time
+
+from app.common import logging as app_logging
+from app.common.logging import BoundedQueueHandler, shutdown_logging, start_logging
+
+
+def _record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("bookly", level, __file__, 1, "message", None, None)
+
+
+def test_full_queue_never_blocks_without_a_listener():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+
+    handler.emit(_record(logging.ERROR))
+    handler.emit(_record(logging.ERROR))  # would wait forever if it blocked
+
+    assert handler.dropped == 1
+
+
+def test_listener_restarts_after_shutdown():
+    shutdown_logging()
+    start_logging()
+
+    logging.getLogger("bookly").info("after restart")
+
+    deadline = time.monotonic() + 5
+    while app_logging.get_logging_stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app_logging.get_logging_stats()["queued"] == 0
+
+
+def test_metrics_expose_logging_counters(client):
+    body = client.get("/metrics").text
+
+    assert "# TYPE bookly_log_queue_depth gauge" in body
+    assert "# TYPE bookly_log_records_dropped_total counter" in body
+    assert "# TYPE bookly_log_records_sampled_out_total counter" in body
@@ -0,0 +1,22 @@
+import numpy as np
+
+from app.loans.overdue import SECONDS_PER_DAY, FinePolicy
+
+
+def test_fines_count_full_days_after_the_grace_period_up_to_the_cap():
+    policy = FinePolicy(daily_rate=0.50, grace_days=2, max_amount=3.00)
+    now = 1_000 * SECONDS_PER_DAY
+    days_late = np.array([-1, 0, 1.5, 2.9, 3, 5.5, 30])
+
+    fines = policy.fines_cents(now - days_late * SECONDS_PER_DAY, now)
+
+    assert fines.tolist() == [0, 0, 0, 0, 50, 150, 300]
+
+
+def test_fines_without_grace_start_after_one_full_day():
+    policy = FinePolicy(daily_rate=0.25, grace_days=0, max_amount=20.00)
+    now = 1_000 * SECONDS_PER_DAY
+
+    fines = policy.fines_cents(np.array([now - 0.5 * SECONDS_PER_DAY, now - 4 * SECONDS_PER_DAY]), now)
+
+    assert fines.tolist() == [0, 100]